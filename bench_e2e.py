@@ -0,0 +1,186 @@
+"""
+로컬 대역 서버(standin_server.py)를 상대로 label_login + 작업 루프를 헤드리스로 돌려
+시간당 작업 수, 단계별 소요 시간, 오류율을 측정합니다.
+
+사용 예:
+    python bench_e2e.py --duration 120 --latency 0.1 --match-ratio 0.3
+    python bench_e2e.py --tasks 200 --fast-path --min-interval 0
+    python bench_e2e.py --tasks 300 --queues 45:1:10,46 --queue-limit 45=100 --empty-cooldown 5
+"""
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+
+from standin_server import StandInServer, DEFAULT_PATTERNS, parse_queue_limits
+
+OK_ACTIONS = ("E (패턴 일치)", "작업 미루기")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="라벨크래프트 대역 서버 처리량 벤치마크")
+    parser.add_argument("--base-url", help="이미 실행 중인 대역 서버 주소 (없으면 내부에서 실행)")
+    parser.add_argument("--duration", type=float, default=120, help="측정 시간 (초)")
+    parser.add_argument("--tasks", type=int, default=0, help="이 작업 수에 도달하면 종료 (0이면 시간 기준)")
+    parser.add_argument("--patterns-file", help="패턴 CSV (없으면 대역 서버 기본 단어 사용)")
+    parser.add_argument("--match-ratio", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.05, help="대역 서버 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--dialog-delay", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--min-interval", type=float, default=0.0)
+    parser.add_argument("--observer", action="store_true")
+    parser.add_argument("--fast-path", action="store_true")
+    parser.add_argument("--lean", action="store_true", help="가벼운 크롬 모드로 실행")
+    parser.add_argument("--no-headless", action="store_true", help="크롬 창을 띄워서 실행")
+    parser.add_argument("--queues", metavar="SPEC",
+                        help="여러 작업 큐를 스케줄러로 나눠 처리 ('번호[:가중치[:우선순위]],...')")
+    parser.add_argument("--queue-limit", action="append", default=[], metavar="QUEUE=N",
+                        help="대역 서버가 작업 큐마다 내줄 작업 수 (빈 큐 재현용)")
+    parser.add_argument("--empty-cooldown", type=float, default=60.0,
+                        help="빈 작업 큐를 다시 쓰기까지의 시간 (초)")
+    parser.add_argument("--history-db", help="실행 기록 DB 경로 (없으면 벤치마크 작업은 기록하지 않음)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: OUTPUT_DIR/bench_<시각>.json)")
+    parser.add_argument("--verbose", action="store_true", help="콘솔에 작업 로그 출력")
+    return parser
+
+
+def write_patterns(words):
+    f = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8")
+    with f:
+        writer = csv.writer(f)
+        writer.writerow(["패턴단어"])
+        for word in words:
+            writer.writerow([word])
+    return f.name
+
+
+def main():
+    args = build_parser().parse_args()
+
+    server = None
+    patterns_file = args.patterns_file
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        words = DEFAULT_PATTERNS
+        if patterns_file:
+            from pattern_store import load_patterns_from_file
+            words = load_patterns_from_file(patterns_file) or DEFAULT_PATTERNS
+        server = StandInServer(patterns=words, match_ratio=args.match_ratio, latency=args.latency,
+                               jitter=args.jitter, dialog_delay=args.dialog_delay, seed=args.seed,
+                               queue_limits=parse_queue_limits(args.queue_limit)).start()
+        base_url = server.base_url
+    if not patterns_file:
+        patterns_file = write_patterns(DEFAULT_PATTERNS)
+
+    # label_admin이 주소를 읽기 전에 설정해야 합니다.
+    os.environ["LABEL_BASE_URL"] = base_url
+
+    from label_admin import label_login, close_chrome
+    from label_metrics import metrics
+    from label_log import OUTPUT_DIR
+    from pattern_store import PatternStore
+    from prefix_util import close_excel_log
+    import main_2
+    from task_queues import build_scheduler
+
+    from label_log import set_log_level
+    set_log_level(logging.INFO, console_level=None if args.verbose else logging.WARNING)
+    # 벤치마크 작업이 실제 실행 기록에 섞이지 않도록 따로 지정할 때만 기록합니다.
+    from run_history import init_history
+    init_history(args.history_db, enabled=bool(args.history_db))
+
+    print(f"대역 서버: {base_url}")
+    scheduler = None
+    if args.queues:
+        try:
+            scheduler = build_scheduler(args.queues, empty_cooldown=args.empty_cooldown, reload_interval=0)
+        except ValueError as e:
+            print(f"작업 큐 설정 오류: {e}", file=sys.stderr)
+            return 1
+    pattern_store = PatternStore(patterns_file, reload_interval=0)
+    if not pattern_store.load():
+        print("패턴을 불러오지 못했습니다.", file=sys.stderr)
+        return 1
+
+    login_start = time.monotonic()
+    driver = label_login("bench", "bench", headless=not args.no_headless, lean=args.lean)
+    login_seconds = time.monotonic() - login_start
+    if not driver:
+        print("로그인 실패", file=sys.stderr)
+        return 1
+
+    stop_event = threading.Event()
+
+    def watch():
+        deadline = time.monotonic() + args.duration
+        while not stop_event.is_set():
+            if time.monotonic() >= deadline or (args.tasks and metrics.tasks_total >= args.tasks):
+                stop_event.set()
+                break
+            time.sleep(0.05)
+
+    threading.Thread(target=watch, name="BenchWatch", daemon=True).start()
+    loop_start = time.monotonic()
+    try:
+        main_2.main_task_loop(driver, pattern_store, args.min_interval, args.observer,
+                              stop_event, args.fast_path, scheduler=scheduler)
+    finally:
+        elapsed = time.monotonic() - loop_start
+        close_chrome(driver)
+        close_excel_log()
+        if scheduler:
+            scheduler.stop()
+
+    snapshot = metrics.snapshot()
+    tasks = snapshot["tasks_total"]
+    client_errors = sum(count for action, count in snapshot["actions"].items() if action not in OK_ACTIONS)
+    server_stats = server.state.snapshot() if server else None
+    wrong = server_stats["wrong"] if server_stats else 0
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "base_url": base_url,
+        "options": vars(args),
+        "login_seconds": login_seconds,
+        "elapsed_seconds": elapsed,
+        "tasks": tasks,
+        "tasks_per_hour": tasks / elapsed * 3600 if elapsed > 0 else 0.0,
+        "client_errors": client_errors,
+        "wrong_decisions": wrong,
+        "error_rate": (client_errors + wrong) / tasks if tasks else 0.0,
+        "actions": snapshot["actions"],
+        "stages": snapshot["stages"],
+        "server": server_stats,
+        "queues": scheduler.snapshot() if scheduler else None,
+    }
+
+    output = args.output or os.path.join(
+        OUTPUT_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"작업 수: {tasks}  ({report['tasks_per_hour']:.0f} 건/시간, 로그인 {login_seconds:.1f}초)")
+    print(f"오류율: {report['error_rate']:.2%}  (클라이언트 오류 {client_errors}, 잘못된 판정 {wrong})")
+    for name, stats in sorted(snapshot["stages"].items()):
+        print(f"  {name:16s} n={stats['count']:<6d} p50={stats['p50'] * 1000:8.1f}ms "
+              f"p95={stats['p95'] * 1000:8.1f}ms p99={stats['p99'] * 1000:8.1f}ms")
+    if scheduler:
+        print(f"작업 큐: {scheduler.summary()}")
+    print(f"결과 저장: {output}")
+
+    if server:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
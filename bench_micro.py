@@ -0,0 +1,357 @@
+"""
+prefix_util 마이크로벤치마크 (도메인 추출, 패턴 판정, 작업 로그 기록)
+
+브라우저, 구글 인증, 네트워크 없이 합성 데이터만으로 돌립니다.
+    - 패턴 단어: --pattern-sizes 개수만큼 무작위 단어 (기본 100 / 1만 / 10만)
+    - href: 티스토리(일치/숫자 부족/다른 단어)와 티스토리 아닌 주소를 --tistory-ratio 비율로 섞음
+    - 작업 로그: --log-rows 행을 log_to_excel로 기록
+
+경우마다 초당 처리 수(ops/sec, --repeat 중 가장 빠른 값)와 tracemalloc 최대 메모리를 재어
+JSON으로 저장합니다. --baseline을 주면 그 결과와 비교해 --tolerance 이상 느려진 경우를 표시하고
+종료 코드 1을 반환합니다.
+
+사용 예:
+    python bench_micro.py --save-baseline bench_baseline.json
+    python bench_micro.py --baseline bench_baseline.json
+    python bench_micro.py --quick --cases match
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import shutil
+import string
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+import prefix_util
+from prefix_util import extract_domain_name, check_href_match, build_matcher, log_to_excel
+from label_log import OUTPUT_DIR
+
+logger = logging.getLogger("main_logger")
+
+DEFAULT_PATTERN_SIZES = "100,10000,100000"
+DEFAULT_URLS = 20000
+DEFAULT_LOG_ROWS = 10000
+# 이 비율 이상 느려지면(ops/sec 기준) 회귀로 봅니다.
+DEFAULT_TOLERANCE = 0.2
+CASE_GROUPS = ("domain", "match", "log")
+
+NON_TISTORY_HOSTS = ["blog.naver.com", "news.example.com", "shop.example.net", "cafe.daum.net",
+                     "m.blog.naver.com", "brunch.co.kr", "velog.io"]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="prefix_util 마이크로벤치마크 (브라우저/네트워크 없음)")
+    parser.add_argument("--pattern-sizes", default=DEFAULT_PATTERN_SIZES,
+                        help="패턴 단어 수 목록 (쉼표로 구분)")
+    parser.add_argument("--urls", type=int, default=DEFAULT_URLS, help="경우마다 판정할 href 수")
+    parser.add_argument("--log-rows", type=int, default=DEFAULT_LOG_ROWS, help="작업 로그 기록 행 수")
+    parser.add_argument("--match-ratio", type=float, default=0.3, help="패턴과 일치하는 href 비율")
+    parser.add_argument("--tistory-ratio", type=float, default=0.8, help="티스토리 주소 비율")
+    parser.add_argument("--repeat", type=int, default=3, help="경우마다 반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cases", default=",".join(CASE_GROUPS),
+                        help=f"실행할 경우 묶음 (쉼표로 구분: {', '.join(CASE_GROUPS)})")
+    parser.add_argument("--quick", action="store_true",
+                        help="작은 규모로 빠르게 실행 (패턴 100/1만, href 5천, 로그 2천 행)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: OUTPUT_DIR/bench_micro_<시각>.json)")
+    parser.add_argument("--save-baseline", help="결과를 기준 파일로도 저장할 경로")
+    parser.add_argument("--baseline", help="비교할 기준 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="기준 대비 이 비율 이상 느려지면 회귀로 표시")
+    parser.add_argument("--verbose", action="store_true", help="콘솔에 로그 출력")
+    return parser
+
+
+# --- 합성 데이터 ---
+
+def make_patterns(count, rnd):
+    """
+    소문자 단어 count개를 만듭니다. 겹치지 않고, 숫자로 끝나지 않습니다.
+    """
+    words = set()
+    while len(words) < count:
+        words.add("".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 12))))
+    return sorted(words, key=lambda w: rnd.random())
+
+
+def make_urls(count, patterns, rnd, match_ratio, tistory_ratio):
+    """
+    작업 페이지에 나오는 것과 비슷한 href를 섞어 만듭니다.
+    match_ratio만큼은 '패턴 단어 + 4자리 이상 숫자' 티스토리 주소입니다.
+    """
+    urls = []
+    for _ in range(count):
+        post = rnd.randint(1, 9999)
+        if rnd.random() < match_ratio:
+            host = f"{rnd.choice(patterns)}{rnd.randint(1000, 999999)}.tistory.com"
+        elif rnd.random() < tistory_ratio:
+            if rnd.random() < 0.5:
+                # 패턴 단어지만 숫자가 4자리 미만
+                host = f"{rnd.choice(patterns)}{rnd.randint(0, 999)}.tistory.com"
+            else:
+                word = "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 12)))
+                host = f"{word}{rnd.randint(1000, 99999)}.tistory.com"
+        else:
+            host = rnd.choice(NON_TISTORY_HOSTS)
+            if host.endswith("naver.com"):
+                urls.append(f"https://{host}/user{rnd.randint(1000, 99999)}/{post}")
+                continue
+        urls.append(f"https://{host}/{post}")
+    return urls
+
+
+# --- 측정 ---
+
+def warm_stream(urls):
+    """
+    캐시(DOMAIN_CACHE_SIZE)에 모두 들어가는 href들을 반복해 urls와 같은 길이로 만듭니다.
+    캐시보다 많은 href를 돌리면 LRU가 계속 밀려나 cold와 같아지기 때문입니다.
+    """
+    working_set = urls[:min(prefix_util.DOMAIN_CACHE_SIZE, prefix_util.DECISION_CACHE_SIZE)]
+    return (working_set * (len(urls) // max(1, len(working_set)) + 1))[:len(urls)]
+
+
+def clear_caches():
+    prefix_util._domain_cache.clear()
+    prefix_util._decision_cache.clear()
+
+
+def measure(name, ops, run, setup=None, repeat=3):
+    """
+    run()을 repeat번 실행해 가장 빠른 시간으로 ops/sec를 구하고,
+    한 번 더 tracemalloc을 켜고 실행해 최대 메모리를 잽니다. setup()은 매 실행 전에 부릅니다.
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        "ops": ops,
+        "seconds": best,
+        "ops_per_sec": ops / best if best > 0 else 0.0,
+        "peak_kb": peak / 1024,
+    }
+    print(f"  {name:28s} {result['ops_per_sec']:14,.0f} ops/s  {best * 1000:9.1f}ms  "
+          f"최대 {result['peak_kb']:10,.0f}KB")
+    return result
+
+
+def bench_domain(args, rnd, results):
+    patterns = make_patterns(100, rnd)
+    urls = make_urls(args.urls, patterns, rnd, args.match_ratio, args.tistory_ratio)
+    rules = prefix_util.get_domain_rules()
+
+    def parse_all():
+        for url in urls:
+            prefix_util._parse_domain_name(url, rules)
+
+    def extract_all(stream=urls):
+        for url in stream:
+            extract_domain_name(url)
+
+    warm_urls = warm_stream(urls)
+
+    print("[도메인 추출]")
+    results["domain/parse"] = measure("domain/parse", len(urls), parse_all, repeat=args.repeat)
+    results["domain/cold"] = measure("domain/cold", len(urls), extract_all, clear_caches, args.repeat)
+    # 캐시를 한 번 채운 뒤 같은 href를 다시 판정하는 경우
+    extract_all(warm_urls)
+    results["domain/warm"] = measure("domain/warm", len(urls), lambda: extract_all(warm_urls),
+                                     repeat=args.repeat)
+
+
+def bench_match(args, rnd, results):
+    print("[패턴 판정]")
+    for size in args.pattern_sizes:
+        patterns = make_patterns(size, rnd)
+        urls = make_urls(args.urls, patterns, rnd, args.match_ratio, args.tistory_ratio)
+        warm_urls = warm_stream(urls)
+        holder = {}
+
+        def build():
+            holder["matcher"] = build_matcher(patterns)
+
+        def match_all(stream=urls):
+            matcher = holder["matcher"]
+            for url in stream:
+                check_href_match(url, matcher)
+
+        results[f"match/{size}/build"] = measure(f"match/{size}/build", size, build, repeat=args.repeat)
+        results[f"match/{size}/cold"] = measure(f"match/{size}/cold", len(urls), match_all,
+                                                clear_caches, args.repeat)
+        match_all(warm_urls)
+        results[f"match/{size}/warm"] = measure(f"match/{size}/warm", len(urls), lambda: match_all(warm_urls),
+                                                repeat=args.repeat)
+        holder.clear()
+
+
+def _wait_journal(writer, rows, timeout=60):
+    deadline = time.monotonic() + timeout
+    while writer.rows_written < rows and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def bench_log(args, rnd, results):
+    print("[작업 로그]")
+    patterns = make_patterns(100, rnd)
+    urls = make_urls(args.log_rows, patterns, rnd, args.match_ratio, args.tistory_ratio)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = [(timestamp, url, "일치" if i % 3 == 0 else "불일치", "E (패턴 일치)" if i % 3 == 0 else "작업 미루기")
+            for i, url in enumerate(urls)]
+    tmp_dir = tempfile.mkdtemp(prefix="bench_micro_")
+    try:
+        import openpyxl  # noqa: F401
+        has_openpyxl = True
+    except ImportError:
+        has_openpyxl = False
+    # openpyxl이 없으면 로그를 닫을 때마다 엑셀 변환 실패가 기록되므로 그동안 로그를 끕니다.
+    level = logger.level
+    if not has_openpyxl:
+        logger.setLevel(logging.CRITICAL)
+    runs = iter(range(1_000_000))
+
+    def new_log():
+        prefix_util.close_excel_log()
+        prefix_util.init_excel_log(os.path.join(tmp_dir, f"log_{next(runs)}.xlsx"))
+        prefix_util.get_task_log()
+
+    def write_all():
+        for row in rows:
+            log_to_excel(*row)
+
+    def write_and_journal():
+        write_all()
+        _wait_journal(prefix_util.get_task_log(), len(rows))
+
+    try:
+        # log_to_excel 자체(큐에 넣기)의 비용
+        results["log/write"] = measure("log/write", len(rows), write_all, new_log, args.repeat)
+        # 백그라운드 스레드가 저널(CSV)에 모두 기록할 때까지
+        results["log/journal"] = measure("log/journal", len(rows), write_and_journal, new_log, args.repeat)
+
+        if has_openpyxl:
+            def fill_log():
+                # 엑셀 변환만 재도록 새 로그에 모든 행을 저널까지 기록해 둡니다.
+                new_log()
+                write_and_journal()
+
+            # close_excel_log()가 저널을 엑셀로 변환하는 시간
+            results["log/xlsx"] = measure("log/xlsx", len(rows), prefix_util.close_excel_log, fill_log,
+                                          args.repeat)
+        else:
+            print(f"  {'log/xlsx':28s} openpyxl이 없어 건너뜁니다.")
+    finally:
+        prefix_util.close_excel_log()
+        logger.setLevel(level)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+BENCHES = {"domain": bench_domain, "match": bench_match, "log": bench_log}
+
+
+def compare(results, baseline, tolerance):
+    """
+    기준 결과와 ops/sec를 비교해 출력하고, 회귀한 경우 이름 목록을 반환합니다.
+    """
+    regressions = []
+    print(f"\n[기준 비교] 허용 {tolerance:.0%}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("ops_per_sec"):
+            print(f"  {name:28s} (기준 없음)")
+            continue
+        ratio = result["ops_per_sec"] / base["ops_per_sec"]
+        mem_ratio = result["peak_kb"] / base["peak_kb"] if base.get("peak_kb") else None
+        mark = ""
+        if ratio < 1 - tolerance:
+            mark = "  ⚠ 회귀"
+            regressions.append(name)
+        mem = f"  메모리 x{mem_ratio:.2f}" if mem_ratio is not None else ""
+        print(f"  {name:28s} 속도 x{ratio:.2f}{mem}{mark}")
+    return regressions
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.quick:
+        args.pattern_sizes = "100,10000"
+        args.urls = min(args.urls, 5000)
+        args.log_rows = min(args.log_rows, 2000)
+    args.pattern_sizes = [int(size) for size in args.pattern_sizes.split(",") if size.strip()]
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = [case for case in cases if case not in BENCHES]
+    if unknown:
+        print(f"알 수 없는 경우 묶음: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    results = {}
+    for case in cases:
+        BENCHES[case](args, random.Random(args.seed), results)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "pattern_sizes": args.pattern_sizes,
+            "urls": args.urls,
+            "log_rows": args.log_rows,
+            "match_ratio": args.match_ratio,
+            "tistory_ratio": args.tistory_ratio,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("⚠ 기준 파일과 설정(규모/비율/반복)이 달라 비교 결과가 정확하지 않을 수 있습니다.")
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        report["baseline"] = {"path": args.baseline, "tolerance": args.tolerance, "regressions": regressions}
+
+    output = args.output or os.path.join(
+        OUTPUT_DIR, f"bench_micro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    for path in filter(None, [output, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {path}")
+
+    if regressions:
+        print(f"⚠ 기준보다 느려진 경우: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
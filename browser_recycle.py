@@ -0,0 +1,164 @@
+"""
+브라우저 재활용 (크롬 메모리, 작업 수, 사용 시간 기준. 메모리 측정에는 psutil 필요)
+"""
+import time
+import logging
+import threading
+
+from label_metrics import metrics
+
+logger = logging.getLogger("main_logger")
+
+# --- 재활용 설정 ---
+# 기본은 모두 꺼져 있으며, --recycle-rss-mb / --recycle-tasks / --recycle-hours로 켭니다.
+# 크롬 프로세스 트리의 RSS 합이 이 값(MB)을 넘으면 재시작합니다. (0 이하면 끔)
+RECYCLE_RSS_MB = 0
+# 이 작업 수마다 재시작합니다. (0 이하면 끔)
+RECYCLE_TASKS = 0
+# 브라우저를 연 뒤 이 시간(시간)이 지나면 재시작합니다. (0 이하면 끔)
+RECYCLE_HOURS = 0
+# 메모리를 재어 로그에 남기는 주기 (초)
+MEMORY_SAMPLE_INTERVAL = 60
+
+_psutil_warned = False
+# 세션(스레드 이름)별 마지막 측정값. 지표 파일의 info.browser_memory로 내보냅니다.
+_last_samples = {}
+_samples_lock = threading.Lock()
+
+
+def _import_psutil():
+    global _psutil_warned
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        if not _psutil_warned:
+            _psutil_warned = True
+            logger.warning("⚠ psutil이 없어 크롬 메모리를 잴 수 없습니다. (작업 수/시간 기준으로만 재시작)")
+        return None
+
+
+def process_tree_rss(driver):
+    """
+    드라이버의 크롬드라이버 프로세스와 모든 하위 프로세스(크롬)의 RSS 합(bytes)을 반환합니다.
+    잴 수 없으면 None.
+    """
+    psutil = _import_psutil()
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except Exception:
+        logger.debug("크롬 프로세스 트리 확인 실패", exc_info=True)
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except Exception:
+            # 측정 중에 끝난 프로세스는 건너뜁니다.
+            continue
+    return total
+
+
+def memory_samples():
+    with _samples_lock:
+        return dict(_last_samples)
+
+
+metrics.add_info("browser_memory", memory_samples)
+
+
+class BrowserRecycler:
+    """
+    브라우저 하나의 메모리와 작업 수, 사용 시간을 보고 재시작할 때인지 알려줍니다.
+
+        recycler.start(driver)          # 작업창을 연 뒤 (같은 드라이버면 이어서 셈)
+        ...
+        reason = recycler.tick()        # 루프를 돌 때마다 (실패가 이어지거나 작업이 없을 때도)
+        reason = recycler.task_done()   # 작업 하나를 마칠 때마다
+        if reason: raise SessionLost(reason, task_count, recycle=True)
+    """
+
+    def __init__(self, max_rss_mb=RECYCLE_RSS_MB, max_tasks=RECYCLE_TASKS, max_hours=RECYCLE_HOURS,
+                 sample_interval=MEMORY_SAMPLE_INTERVAL):
+        self.max_rss_mb = max_rss_mb
+        self.max_tasks = max_tasks
+        self.max_hours = max_hours
+        self.sample_interval = sample_interval
+        self.driver = None
+        self.tasks = 0
+        self.started = None
+        self.last_rss_mb = None
+        self.peak_rss_mb = None
+        self._next_sample = 0.0
+
+    @property
+    def enabled(self):
+        return self.max_rss_mb > 0 or self.max_tasks > 0 or self.max_hours > 0
+
+    def start(self, driver):
+        """
+        driver를 재기 시작합니다. 같은 드라이버로 다시 부르면(작업창만 다시 열거나 작업 큐를 옮긴 경우)
+        브라우저는 그대로이므로 작업 수와 사용 시간을 이어서 셉니다.
+        """
+        if driver is self.driver and self.started is not None:
+            return
+        self.driver = driver
+        self.tasks = 0
+        self.started = time.monotonic()
+        self.last_rss_mb = None
+        self.peak_rss_mb = None
+        self._next_sample = self.started
+        self.sample()
+
+    def sample(self):
+        """
+        메모리를 재어 로그와 지표에 남기고 MB 단위로 반환합니다. 잴 수 없으면 None.
+        """
+        self._next_sample = time.monotonic() + self.sample_interval
+        rss = process_tree_rss(self.driver)
+        if rss is None:
+            return None
+        rss_mb = rss / (1024 * 1024)
+        self.last_rss_mb = rss_mb
+        self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss_mb)
+        hours = (time.monotonic() - self.started) / 3600
+        logger.info(f"🧠 크롬 메모리 {rss_mb:.0f}MB (최고 {self.peak_rss_mb:.0f}MB, "
+                    f"작업 {self.tasks}건, 사용 {hours:.1f}시간)")
+        with _samples_lock:
+            _last_samples[threading.current_thread().name] = {
+                "rss_mb": round(rss_mb, 1),
+                "peak_rss_mb": round(self.peak_rss_mb, 1),
+                "tasks": self.tasks,
+                "hours": round(hours, 2),
+            }
+        return rss_mb
+
+    def task_done(self):
+        """
+        작업 하나가 끝났음을 알리고, 브라우저를 재시작해야 하면 그 이유를, 아니면 None을 반환합니다.
+        """
+        self.tasks += 1
+        if self.started is None:
+            return None
+        if self.max_tasks > 0 and self.tasks >= self.max_tasks:
+            return f"작업 {self.tasks}건 처리"
+        return self.tick()
+
+    def tick(self):
+        """
+        작업 성공 여부와 관계없이 루프마다 부릅니다. 사용 시간과 (sample_interval마다) 메모리를 확인해
+        브라우저를 재시작해야 하면 그 이유를, 아니면 None을 반환합니다.
+        """
+        if self.started is None:
+            return None
+        hours = (time.monotonic() - self.started) / 3600
+        if self.max_hours > 0 and hours >= self.max_hours:
+            return f"사용 {hours:.1f}시간 경과"
+        if time.monotonic() >= self._next_sample:
+            rss_mb = self.sample()
+            if rss_mb is not None and 0 < self.max_rss_mb <= rss_mb:
+                return f"크롬 메모리 {rss_mb:.0f}MB ≥ {self.max_rss_mb}MB"
+        return None
@@ -0,0 +1,185 @@
+"""
+URL 목록 일괄 분류 (브라우저 없이)
+
+파일이나 표준 입력에서 한 줄에 하나씩 URL을 읽어, process_page와 같은 규칙
+(prefix_util.extract_domain_name + PrefixMatcher.match)으로 판정하고
+결과를 CSV로 바로바로 씁니다. 여러 프로세스에 묶음(batch) 단위로 나눠 처리하며,
+처리 중인 묶음 수를 제한하므로 입력 크기와 관계없이 메모리 사용량이 일정합니다.
+출력 순서는 입력 순서와 같습니다.
+
+사용 예:
+    python bulk_classify.py urls.txt -o result.csv --patterns-file patterns.csv
+    type urls.txt | python bulk_classify.py - --workers 8 > result.csv
+"""
+import os
+import sys
+import csv
+import time
+import argparse
+import multiprocessing
+from collections import deque
+
+from prefix_util import build_matcher, extract_domain_name, get_domain_rules, set_domain_rules
+
+# --- 일괄 분류 설정 ---
+# 프로세스에 한 번에 넘기는 URL 수
+BATCH_SIZE = 2000
+# 프로세스당 동시에 처리 중일 수 있는 묶음 수 (메모리 상한)
+INFLIGHT_PER_WORKER = 4
+# 처리량을 표준 오류로 알리는 주기 (초)
+PROGRESS_INTERVAL = 5
+
+OUTPUT_HEADER = ["href", "domain", "결과", "일치 단어"]
+
+_matcher = None
+
+
+def _init_worker(patterns, rules):
+    global _matcher
+    _matcher = build_matcher(patterns)
+    set_domain_rules(rules)
+
+
+def classify_batch(urls, matcher=None):
+    """
+    URL 목록을 판정해 [href, domain, 결과, 일치 단어] 행 목록을 반환합니다.
+    """
+    matcher = matcher or _matcher
+    rows = []
+    for url in urls:
+        # 도메인은 한 번만 뽑아 출력 열과 판정에 함께 씁니다.
+        domain_name = extract_domain_name(url)
+        is_match, word = matcher.match(domain_name)
+        rows.append([url, domain_name, "일치" if is_match else "불일치", word or ""])
+    return rows
+
+
+def read_batches(lines, batch_size=BATCH_SIZE):
+    batch = []
+    for line in lines:
+        url = line.strip()
+        if not url:
+            continue
+        batch.append(url)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Progress:
+    def __init__(self, interval=PROGRESS_INTERVAL, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.total = 0
+        self.matched = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    def add(self, rows):
+        self.total += len(rows)
+        self.matched += sum(1 for row in rows if row[2] == "일치")
+        now = time.monotonic()
+        if self.interval > 0 and now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    def report(self, final=False):
+        elapsed = time.monotonic() - self.started
+        prefix = "완료" if final else "진행"
+        print(f"[{prefix}] {self.total:,}건 (일치 {self.matched:,}건) / {elapsed:.1f}초 / "
+              f"{self.rate:,.0f}건/초", file=self.stream, flush=True)
+
+
+def classify_stream(lines, writer, patterns, workers=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    lines의 URL을 판정해 writer(csv.writer)에 씁니다. workers=0이면 현재 프로세스에서 처리합니다.
+    """
+    progress = progress or Progress(interval=0)
+    batches = read_batches(lines, batch_size)
+
+    if workers == 0:
+        matcher = build_matcher(patterns)
+        for batch in batches:
+            rows = classify_batch(batch, matcher)
+            writer.writerows(rows)
+            progress.add(rows)
+        return progress
+
+    workers = workers or os.cpu_count() or 1
+    max_inflight = workers * INFLIGHT_PER_WORKER
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(list(patterns), get_domain_rules().rules)) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.apply_async(classify_batch, (batch,)))
+            # 처리 중인 묶음이 가득 차면 가장 오래된 것부터 받아 씁니다. (입력 순서 유지)
+            while len(pending) >= max_inflight:
+                rows = pending.popleft().get()
+                writer.writerows(rows)
+                progress.add(rows)
+        while pending:
+            rows = pending.popleft().get()
+            writer.writerows(rows)
+            progress.add(rows)
+    return progress
+
+
+def load_patterns(patterns_file=None, rules_file=None):
+    """
+    실행 중인 자동화와 같은 패턴과 도메인 규칙을 씁니다. (로컬 파일, 없으면 스냅샷/구글시트)
+    """
+    from pattern_store import PatternStore
+    store = PatternStore(patterns_file, reload_interval=0, rules_file=rules_file)
+    if not store.load():
+        return None
+    return store.patterns
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="URL 목록 일괄 분류 (process_page와 같은 패턴 규칙)")
+    parser.add_argument("input", nargs="?", default="-", help="URL 목록 파일 (한 줄에 하나, '-'면 표준 입력)")
+    parser.add_argument("-o", "--output", default="-", help="결과 CSV 경로 ('-'면 표준 출력)")
+    parser.add_argument("--patterns-file", help="구글시트 대신 사용할 로컬 패턴 CSV 파일")
+    parser.add_argument("--domain-rules-file", help="도메인 규칙표 CSV (접미사,방식)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="프로세스 수 (기본: CPU 수, 0이면 현재 프로세스에서 처리)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--progress-interval", type=float, default=PROGRESS_INTERVAL,
+                        help="처리량 표시 주기 (초, 0이면 끝날 때만)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    patterns = load_patterns(args.patterns_file, args.domain_rules_file)
+    if not patterns:
+        print("패턴을 불러오지 못했습니다.", file=sys.stderr)
+        return 1
+
+    in_file = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8-sig")
+    out_file = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8-sig")
+    progress = Progress(args.progress_interval)
+    try:
+        writer = csv.writer(out_file)
+        writer.writerow(OUTPUT_HEADER)
+        classify_stream(in_file, writer, patterns, args.workers, args.batch_size, progress)
+    finally:
+        if in_file is not sys.stdin:
+            in_file.close()
+        if out_file is not sys.stdout:
+            out_file.close()
+    progress.report(final=True)
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+도메인 규칙표 (href → 패턴 비교에 쓰는 키)
+
+호스트 접미사마다 키를 뽑는 방식을 정해 둡니다.
+    subdomain : 접미사 앞의 서브도메인 (abc1234.tistory.com → abc1234)
+    path      : 주소의 첫 경로 (blog.naver.com/abc1234 → abc1234)
+    host      : 호스트 전체 (규칙이 없을 때와 같음)
+
+규칙은 CSV 파일(--domain-rules-file)이나 구글시트의 '도메인규칙' 탭에서 불러오며,
+없으면 DEFAULT_RULES(티스토리)만 씁니다. 파일/탭 형식은 첫 행이 헤더이고
+1열은 호스트 접미사, 2열은 방식입니다.
+
+    접미사,방식
+    tistory.com,subdomain
+    blog.naver.com,path
+
+DomainRules는 규칙을 접미사 사전으로 한 번만 만들어 두고,
+호스트의 점(.) 단위 접미사를 긴 것부터 한 번씩만 찾아 가장 구체적인 규칙을 적용합니다.
+규칙은 대소문자를 가리지 않고 찾지만, 키는 주소에 적힌 대소문자 그대로 뽑습니다.
+(패턴 비교는 예전처럼 대소문자를 구분합니다)
+"""
+import csv
+import logging
+
+logger = logging.getLogger("main_logger")
+
+RULE_SUBDOMAIN = "subdomain"
+RULE_PATH = "path"
+RULE_HOST = "host"
+RULE_KINDS = (RULE_SUBDOMAIN, RULE_PATH, RULE_HOST)
+
+# 규칙표가 없을 때 쓰는 기본 규칙 (예전 extract_domain_name의 티스토리 처리와 같음)
+DEFAULT_RULES = [("tistory.com", RULE_SUBDOMAIN)]
+
+
+def parse_rules(rows):
+    """
+    [접미사, 방식] 행들을 [(접미사, 방식), ...]로 정리합니다. 헤더 행은 넘기지 않아야 합니다.
+    형식이 잘못된 행은 경고를 남기고 건너뜁니다.
+    """
+    rules = []
+    for row in rows:
+        if not row or not row[0].strip():
+            continue
+        suffix = row[0].strip().lower().lstrip(".")
+        kind = row[1].strip().lower() if len(row) > 1 and row[1].strip() else RULE_HOST
+        if kind not in RULE_KINDS:
+            logger.warning(f"⚠ 알 수 없는 도메인 규칙 방식 '{kind}' ({suffix}). 건너뜁니다.")
+            continue
+        rules.append((suffix, kind))
+    return rules
+
+
+def load_rules_from_file(path):
+    """
+    로컬 CSV 파일에서 도메인 규칙을 읽습니다. 실패 시 None을 반환합니다.
+    """
+    logger.info(f"로컬 파일에서 도메인 규칙 불러오는 중: {path}")
+    try:
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            rules = parse_rules(list(csv.reader(f))[1:])
+        logger.info(f"✅ 도메인 규칙 {len(rules)}개 불러옴")
+        return rules
+    except Exception:
+        logger.error(f"❌ 도메인 규칙 파일 불러오기 실패: {path}", exc_info=True)
+        return None
+
+
+def split_host(netloc):
+    """
+    netloc에서 사용자 정보와 포트를 떼어낸 호스트를 대소문자 그대로 반환합니다.
+    (urlparse().hostname은 소문자로 바꾸므로 쓰지 않습니다)
+    """
+    host = netloc.rpartition("@")[2]
+    if host.startswith("["):
+        # IPv6 주소 ([::1]:8080)
+        host = host[:host.find("]") + 1]
+    else:
+        host = host.partition(":")[0]
+    return host.rstrip(".")
+
+
+class DomainRules:
+    """
+    도메인 규칙표를 접미사 사전으로 만들어 두고 href의 비교 키를 구합니다.
+    같은 접미사가 여러 번 나오면 먼저 나온 규칙을 씁니다.
+    """
+
+    def __init__(self, rules=None):
+        self._rules = {}
+        for suffix, kind in DEFAULT_RULES if rules is None else rules:
+            self._rules.setdefault(suffix, kind)
+        self.rules = list(self._rules.items())
+
+    def __len__(self):
+        return len(self._rules)
+
+    def __eq__(self, other):
+        return isinstance(other, DomainRules) and self.rules == other.rules
+
+    def find(self, host):
+        """
+        host에 적용할 (접미사, 방식)을 반환합니다. 없으면 (None, RULE_HOST).
+        """
+        rules = self._rules
+        if not rules:
+            return None, RULE_HOST
+        start = 0
+        while True:
+            suffix = host[start:]
+            kind = rules.get(suffix)
+            if kind is not None:
+                return suffix, kind
+            dot = host.find(".", start)
+            if dot < 0:
+                return None, RULE_HOST
+            start = dot + 1
+
+    def key(self, parsed):
+        """
+        urlparse() 결과에서 패턴과 비교할 키를 구합니다.
+        규칙이 없거나 키를 뽑을 수 없으면 netloc 전체를 반환합니다.
+        """
+        netloc = parsed.netloc
+        raw_host = split_host(netloc)
+        host = raw_host.lower()
+        if len(host) != len(raw_host):
+            # 소문자로 바꾸면 길이가 달라지는 문자가 있으면 위치를 맞출 수 없으므로 소문자 키를 씁니다.
+            raw_host = host
+        suffix, kind = self.find(host)
+        if kind == RULE_SUBDOMAIN:
+            sub = raw_host[:-len(suffix) - 1] if host != suffix else ""
+            if sub:
+                return sub
+        elif kind == RULE_PATH:
+            segment = parsed.path.strip("/").split("/", 1)[0]
+            if segment:
+                return segment
+        return netloc
@@ -0,0 +1,193 @@
+"""
+작업 실패 분류와 재시도 정책
+"""
+import time
+import random
+import logging
+
+from label_metrics import metrics
+
+logger = logging.getLogger("main_logger")
+
+# --- 실패 종류 ---
+FAIL_TIMEOUT = "timeout"
+FAIL_STALE = "stale"
+FAIL_NO_BUTTON = "no_button"
+FAIL_DRIVER_DEAD = "driver_dead"
+FAIL_SESSION_EXPIRED = "session_expired"
+FAIL_NETWORK = "network"
+# 작업 링크(span.h5 a)가 아예 나타나지 않음 (작업 큐가 비었음)
+FAIL_EMPTY_QUEUE = "empty_queue"
+FAIL_OTHER = "other"
+FAILURE_KINDS = (FAIL_TIMEOUT, FAIL_STALE, FAIL_NO_BUTTON, FAIL_DRIVER_DEAD,
+                 FAIL_SESSION_EXPIRED, FAIL_NETWORK, FAIL_EMPTY_QUEUE, FAIL_OTHER)
+FAILURE_LABELS = {
+    FAIL_TIMEOUT: "시간 초과",
+    FAIL_STALE: "요소 변경",
+    FAIL_NO_BUTTON: "버튼 없음",
+    FAIL_DRIVER_DEAD: "드라이버 종료",
+    FAIL_SESSION_EXPIRED: "세션 만료",
+    FAIL_NETWORK: "네트워크",
+    FAIL_EMPTY_QUEUE: "작업 없음",
+    FAIL_OTHER: "기타",
+}
+
+# 기다리지 않고 바로 다시 로그인하는 실패 종류
+RELOGIN_KINDS = (FAIL_DRIVER_DEAD, FAIL_SESSION_EXPIRED)
+
+# 예외 클래스 이름 → 실패 종류 (Selenium을 가져오지 않고 이름으로 구분합니다)
+_EXCEPTION_KINDS = {
+    "TimeoutException": FAIL_TIMEOUT,
+    "TimeoutError": FAIL_TIMEOUT,
+    "StaleElementReferenceException": FAIL_STALE,
+    "NoSuchElementException": FAIL_NO_BUTTON,
+    "ElementNotInteractableException": FAIL_NO_BUTTON,
+    "ElementClickInterceptedException": FAIL_NO_BUTTON,
+    "InvalidSessionIdException": FAIL_DRIVER_DEAD,
+    "NoSuchWindowException": FAIL_DRIVER_DEAD,
+    "MaxRetryError": FAIL_DRIVER_DEAD,
+    "ConnectionError": FAIL_NETWORK,
+}
+
+# --- 재시도 설정 ---
+# 첫 실패 후 대기 시간 (초). 연속 실패마다 BACKOFF_FACTOR배로 늘어납니다.
+BACKOFF_BASE = 1.0
+BACKOFF_FACTOR = 2.0
+# 대기 시간 상한 (초)
+BACKOFF_MAX = 60.0
+# 대기 시간을 ±이 비율만큼 무작위로 흔듭니다. (여러 세션이 동시에 다시 요청하지 않도록)
+BACKOFF_JITTER = 0.3
+# 연속 실패가 이 횟수에 이르면 작업창을 다시 엽니다. (0 이하면 끔)
+RENAVIGATE_AFTER = 5
+# 연속 실패가 이 횟수에 이르면 다시 로그인합니다. (0 이하면 끔)
+RELOGIN_AFTER = 10
+
+# 다음 단계: 백오프 후 재시도 / 작업창을 닫고 작업 시작부터 (로그인 유지) / 드라이버를 닫고 다시 로그인
+STEP_RETRY = "retry"
+STEP_RENAVIGATE = "renavigate"
+STEP_RELOGIN = "relogin"
+
+
+class TaskFailure(str):
+    """
+    실패한 작업의 결과 문자열입니다. str과 똑같이 쓰이며 kind에 실패 종류를 담습니다.
+    """
+
+    def __new__(cls, text, kind=FAIL_OTHER):
+        failure = super().__new__(cls, text)
+        failure.kind = kind
+        return failure
+
+    def __reduce__(self):
+        return TaskFailure, (str(self), self.kind)
+
+
+def classify_exception(exc):
+    """
+    예외를 실패 종류로 분류합니다. 상위 클래스 이름까지 확인합니다.
+    """
+    status = getattr(exc, "status", None)
+    if status in (401, 403) or (isinstance(status, int) and 300 <= status < 400):
+        return FAIL_SESSION_EXPIRED
+    for cls in type(exc).__mro__:
+        kind = _EXCEPTION_KINDS.get(cls.__name__)
+        if kind:
+            return kind
+    return FAIL_OTHER
+
+
+def failure_kind(action):
+    """
+    작업 결과가 실패면 실패 종류를, 성공이면 None을 반환합니다.
+    """
+    return action.kind if isinstance(action, TaskFailure) else None
+
+
+def failure_summary(counts=None):
+    """
+    실패 종류별 횟수를 '시간 초과 3 / 버튼 없음 1' 형식으로 반환합니다. (UI 표시용)
+    """
+    counts = metrics.failure_counts() if counts is None else counts
+    parts = [f"{FAILURE_LABELS[kind]} {counts[kind]}" for kind in FAILURE_KINDS if counts.get(kind)]
+    return " / ".join(parts) or "-"
+
+
+class FailurePolicy:
+    """
+    연속 실패 횟수를 세어 재시도 대기 시간(지수 백오프 + 지터)과
+    다음 단계(retry / renavigate / relogin)를 정합니다. 성공하면 처음부터 다시 셉니다.
+
+    기본 설정이면 연속 5회째에 작업창을 다시 열고 10회째에 다시 로그인하며,
+    그 뒤에도 실패가 이어지면 15회째 작업창, 20회째 로그인... 처럼 반복합니다.
+    대기 시간은 BACKOFF_MAX에서 멈추므로 장애가 길어져도 요청 간격이 일정하게 유지됩니다.
+
+    작업창을 다시 열거나 다시 로그인해도 연속 실패 횟수는 유지되므로,
+    같은 세션(SessionSupervisor)의 body가 여러 번 실행되더라도 정책 객체 하나를 함께 씁니다.
+    실패할 때마다 on_failure(kind)를 호출합니다. (UI 실패 횟수 표시 등)
+    """
+
+    def __init__(self, base_delay=BACKOFF_BASE, factor=BACKOFF_FACTOR, max_delay=BACKOFF_MAX,
+                 jitter=BACKOFF_JITTER, renavigate_after=RENAVIGATE_AFTER, relogin_after=RELOGIN_AFTER,
+                 on_failure=None):
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.renavigate_after = renavigate_after
+        self.relogin_after = relogin_after
+        self.on_failure = on_failure
+        self.consecutive = 0
+        self.last_kind = None
+
+    def success(self):
+        if self.consecutive:
+            logger.info(f"✅ 연속 실패 {self.consecutive}회 후 작업이 다시 성공했습니다.")
+        self.consecutive = 0
+        self.last_kind = None
+
+    def failure(self, kind):
+        """
+        실패를 기록하고 다음 단계(STEP_*)를 반환합니다.
+        """
+        self.consecutive += 1
+        self.last_kind = kind
+        metrics.record_failure(kind)
+        if self.on_failure:
+            self.on_failure(kind)
+        if kind in RELOGIN_KINDS:
+            return STEP_RELOGIN
+        count = self.consecutive
+        if self.relogin_after > 0:
+            if count % self.relogin_after == 0:
+                return STEP_RELOGIN
+            count %= self.relogin_after
+        if self.renavigate_after > 0 and count % self.renavigate_after == 0:
+            return STEP_RENAVIGATE
+        return STEP_RETRY
+
+    def delay(self):
+        """
+        현재 연속 실패 횟수에 맞는 대기 시간(초)을 반환합니다.
+        """
+        if self.consecutive <= 0:
+            return 0.0
+        # 지수가 너무 커지지 않도록 자릅니다. (어차피 max_delay에서 멈춤)
+        exponent = min(self.consecutive - 1, 32)
+        delay = min(self.max_delay, self.base_delay * self.factor ** exponent)
+        if self.jitter > 0:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, delay)
+
+    def wait(self, should_continue=None):
+        """
+        백오프만큼 기다립니다. should_continue()가 False가 되면 바로 돌아옵니다.
+        """
+        delay = self.delay()
+        logger.warning(f"⚠ 작업 실패 ({FAILURE_LABELS.get(self.last_kind, self.last_kind)}, "
+                       f"연속 {self.consecutive}회). {delay:.1f}초 후 다시 시도합니다.")
+        end = time.monotonic() + delay
+        with metrics.stage("backoff"):
+            while time.monotonic() < end:
+                if should_continue is not None and not should_continue():
+                    return
+                time.sleep(min(0.5, end - time.monotonic()))
@@ -1,29 +1,291 @@
+import json
 import logging
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from knw_Chromedriver_manager import Chromedriver_manager
+import os
+import tempfile
+import threading
+import time
+import weakref
+from datetime import datetime
+
+from label_log import OUTPUT_DIR
 
 # --- [전역 변수] ---
-LOGIN_URL = "http://label-craft.is.kakaocorp.com/login"
-HOME_URL = "http://label-craft.is.kakaocorp.com/tasks/45/"
+# LABEL_BASE_URL 환경 변수로 로컬 대역 서버(standin_server.py) 등을 가리킬 수 있습니다.
+BASE_URL = os.environ.get("LABEL_BASE_URL", "http://label-craft.is.kakaocorp.com").rstrip("/")
+LOGIN_URL = f"{BASE_URL}/login"
+HOME_URL = f"{BASE_URL}/tasks/45/"
 
 # --- [로거 설정] ---
 # logging.basicConfig는 main.py에서 한 번만 호출합니다.
 # 여기서는 main.py에서 설정한 로거를 이름으로 가져옵니다.
 logger = logging.getLogger("main_logger")
 
+# 여러 세션이 동시에 로그인할 때 드라이버 설치가 겹치지 않도록 합니다.
+_driver_install_lock = threading.Lock()
+# 여러 세션이 동시에 로그인 세션 파일을 교체하지 않도록 합니다.
+_session_save_lock = threading.Lock()
+
+# --- [세션 재사용 설정] ---
+# 로그인 쿠키를 저장해 두는 파일. 다음 실행 때 HOME_URL로 유효성만 확인하고 로그인을 건너뜁니다.
+SESSION_FILE = os.path.join(OUTPUT_DIR, "label_session.json")
+SESSION_VERSION = 1
+# 마지막으로 찾은 크롬드라이버 경로. 있으면 Chromedriver_manager.install()을 건너뜁니다.
+DRIVER_PATH_FILE = os.path.join(OUTPUT_DIR, "chromedriver_path.txt")
+# 저장된 세션으로 HOME_URL을 열었을 때 로그인 상태를 확인하는 최대 시간 (초)
+SESSION_CHECK_TIMEOUT = 5
+
+LOGGED_IN_SELECTOR = "#accordionSidebar > a > img"
+
+# --- [가벼운(lean) 크롬 설정] ---
+# 작업창에서는 'span.h5 a'만 읽으므로 이미지, 미디어, 글꼴은 받지 않습니다.
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg",
+]
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+# 필요 없는 백그라운드 기능을 끕니다.
+LEAN_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-remote-fonts",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+]
+
+# lean 모드 드라이버별 차단 URL 패턴 (창을 새로 열면 다시 적용해야 합니다)
+_lean_drivers = weakref.WeakKeyDictionary()
+
+# 이번 실행에서 찾은 크롬드라이버 경로 (세션끼리 공유)
+_driver_path = None
+
+
+def _read_cached_driver_path():
+    try:
+        with open(DRIVER_PATH_FILE, "r", encoding="utf-8") as f:
+            path = f.read().strip()
+    except OSError:
+        return None
+    return path if path and os.path.isfile(path) else None
+
+
+def resolve_driver_path(use_cache=False, refresh=False):
+    """
+    크롬드라이버 경로를 반환합니다. 실패 시 None.
+
+    한 번 찾은 경로는 이번 실행 동안 재사용하고, use_cache=True면 파일에 저장된 경로도 사용합니다.
+    refresh=True면 캐시를 무시하고 Chromedriver_manager.install()을 다시 호출합니다.
+    """
+    global _driver_path
+    with _driver_install_lock:
+        if not refresh:
+            if _driver_path and os.path.isfile(_driver_path):
+                return _driver_path
+            if use_cache:
+                cached = _read_cached_driver_path()
+                if cached:
+                    logger.debug(f"저장된 크롬드라이버 경로 사용: {cached}")
+                    _driver_path = cached
+                    return cached
+
+        from knw_Chromedriver_manager import Chromedriver_manager
+
+        start = time.monotonic()
+        path = Chromedriver_manager.install()
+        if not path:
+            return None
+        logger.info(f"크롬드라이버 준비 완료 ({time.monotonic() - start:.1f}초)")
+        _driver_path = path
+        if use_cache:
+            try:
+                os.makedirs(os.path.dirname(DRIVER_PATH_FILE), exist_ok=True)
+                with open(DRIVER_PATH_FILE, "w", encoding="utf-8") as f:
+                    f.write(path)
+            except OSError:
+                logger.warning("⚠ 크롬드라이버 경로 저장 실패", exc_info=True)
+        return path
+
+
+def session_profile_dir(profile_dir, session_id=None):
+    """
+    세션마다 별도의 크롬 사용자 데이터 폴더를 씁니다. (같은 폴더를 두 크롬이 동시에 쓸 수 없음)
+    """
+    if not profile_dir:
+        return None
+    if session_id is None or session_id == 1:
+        return os.path.abspath(profile_dir)
+    return os.path.abspath(f"{profile_dir}_{session_id}")
+
+
+def load_saved_session(username, path=SESSION_FILE):
+    """
+    저장된 쿠키 목록을 반환합니다. 없거나 다른 주소/사용자의 것이면 None.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (data.get("version") != SESSION_VERSION or data.get("base_url") != BASE_URL
+            or data.get("username") != username):
+        return None
+    now = time.time()
+    return [c for c in data.get("cookies", []) if not c.get("expiry") or c["expiry"] > now]
+
+
+def save_session(driver, username, path=SESSION_FILE):
+    """
+    로그인된 드라이버의 쿠키를 파일에 저장합니다.
+    """
+    data = {
+        "version": SESSION_VERSION,
+        "base_url": BASE_URL,
+        "username": username,
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "cookies": driver.get_cookies(),
+    }
+    tmp_path = None
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # 여러 세션이 동시에 저장해도 섞이지 않도록 호출마다 임시 파일을 따로 만들고,
+        # 교체(os.replace)는 한 번에 하나씩 합니다. (Windows에서 동시 교체 시 PermissionError)
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        with _session_save_lock:
+            os.replace(tmp_path, path)
+        tmp_path = None
+        logger.debug(f"로그인 세션 저장 완료: {path}")
+    except Exception:
+        logger.warning(f"⚠ 로그인 세션 저장 실패: {path}", exc_info=True)
+    finally:
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _is_logged_in(driver, timeout=SESSION_CHECK_TIMEOUT):
+    """
+    HOME_URL을 열어 로그인 상태(사이드바 로고)인지 확인합니다.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
+    driver.get(HOME_URL)
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, LOGGED_IN_SELECTOR))
+        )
+    except TimeoutException:
+        return False
+    return "/login" not in driver.current_url
+
+
+def _restore_session(driver, username, cookies):
+    """
+    저장된 쿠키(cookies가 있으면) 또는 크롬 프로필의 세션으로 로그인 상태를 복원합니다.
+    """
+    from selenium.common.exceptions import WebDriverException
+
+    if cookies:
+        # 쿠키는 같은 도메인의 페이지를 연 상태에서만 넣을 수 있습니다.
+        driver.get(LOGIN_URL)
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except WebDriverException:
+                logger.debug(f"쿠키 복원 실패: {cookie.get('name')}")
+    return _is_logged_in(driver)
+
+
+def apply_lean_blocking(driver):
+    """
+    lean 모드 드라이버라면 현재 창(탭)에 CDP 네트워크 차단을 적용합니다.
+    CDP 설정은 창마다 따로이므로 작업창으로 전환한 뒤에도 호출해야 합니다.
+    """
+    urls = _lean_drivers.get(driver)
+    if not urls:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+        logger.debug(f"네트워크 차단 적용 ({len(urls)}개 패턴)")
+    except Exception:
+        logger.warning("⚠ 네트워크 차단(CDP) 적용 실패. 크롬 설정만으로 계속합니다.", exc_info=True)
+
+
+def _start_chrome(options, use_cache):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import WebDriverException
+
+    driver_path = resolve_driver_path(use_cache)
+    if not driver_path:
+        return None
+    logger.debug(f"크롬드라이버 경로: {driver_path}")
+    try:
+        return webdriver.Chrome(service=Service(driver_path), options=options)
+    except WebDriverException:
+        if not use_cache:
+            raise
+        # 크롬이 업데이트되어 저장된 드라이버가 맞지 않을 수 있으므로 한 번 다시 설치합니다.
+        logger.warning("⚠ 저장된 크롬드라이버로 실행 실패. 드라이버를 다시 확인합니다.", exc_info=True)
+        driver_path = resolve_driver_path(use_cache, refresh=True)
+        if not driver_path:
+            return None
+        return webdriver.Chrome(service=Service(driver_path), options=options)
+
 
 # 로그인
-def label_login(username, password, headless=True):
+class LoginCancelled(Exception):
+    """
+    cancelled()가 True를 반환해 로그인을 중간에 멈출 때 발생합니다.
+    """
+
+
+def _check_cancelled(cancelled):
+    if cancelled and cancelled():
+        raise LoginCancelled()
+
+
+def label_login(username, password, headless=True, reuse_session=False, profile_dir=None,
+                lean=False, block_urls=None, cancelled=None):
     """
     라벨크래프트 사이트에 로그인합니다.
     성공 시 드라이버 객체를, 실패 시 None을 반환합니다.
+
+    reuse_session=True면 저장된 로그인 쿠키와 크롬드라이버 경로를 재사용합니다.
+    profile_dir을 주면 그 폴더를 크롬 사용자 데이터 폴더로 써서 세션이 프로필에 남습니다.
+    두 경우 모두 먼저 HOME_URL로 세션이 유효한지 확인하고, 아닐 때만 아이디/비밀번호로 로그인합니다.
+
+    lean=True면 이미지/미디어/글꼴과 block_urls 패턴을 받지 않고,
+    불필요한 백그라운드 기능을 끄며, DOM만 준비되면 페이지 로드를 끝냅니다(eager).
+
+    cancelled를 주면 단계 사이마다 확인해, True면 크롬을 닫고 None을 반환합니다.
+    (예: 동시에 불러오던 패턴이 실패했거나 사용자가 중지한 경우)
     """
+    # Selenium은 무거우므로 모듈을 가져올 때가 아니라 처음 로그인할 때 불러옵니다.
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     driver = None
     try:
         options = Options()
@@ -35,19 +297,42 @@ def label_login(username, password, headless=True):
             options.add_argument("--window-size=1920,1080")
             options.add_argument("--disable-gpu")
 
+        if profile_dir:
+            logger.info(f"크롬 프로필 폴더 사용: {profile_dir}")
+            options.add_argument(f"--user-data-dir={profile_dir}")
+
         # 팝업 차단 해제 (팝업 메뉴 대응)
-        options.add_experimental_option("prefs", {
+        prefs = {
             "profile.default_content_setting_values.popups": 1
-        })
+        }
+        if lean:
+            logger.info("가벼운(lean) 크롬 모드로 실행합니다.")
+            prefs.update(LEAN_PREFS)
+            for argument in LEAN_ARGUMENTS:
+                options.add_argument(argument)
+            options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", prefs)
 
-        driver_path = Chromedriver_manager.install()
-        if not driver_path:
+        _check_cancelled(cancelled)
+        driver = _start_chrome(options, reuse_session)
+        _check_cancelled(cancelled)
+        if not driver:
             logger.error("❌ Chromedriver를 설치하거나 찾는 데 실패했습니다.")
             return None
+        if lean:
+            _lean_drivers[driver] = LEAN_BLOCKED_URLS + list(block_urls or [])
+            apply_lean_blocking(driver)
 
-        logger.debug(f"크롬드라이버 경로: {driver_path}")
-        driver = webdriver.Chrome(service=Service(driver_path), options=options)
+        if reuse_session or profile_dir:
+            cookies = load_saved_session(username) if reuse_session else None
+            if (cookies or profile_dir) and _restore_session(driver, username, cookies):
+                logger.info("✅ 저장된 세션으로 로그인 상태를 확인했습니다. (로그인 생략)")
+                return driver
+            logger.info("저장된 세션이 없거나 만료되어 다시 로그인합니다.")
+            if cookies:
+                driver.delete_all_cookies()
 
+        _check_cancelled(cancelled)
         logger.info(f"{LOGIN_URL} 페이지로 이동합니다...")
         driver.get(LOGIN_URL)
 
@@ -67,13 +352,24 @@ def label_login(username, password, headless=True):
 
         # 로그인 성공 대기 (사이드바 로고 이미지 확인)
         logger.debug("로그인 성공 대기 중... (사이드바 로고 확인)")
-        WebDriverWait(driver, 60).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "#accordionSidebar > a > img"))
-        )
+        logged_in = EC.presence_of_element_located((By.CSS_SELECTOR, LOGGED_IN_SELECTOR))
+
+        def _logged_in_or_cancelled(d):
+            _check_cancelled(cancelled)
+            return logged_in(d)
+
+        WebDriverWait(driver, 60).until(_logged_in_or_cancelled)
         logger.info("✅ 라벨크래프트 로그인에 성공했습니다.")
+        if reuse_session:
+            save_session(driver, username)
 
         return driver
 
+    except LoginCancelled:
+        logger.info("로그인을 취소했습니다.")
+        if driver:
+            driver.quit()
+        return None
     except Exception:
         logger.error(f"❌ [ERROR] 라벨크래프트 로그인 실패", exc_info=True)
         if driver:
@@ -88,4 +384,8 @@ def close_chrome(driver):
     """
     if driver:
         logger.info("크롬 드라이버를 종료합니다.")
-        driver.quit()
\ No newline at end of file
+        try:
+            driver.quit()
+        except Exception:
+            # 이미 죽은 드라이버(감시 스레드가 강제 종료한 경우 등)는 정리만 합니다.
+            logger.debug("드라이버 종료 중 오류 (무시)", exc_info=True)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import argparse
+
+from pattern_store import RELOAD_INTERVAL
+from page_ready import MIN_TASK_INTERVAL
+from label_metrics import EXPORT_INTERVAL
+from session_watchdog import TASK_TIMEOUT
+from browser_recycle import RECYCLE_RSS_MB, RECYCLE_TASKS, RECYCLE_HOURS
+from task_queues import EMPTY_COOLDOWN
+
+
+def build_parser(description):
+    """
+    ui_main.py와 main_2.py가 함께 쓰는 명령행 옵션을 정의합니다.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--patterns-file", help="구글시트 대신 사용할 로컬 패턴 CSV 파일")
+    parser.add_argument("--domain-rules-file",
+                        help="도메인 규칙표 CSV (접미사,방식). 없으면 구글시트 '도메인규칙' 탭 또는 기본 규칙")
+    parser.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL,
+                        help="실행 중 패턴 자동 갱신 주기 (초, 0이면 끔)")
+    parser.add_argument("--min-interval", type=float, default=MIN_TASK_INTERVAL,
+                        help="작업 시작 간 최소 간격 (초)")
+    parser.add_argument("--observer", action="store_true",
+                        help="다음 작업 대기에 페이지 MutationObserver 신호를 사용")
+    parser.add_argument("--fast-path", action="store_true",
+                        help="href 읽기와 미루기를 execute_script 한 번씩으로 처리 ('E'는 실제 키 입력, 실패 시 단계별 방식)")
+    parser.add_argument("--metrics-interval", type=float, default=EXPORT_INTERVAL,
+                        help="단계별 소요 시간 지표 파일 저장 주기 (초, 0이면 종료 시에만)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING"],
+                        help="로그 레벨 (기본 INFO: 작업당 요약 한 줄, DEBUG: 단계별 상세)")
+    parser.add_argument("--trace-match", action="store_true",
+                        help="도메인마다 확인한 패턴 후보를 모두 로그로 남김")
+    parser.add_argument("--reuse-session", action="store_true",
+                        help="로그인 쿠키와 크롬드라이버 경로를 저장해 다음 실행 때 재사용 (save 폴더에 쿠키가 저장됨)")
+    parser.add_argument("--profile-dir",
+                        help="전용 크롬 사용자 데이터 폴더 (세션 2부터는 폴더명_번호 사용)")
+    parser.add_argument("--lean", action="store_true",
+                        help="가벼운 크롬 모드 (이미지/미디어/글꼴 차단, 백그라운드 기능 끔, eager 로드)")
+    parser.add_argument("--block-url", action="append", default=[], metavar="PATTERN",
+                        help="lean 모드에서 추가로 차단할 URL 패턴 (예: *googletagmanager.com*, 여러 번 지정 가능)")
+    parser.add_argument("--task-timeout", type=float, default=TASK_TIMEOUT,
+                        help="작업 하나가 이 시간(초)을 넘기면 드라이버를 재시작 (0이면 감시 끔)")
+    parser.add_argument("--recycle-rss-mb", type=float, default=RECYCLE_RSS_MB,
+                        help="크롬 프로세스 메모리(RSS 합)가 이 값(MB)을 넘으면 작업 사이에 브라우저 재시작 "
+                             "(예: 2048, 기본 0은 끔, psutil 필요)")
+    parser.add_argument("--recycle-tasks", type=int, default=RECYCLE_TASKS,
+                        help="이 작업 수마다 브라우저 재시작 (기본 0은 끔)")
+    parser.add_argument("--recycle-hours", type=float, default=RECYCLE_HOURS,
+                        help="브라우저를 연 뒤 이 시간이 지나면 재시작 (예: 24, 기본 0은 끔)")
+    parser.add_argument("--queues", metavar="SPEC",
+                        help="작업할 큐 목록 '번호[:가중치[:우선순위]],...' (예: 45:2:10,46,47). 없으면 tasks/45만")
+    parser.add_argument("--queues-file",
+                        help="작업 큐 목록 CSV (큐번호,이름,가중치,우선순위,패턴파일). --queues보다 우선")
+    parser.add_argument("--empty-cooldown", type=float, default=EMPTY_COOLDOWN,
+                        help="작업이 없는 큐를 다시 쓰기까지 다른 큐로 옮겨 두는 시간 (초)")
+    parser.add_argument("--history-db",
+                        help="실행 기록 SQLite 경로 (기본: save/history.sqlite3, 조회는 run_history.py)")
+    parser.add_argument("--no-history", action="store_true", help="실행 기록 DB에 저장하지 않음")
+    parser.add_argument("--sessions", type=int, default=1,
+                        help="동시에 실행할 브라우저 세션 수")
+    return parser
+
+
+def apply_log_options(args):
+    """
+    --log-level / --trace-match / --history-db / --no-history 옵션을 적용합니다.
+    """
+    import logging
+    from label_log import set_log_level
+    from prefix_util import set_match_trace
+    from run_history import init_history
+
+    set_log_level(getattr(logging, args.log_level))
+    set_match_trace(args.trace_match)
+    init_history(args.history_db, enabled=not args.no_history)
@@ -1,4 +1,7 @@
 import logging
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 import sys  # <--- sys 임포트
 from datetime import datetime
@@ -33,20 +36,35 @@ def resource_path(relative_path):
 
 
 # --- [로그 설정 상수] ---
-LOG_LEVEL = logging.DEBUG
-LOG_FORMAT = '[%(levelname)s] (%(name)s) %(asctime)s - %(message)s'
+# 기본은 작업당 요약 한 줄(INFO)입니다. 단계별 상세 로그가 필요하면 DEBUG로 바꿉니다.
+LOG_LEVEL = logging.INFO
+LOG_FORMAT = '[%(levelname)s] (%(name)s) [%(threadName)s] %(asctime)s - %(message)s'
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 SAVE_FOLDER = "save"
+# 로그 파일이 이 크기(바이트)를 넘으면 새 파일로 넘깁니다. 최대 LOG_BACKUP_COUNT개까지 보관합니다.
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 20
 
 # [수정] 쓰기 경로는 get_base_path()를 기준으로 합니다.
 # .exe 파일이 있는 폴더 하위에 'save' 폴더를 만듭니다.
 OUTPUT_DIR = os.path.join(get_base_path(), SAVE_FOLDER)
 
+_listener = None
+_handlers = []
+# 처음 핸들러를 만들 때 정한 로그 파일 경로. 다시 호출해도 이 경로를 돌려줍니다.
+_log_filename = None
 
-def setup_logger():
+
+def setup_logger(level=LOG_LEVEL):
     """
-    'main_logger'라는 이름의 로거를 설정하고 반환합니다.
+    'main_logger'라는 이름의 로거를 설정하고 (로거, 로그 파일 경로)를 반환합니다.
+
+    로거에는 QueueHandler만 붙이고, 콘솔/파일 출력은 QueueListener 스레드가 맡습니다.
+    따라서 작업 스레드는 로그 때문에 디스크나 콘솔 I/O를 기다리지 않습니다.
+    로그 파일은 OUTPUT_DIR에 LOG_MAX_BYTES 크기 단위로 순환됩니다.
+    두 번째 호출부터는 핸들러를 새로 만들지 않고 처음 만든 로그 파일 경로를 반환합니다.
     """
+    global _listener, _log_filename
 
     # [수정] OUTPUT_DIR 사용
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -58,20 +76,46 @@ def setup_logger():
     # [수정] OUTPUT_DIR 사용
     LOG_FILENAME = os.path.join(OUTPUT_DIR, log_file_name)
 
-    # 3. 로거 가져오기 (이하 동일)
+    # 3. 로거 가져오기
     logger = logging.getLogger("main_logger")
-    logger.setLevel(LOG_LEVEL)
-    formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
+    logger.setLevel(level)
+
+    if _listener is None and not logger.hasHandlers():
+        formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
 
-    if not logger.hasHandlers():
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(LOG_LEVEL)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
 
-        file_handler = logging.FileHandler(LOG_FILENAME, mode='a', encoding='utf-8')
-        file_handler.setLevel(LOG_LEVEL)
+        file_handler = RotatingFileHandler(LOG_FILENAME, mode='a', maxBytes=LOG_MAX_BYTES,
+                                           backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
 
-    return logger, LOG_FILENAME
\ No newline at end of file
+        _handlers[:] = [console_handler, file_handler]
+        _log_filename = LOG_FILENAME
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logger)
+
+    return logger, _log_filename
+
+
+def set_log_level(level, console_level=None):
+    """
+    실행 중 로그 레벨을 바꿉니다. console_level을 주면 콘솔 출력만 따로 제한합니다.
+    """
+    logging.getLogger("main_logger").setLevel(level)
+    for handler in _handlers:
+        if isinstance(handler, logging.StreamHandler) and not isinstance(handler, logging.FileHandler):
+            handler.setLevel(console_level if console_level is not None else logging.NOTSET)
+
+
+def shutdown_logger():
+    """
+    큐에 남은 로그를 모두 출력하고 QueueListener를 멈춥니다.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import socket
+import threading
+import logging
+from collections import deque, Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from label_log import OUTPUT_DIR
+
+logger = logging.getLogger("main_logger")
+
+# --- 지표 설정 ---
+# 단계별로 보관하는 최근 측정값 개수 (백분위 계산 대상)
+WINDOW_SIZE = 1000
+# 최근 처리량 계산 구간 (초)
+RATE_WINDOW = 300
+# 지표 파일을 쓰는 주기 (초). 0 이하면 종료 시에만 씁니다.
+EXPORT_INTERVAL = 30
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """
+    정렬된 값 목록에서 최근접 순위(nearest-rank) 방식으로 백분위 값을 구합니다.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class StageMetrics:
+    """
+    process_page 단계와 작업 루프의 소요 시간(monotonic)을 단계별로 모읍니다.
+
+    단계마다 최근 WINDOW_SIZE개의 측정값을 보관해 p50/p95/p99를 계산하고,
+    작업 수와 작업 결과별 개수, 처리량(시간당 성공한 작업 수)을 셉니다.
+    여러 세션 스레드에서 함께 써도 됩니다.
+
+    실행 시간과 처리량은 begin_run()부터 잽니다. (UI에서 시작을 누르기 전의 대기 시간 제외)
+    """
+
+    def __init__(self, window_size=WINDOW_SIZE):
+        self.window_size = window_size
+        self._lock = threading.Lock()
+        self._info = {}
+        # begin_task() 이후 이 스레드에서 기록된 단계 시간 (실행 기록 DB용)
+        self._local = threading.local()
+        self.begin_run()
+
+    def begin_run(self):
+        """
+        실행 하나(UI의 시작 버튼, 콘솔 실행)를 새로 시작합니다. 모든 측정값과 작업 수를 지우고
+        실행 시간을 지금부터 다시 잽니다. add_info()로 등록한 항목은 그대로 둡니다.
+        """
+        with self._lock:
+            self.started_at = datetime.now()
+            self._started = time.monotonic()
+            self._samples = {}
+            self._totals = Counter()
+            self._counts = Counter()
+            self._actions = Counter()
+            self._failures = Counter()
+            self._task_times = deque()
+            # 시도한 작업 수(실패 포함)와 성공한 작업 수
+            self.tasks_total = 0
+            self.tasks_ok = 0
+
+    def add_info(self, name, provider):
+        """
+        snapshot()의 "info" 항목에 provider()의 결과를 name으로 넣습니다. (예: 캐시 통계)
+        """
+        self._info[name] = provider
+
+    def record(self, stage, seconds):
+        current = getattr(self._local, "stages", None)
+        if current is not None:
+            current[stage] = current.get(stage, 0.0) + seconds
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window_size)
+            samples.append(seconds)
+            self._totals[stage] += seconds
+            self._counts[stage] += 1
+
+    @contextmanager
+    def stage(self, name):
+        """
+        with 블록의 소요 시간을 name 단계로 기록합니다.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, time.monotonic() - start)
+
+    def begin_task(self):
+        """
+        이 스레드에서 작업 하나의 단계 시간을 따로 모으기 시작합니다. task_stages()로 꺼냅니다.
+        """
+        self._local.stages = {}
+
+    def task_stages(self):
+        """
+        begin_task() 이후 이 스레드에서 기록된 {단계 이름: 초}를 반환합니다.
+        """
+        return dict(getattr(self._local, "stages", None) or {})
+
+    def record_task(self, action, ok=True):
+        """
+        작업 하나의 결과를 셉니다. 처리량에는 성공한 작업(ok=True)만 들어갑니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.tasks_total += 1
+            self._actions[action] += 1
+            if not ok:
+                return
+            self.tasks_ok += 1
+            self._task_times.append(now)
+            while self._task_times and now - self._task_times[0] > RATE_WINDOW:
+                self._task_times.popleft()
+
+    def record_failure(self, kind):
+        """
+        실패 종류(failure_policy.FAILURE_KINDS)별 횟수를 셉니다.
+        """
+        with self._lock:
+            self._failures[kind] += 1
+
+    def failure_counts(self):
+        with self._lock:
+            return dict(self._failures)
+
+    def snapshot(self):
+        """
+        현재 지표를 dict로 반환합니다. (시간 단위: 초)
+        """
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            totals = dict(self._totals)
+            counts = dict(self._counts)
+            actions = dict(self._actions)
+            failures = dict(self._failures)
+            tasks_total = self.tasks_total
+            tasks_ok = self.tasks_ok
+            now = time.monotonic()
+            recent = sum(1 for t in self._task_times if now - t <= RATE_WINDOW)
+
+        elapsed = now - self._started
+        info = {}
+        for name, provider in list(self._info.items()):
+            try:
+                info[name] = provider()
+            except Exception:
+                logger.debug(f"지표 정보 수집 실패: {name}", exc_info=True)
+        stages = {}
+        for name, values in samples.items():
+            stats = {
+                "count": counts[name],
+                "mean": totals[name] / counts[name],
+                "max": values[-1],
+            }
+            for pct in PERCENTILES:
+                stats[f"p{pct}"] = percentile(values, pct)
+            stages[name] = stats
+
+        return {
+            "hostname": socket.gethostname(),
+            "pid": os.getpid(),
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "uptime_seconds": elapsed,
+            "tasks_total": tasks_total,
+            "tasks_ok": tasks_ok,
+            "tasks_failed": tasks_total - tasks_ok,
+            "tasks_per_hour": tasks_ok / elapsed * 3600 if elapsed > 0 else 0.0,
+            "recent_tasks_per_hour": recent / min(elapsed, RATE_WINDOW) * 3600 if elapsed > 0 else 0.0,
+            "actions": actions,
+            "failures": failures,
+            "stages": stages,
+            "info": info,
+        }
+
+
+def to_prometheus(snapshot):
+    """
+    snapshot()의 결과를 Prometheus 텍스트 형식으로 바꿉니다.
+    """
+    lines = [
+        "# TYPE label_tasks_total counter",
+        f"label_tasks_total {snapshot['tasks_total']}",
+        "# TYPE label_tasks_ok_total counter",
+        f"label_tasks_ok_total {snapshot['tasks_ok']}",
+        "# TYPE label_tasks_per_hour gauge",
+        f"label_tasks_per_hour {snapshot['tasks_per_hour']:.3f}",
+        "# TYPE label_recent_tasks_per_hour gauge",
+        f"label_recent_tasks_per_hour {snapshot['recent_tasks_per_hour']:.3f}",
+        "# TYPE label_action_total counter",
+    ]
+    for action, count in sorted(snapshot["actions"].items()):
+        label = action.replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'label_action_total{{action="{label}"}} {count}')
+
+    lines.append("# TYPE label_failure_total counter")
+    for kind, count in sorted(snapshot.get("failures", {}).items()):
+        lines.append(f'label_failure_total{{kind="{kind}"}} {count}')
+
+    lines.append("# TYPE label_stage_seconds summary")
+    for name, stats in sorted(snapshot["stages"].items()):
+        for pct in PERCENTILES:
+            lines.append(f'label_stage_seconds{{stage="{name}",quantile="{pct / 100}"}} {stats[f"p{pct}"]:.6f}')
+        lines.append(f'label_stage_seconds_sum{{stage="{name}"}} {stats["mean"] * stats["count"]:.6f}')
+        lines.append(f'label_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+
+    # info 항목 중 {이름: {필드: 숫자}} 형태는 게이지로 내보냅니다. (예: label_cache_hits{name="domain"})
+    for group, entries in sorted(snapshot.get("info", {}).items()):
+        if not isinstance(entries, dict):
+            continue
+        for name, fields in sorted(entries.items()):
+            if not isinstance(fields, dict):
+                continue
+            for field, value in sorted(fields.items()):
+                if isinstance(value, (int, float)):
+                    lines.append(f'label_{group}_{field}{{name="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """
+    interval마다 지표를 OUTPUT_DIR의 JSON 파일과 Prometheus 텍스트 파일로 씁니다.
+    파일 이름은 start()할 때 metrics.started_at(begin_run 시각)으로 정하므로 실행마다 새 파일에 씁니다.
+    """
+
+    def __init__(self, metrics, interval=EXPORT_INTERVAL, output_dir=OUTPUT_DIR):
+        self.metrics = metrics
+        self.interval = interval
+        self.output_dir = output_dir
+        self.json_path = None
+        self.prom_path = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _name_files(self):
+        timestamp_str = self.metrics.started_at.strftime("%Y%m%d_%H%M%S")
+        self.json_path = os.path.join(self.output_dir, f"metrics_{timestamp_str}.json")
+        self.prom_path = os.path.join(self.output_dir, f"metrics_{timestamp_str}.prom")
+
+    def export(self):
+        if self.json_path is None:
+            self._name_files()
+        try:
+            snapshot = self.metrics.snapshot()
+            os.makedirs(os.path.dirname(self.json_path), exist_ok=True)
+            _write_atomic(self.json_path, json.dumps(snapshot, ensure_ascii=False, indent=2))
+            _write_atomic(self.prom_path, to_prometheus(snapshot))
+        except Exception:
+            logger.error("❌ 지표 파일 저장 실패", exc_info=True)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._name_files()
+        self._stop_event.clear()
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="MetricsExporter", daemon=True)
+            self._thread.start()
+        logger.info(f"작업 지표 파일: {self.json_path}")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.export()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.export()
+
+
+# 모든 세션이 함께 쓰는 기본 지표 저장소
+metrics = StageMetrics()
@@ -0,0 +1,162 @@
+import csv
+import os
+import queue
+import threading
+import time
+import atexit
+import logging
+
+logger = logging.getLogger("main_logger")
+
+# 큐에서 이 개수만큼 모이거나 FLUSH_INTERVAL이 지나면 저널에 기록합니다.
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 1.0
+# 저널 → 엑셀 변환 주기 (초). 0 이하면 종료 시에만 변환합니다.
+XLSX_INTERVAL = 300.0
+
+_STOP = object()
+
+
+def journal_path_for(xlsx_path):
+    """
+    엑셀 로그 경로에 대응하는 저널(CSV) 경로를 반환합니다.
+    """
+    return os.path.splitext(xlsx_path)[0] + ".csv"
+
+
+def export_journal_to_xlsx(journal_path, xlsx_path, sheet_title="AutomationLog"):
+    """
+    저널(CSV)을 openpyxl write-only 모드로 엑셀 파일에 옮겨 씁니다.
+    비정상 종료 후 남은 저널을 수동으로 변환할 때도 사용할 수 있습니다.
+    """
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    with open(journal_path, "r", newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            sheet.append(row)
+
+    # 저장 도중 죽어도 기존 엑셀이 깨지지 않도록 임시 파일에 쓰고 교체합니다.
+    tmp_path = xlsx_path + ".tmp"
+    workbook.save(tmp_path)
+    os.replace(tmp_path, xlsx_path)
+
+
+class TaskLogWriter:
+    """
+    작업 로그를 백그라운드 스레드에서 기록합니다.
+
+    write()는 큐에 넣기만 하므로 작업마다 드는 비용이 일정합니다.
+    행은 줄 단위 저널(CSV)에 추가 기록(append + fsync)되고,
+    엑셀 파일은 XLSX_INTERVAL마다, 그리고 close() 시에 저널로부터 만들어집니다.
+    """
+
+    def __init__(self, xlsx_path, header, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, xlsx_interval=XLSX_INTERVAL):
+        self.xlsx_path = xlsx_path
+        self.journal_path = journal_path_for(xlsx_path)
+        self.header = list(header)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.xlsx_interval = xlsx_interval
+        self.rows_written = 0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._dirty = False
+        self._thread = threading.Thread(target=self._run, name="TaskLogWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, row):
+        if self._closed:
+            logger.warning(f"⚠ 종료된 로그 기록기에 기록 시도: {row}")
+            return
+        self._queue.put(list(row))
+
+    def close(self, timeout=None):
+        """
+        남은 행을 모두 저널에 쓰고 엑셀로 변환한 뒤 스레드를 종료합니다.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        is_new = not os.path.exists(self.journal_path)
+        if is_new:
+            logger.info(f"새 작업 로그 저널 생성: {self.journal_path}")
+
+        last_export = time.monotonic()
+        with open(self.journal_path, "a", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            if is_new:
+                writer.writerow(self.header)
+                self._sync(f)
+
+            stopping = False
+            while not stopping:
+                batch = []
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                    while True:
+                        if item is _STOP:
+                            stopping = True
+                            break
+                        batch.append(item)
+                        if len(batch) >= self.batch_size:
+                            break
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+                if batch:
+                    try:
+                        writer.writerows(batch)
+                        self._sync(f)
+                        self.rows_written += len(batch)
+                        self._dirty = True
+                        logger.debug(f"작업 로그 {len(batch)}행 저널 기록 완료")
+                    except Exception:
+                        logger.error(f"❌ 작업 로그 저널 기록 실패. 데이터: {batch}", exc_info=True)
+
+                due = self.xlsx_interval > 0 and time.monotonic() - last_export >= self.xlsx_interval
+                if self._dirty and (due or stopping):
+                    self._export()
+                    last_export = time.monotonic()
+
+    @staticmethod
+    def _sync(f):
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _export(self):
+        try:
+            export_journal_to_xlsx(self.journal_path, self.xlsx_path)
+            self._dirty = False
+            logger.debug(f"엑셀 로그 저장 완료: {self.xlsx_path} ({self.rows_written}행)")
+        except Exception:
+            logger.error(f"❌ 엑셀 로그 변환 실패. 저널은 보존됩니다: {self.journal_path}", exc_info=True)
+
+
+_writers = []
+
+
+def open_task_log(xlsx_path, header, **kwargs):
+    """
+    TaskLogWriter를 생성하고, 인터프리터 종료 시 자동으로 close()되도록 등록합니다.
+    """
+    writer = TaskLogWriter(xlsx_path, header, **kwargs)
+    _writers.append(writer)
+    return writer
+
+
+@atexit.register
+def _close_all():
+    for writer in _writers:
+        writer.close(timeout=30)
@@ -1,64 +1,98 @@
-import logging
 import time
-import os
-from datetime import datetime
+import threading
+from contextlib import nullcontext
+from functools import partial
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 
 # 로컬 모듈 임포트
-from label_admin import label_login, close_chrome, HOME_URL
-from prefix_util import load_patterns_from_gsheet, process_page
-
-# --- [로거 설정 (기존과 동일)] ---
-LOG_LEVEL = logging.DEBUG
-LOG_FORMAT = '[%(levelname)s] (%(name)s) %(asctime)s - %(message)s'
-DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
-SAVE_FOLDER = "save"
-os.makedirs(SAVE_FOLDER, exist_ok=True)
-timestamp_str = datetime.now().strftime("%m%d_%H%M%S")
-log_file_name = f"automation_{timestamp_str}.log"
-LOG_FILENAME = os.path.join(SAVE_FOLDER, log_file_name)
-logger = logging.getLogger("main_logger")
+from label_admin import label_login, close_chrome, session_profile_dir, apply_lean_blocking
+from prefix_util import process_page, init_excel_log, close_excel_log
+from session_watchdog import SessionSupervisor, SessionLost, is_driver_alive, handle_failure, handle_startup_failure
+from failure_policy import (FailurePolicy, classify_exception, failure_kind, failure_summary,
+                            FAIL_EMPTY_QUEUE, FAIL_OTHER, FAIL_TIMEOUT)
+from task_queues import build_scheduler
+from browser_recycle import BrowserRecycler
+from pattern_store import PatternStore
+from startup import PatternLoader, concurrent_startup
+from page_ready import TaskCursor, Pacer, MIN_TASK_INTERVAL
+from label_metrics import metrics, MetricsExporter
+from label_args import build_parser, apply_log_options
+from label_log import setup_logger
+
+# --- [로거 설정] ---
+# ui_main.py와 같은 label_log.setup_logger를 사용합니다. (비동기 큐 + 크기 순환 파일)
+logger, LOG_FILENAME = setup_logger()
 logger.info(f"텍스트 로그 파일이 {LOG_FILENAME} 경로에 저장됩니다.")
-logger.setLevel(LOG_LEVEL)
-formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
-if not logger.hasHandlers():
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(LOG_LEVEL)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    file_handler = logging.FileHandler(LOG_FILENAME, mode='a', encoding='utf-8')
-    file_handler.setLevel(LOG_LEVEL)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
 
 # --- [로거 설정 끝] ---
 
 
 # --- [수정된 main_task_loop 함수] ---
-def main_task_loop(driver, patterns):
+def main_task_loop(driver, pattern_store, min_interval=MIN_TASK_INTERVAL, use_observer=False,
+                   stop_event=None, fast_path=False, watchdog=None, policy=None, recycler=None,
+                   scheduler=None):
     """
     [수정된 메인 작업 루프]
     1. '작업 시작'을 단 한 번만 클릭.
     2. 새 창으로 단 한 번만 전환.
-    3. 새 창 안에서 process_page를 무한 반복 (새 작업이 자동으로 로드된다고 가정).
+    3. 새 창 안에서 process_page를 반복 (새 작업이 자동으로 로드된다고 가정).
+       stop_event가 설정되면 현재 작업을 마치고 종료합니다.
+    처리한 작업 수를 반환합니다.
+
+    watchdog을 넘기면 process_page마다 제한 시간을 두고, 드라이버가 죽거나 작업창이 닫히면
+    SessionLost를 발생시켜 SessionSupervisor가 다시 로그인하도록 합니다.
+
+    실패한 작업은 policy(FailurePolicy)에 따라 백오프 후 다시 시도하고, 연속 실패가 쌓이면
+    SessionLost로 작업창을 다시 열거나(relogin=False) 다시 로그인하도록 합니다.
+
+    recycler(BrowserRecycler)를 넘기면 작업마다 크롬 메모리/작업 수/사용 시간을 확인해
+    기준을 넘으면 SessionLost(recycle=True)로 브라우저를 새로 열게 합니다.
+
+    작업 큐는 scheduler(QueueScheduler)가 정합니다. 큐가 비었거나 더 높은 우선순위의 큐가 돌아오면
+    작업창을 닫고 SessionLost(relogin=False)로 다시 시작해 다른 큐를 받습니다.
     """
+    policy = policy or FailurePolicy()
+    scheduler = scheduler or build_scheduler()
+    session = threading.current_thread().name
+
+    def should_continue():
+        return stop_event is None or not stop_event.is_set()
+
+    task_count = 0
+    new_window = None
     try:
-        # 1. 메인 페이지(HOME_URL)로 이동 (최초 1회)
-        logger.info("🚀 메인 페이지로 이동하여 '작업 시작'을 클릭합니다...")
-        driver.get(HOME_URL)
-        original_window = driver.current_window_handle
+        # 1. 배정된 작업 큐의 메인 페이지로 이동 (최초 1회)
+        queue = scheduler.next_queue(session, should_continue)
+        if not should_continue():
+            return task_count
+        logger.info(f"🚀 작업 큐 {queue.name} 페이지로 이동하여 '작업 시작'을 클릭합니다...")
+        original_window = None
+        clicked = False
+        try:
+            driver.get(queue.home_url)
+            original_window = driver.current_window_handle
 
-        # 2. '작업 시작' 버튼 클릭 (최초 1회)
-        WebDriverWait(driver, 15).until(
-            EC.element_to_be_clickable((By.ID, "reviewStart"))
-        ).click()
-        logger.info("✅ '작업 시작' 클릭 완료. 새 창을 대기합니다...")
+            # 2. '작업 시작' 버튼 클릭 (최초 1회)
+            WebDriverWait(driver, 15).until(
+                EC.element_to_be_clickable((By.ID, "reviewStart"))
+            ).click()
+            clicked = True
+            logger.info("✅ '작업 시작' 클릭 완료. 새 창을 대기합니다...")
 
-        # 3. 새 창 대기 및 전환 (최초 1회)
-        WebDriverWait(driver, 15).until(EC.number_of_windows_to_be(2))
+            # 3. 새 창 대기 및 전환 (최초 1회)
+            WebDriverWait(driver, 15).until(EC.number_of_windows_to_be(2))
+        except Exception as e:
+            # 드라이버가 살아 있으면 실패 정책에 따라 기다렸다가 작업 시작부터 다시 합니다.
+            logger.error("❌ 작업창을 여는 중 오류", exc_info=True)
+            kind = classify_exception(e)
+            if original_window is not None and not clicked and kind == FAIL_TIMEOUT and scheduler.switchable:
+                # '작업 시작' 버튼이 없는 큐는 빈 큐로 보고, 다시 시작할 때 다른 큐를 받게 합니다.
+                scheduler.mark_empty(queue)
+            handle_startup_failure(policy, kind, "작업창 열기 실패", task_count,
+                                   driver, original_window, should_continue)
 
         all_windows = driver.window_handles
         new_window = None
@@ -68,70 +102,201 @@ def main_task_loop(driver, patterns):
                 break
 
         if not new_window:
-            logger.error("❌ 새 작업창을 찾지 못했습니다. 프로그램을 종료합니다.")
-            return
+            logger.error("❌ 새 작업창을 찾지 못했습니다.")
+            handle_startup_failure(policy, FAIL_OTHER, "새 작업창을 찾지 못함", task_count,
+                                   driver, original_window, should_continue)
 
         # [핵심] 새 작업창으로 영구적으로 전환합니다.
         driver.switch_to.window(new_window)
+        apply_lean_blocking(driver)
         logger.info(f"✅ 새 작업창으로 영구 전환 완료 (Handle: {new_window})")
         logger.info("이제 이 창 안에서 작업이 자동으로 갱신된다고 가정하고 루프를 시작합니다.")
 
         # 4. [수정] 새 창 안에서 무한 루프 시작
-        while True:
+        if recycler:
+            recycler.start(driver)
+        cursor = TaskCursor()
+        pacer = Pacer(min_interval)
+        while should_continue():
+            with metrics.stage("pacing"):
+                pacer.wait()
+            loop_start = time.monotonic()
             logger.info("=" * 50)
             logger.info("🚀 다음 작업 처리를 시작합니다 (현재 창 갱신 대기)...")
 
             try:
+                # 실패가 이어지거나 작업이 없을 때도 크롬 메모리와 사용 시간은 계속 확인합니다.
+                recycle_reason = recycler.tick() if recycler else None
+                if recycle_reason:
+                    raise SessionLost(recycle_reason, task_count, recycle=True)
                 # 5. 새 창에서 작업 처리 (prefix_util.py 함수 호출)
                 #    (process_page가 끝나면 웹사이트가 자동으로 다음 작업을 로드한다고 가정)
-                process_page(driver, patterns)
+                matcher = scheduler.matcher(queue, pattern_store)
+                with watchdog.watch(driver) if watchdog else nullcontext():
+                    _, _, action = process_page(driver, matcher, cursor, use_observer, fast_path)
+                task_count += 1
+                metrics.record("loop", time.monotonic() - loop_start)
+                scheduler.record_task(queue, action)
 
-                # 6. 작업 처리 후, 웹사이트가 다음 작업을 로드할 시간을 줌
-                logger.info("✅ 작업 처리 완료. 다음 작업이 로드될 때까지 2초 대기...")
-                time.sleep(2)
+                kind = failure_kind(action)
+                if kind == FAIL_EMPTY_QUEUE and scheduler.switchable:
+                    scheduler.mark_empty(queue)
+                    scheduler.leave(f"작업 큐 {queue.name} 비어 있음", task_count, driver, new_window)
+                if kind is not None:
+                    handle_failure(policy, kind, task_count, driver, new_window, should_continue)
+                    continue
+                policy.success()
+                # 6. 다음 작업은 process_page가 링크가 바뀌는 것을 보고 기다립니다.
+                logger.info("✅ 작업 처리 완료. 다음 작업 로드를 기다립니다...")
+                recycle_reason = recycler.task_done() if recycler else None
+                if recycle_reason:
+                    raise SessionLost(recycle_reason, task_count, recycle=True)
+                if scheduler.should_switch(session):
+                    scheduler.leave("작업 큐 전환", task_count, driver, new_window)
 
-            except Exception:
+            except SessionLost as e:
+                raise SessionLost(e.reason, task_count, e.relogin, e.recycle)
+            except Exception as e:
+                if not is_driver_alive(driver, new_window):
+                    raise SessionLost("작업창 또는 드라이버 종료", task_count)
                 # process_page에서 오류가 나도 루프는 계속되어야 함
-                logger.error("❌ 작업 처리 중 오류 발생. 5초 후 다음 작업 시도.", exc_info=True)
-                # (오류 시 새로고침 등이 필요하면 여기에 추가)
-                # driver.refresh()
-                time.sleep(5)
+                logger.error("❌ 작업 처리 중 오류 발생.", exc_info=True)
+                handle_failure(policy, classify_exception(e), task_count, driver, new_window, should_continue)
 
     except KeyboardInterrupt:
         logger.info("🛑 사용자가 Ctrl+C를 눌러 작업을 중단했습니다.")
+    except SessionLost:
+        raise
     except Exception:
-        # 새 창을 찾지 못하는 등의 치명적 오류
+        if watchdog and not is_driver_alive(driver):
+            raise SessionLost("작업 시작 중 드라이버 종료", task_count)
+        # 작업창 열기와 작업 처리의 오류는 위에서 처리하므로 여기는 예상하지 못한 오류만 옵니다.
         logger.error(f"❌ 복구 불가능한 오류 발생. 작업 루프 종료.", exc_info=True)
+    return task_count
 
 
 # --- [수정 끝] ---
 
 
+def run_session(session_id, user_id, user_pw, pattern_loader, args, stop_event, results, scheduler=None):
+    """
+    세션 하나(로그인 → 작업 루프 → 크롬 종료)를 실행합니다. 작업 수는 results에 기록합니다.
+    패턴 로드(pattern_loader)와 작업 큐 배정(scheduler)은 여러 세션이 함께 씁니다.
+    로그인은 기본 작업 큐(HOME_URL)로 확인하고, 작업은 scheduler가 배정한 큐에서 합니다.
+    """
+    def stopped():
+        return stop_event is not None and stop_event.is_set()
+
+    pattern_store = pattern_loader.pattern_store
+    login = partial(label_login, user_id, user_pw, headless=False,  # headless=True → 창 안 뜨고 실행
+                    reuse_session=args.reuse_session,
+                    profile_dir=session_profile_dir(args.profile_dir, session_id),
+                    lean=args.lean, block_urls=args.block_url)
+    driver, error = concurrent_startup(
+        pattern_loader, lambda cancelled: login(cancelled=cancelled), cancelled=stopped)
+    if error:
+        close_chrome(driver)
+        logger.error(f"[세션 {session_id}] {error}")
+        results[session_id] = None
+        return
+    # 드라이버가 죽거나 작업창이 닫히면 다시 로그인해 이어서 작업합니다. (크롬은 여기서 닫힘)
+    results[session_id] = run_supervised(driver, login, pattern_store, args, stop_event, scheduler)
+
+
+def run_supervised(driver, login, pattern_store, args, stop_event=None, scheduler=None):
+    """
+    드라이버를 잃으면 다시 로그인해 이어서 작업합니다. 처리한 작업 수를 반환합니다.
+    """
+    supervisor = SessionSupervisor(
+        login, should_continue=lambda: stop_event is None or not stop_event.is_set(),
+        task_timeout=args.task_timeout)
+    # 작업창을 다시 열거나 다시 로그인해도 연속 실패 횟수는 이어서 셉니다.
+    policy = FailurePolicy()
+    recycler = BrowserRecycler(args.recycle_rss_mb, args.recycle_tasks, args.recycle_hours)
+    try:
+        return supervisor.run(driver, lambda d, watchdog: main_task_loop(
+            d, pattern_store, args.min_interval, args.observer, stop_event, args.fast_path, watchdog, policy,
+            recycler if recycler.enabled else None, scheduler))
+    except KeyboardInterrupt:
+        logger.info("🛑 사용자가 Ctrl+C를 눌러 작업을 중단했습니다.")
+        return 0
+    finally:
+        if supervisor.restart_count or supervisor.renavigate_count or supervisor.recycle_count:
+            logger.info(f"📊 세션 재시작 {supervisor.restart_count}회, 작업창 재시작 {supervisor.renavigate_count}회, "
+                        f"브라우저 재활용 {supervisor.recycle_count}회, 누적 중단 {supervisor.downtime:.0f}초")
+        if metrics.failure_counts():
+            logger.info(f"📊 실패 유형: {failure_summary()}")
+        if scheduler:
+            scheduler.release(threading.current_thread().name)
+        close_chrome(supervisor.driver)
+
+
+def run_pool(user_id, user_pw, pattern_loader, args, scheduler=None):
+    """
+    args.sessions개의 세션을 스레드로 동시에 실행합니다.
+    패턴(matcher), 작업 큐 배정, 엑셀 로그는 모든 세션이 함께 씁니다. Ctrl+C로 모든 세션을 멈춥니다.
+    """
+    stop_event = threading.Event()
+    results = {}
+    threads = [
+        threading.Thread(target=run_session, name=f"Session-{sid}",
+                         args=(sid, user_id, user_pw, pattern_loader, args, stop_event, results, scheduler))
+        for sid in range(1, args.sessions + 1)
+    ]
+    for t in threads:
+        t.start()
+    try:
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(timeout=0.5)
+    except KeyboardInterrupt:
+        logger.info("🛑 사용자가 Ctrl+C를 눌러 모든 세션에 중지를 요청했습니다.")
+        stop_event.set()
+        for t in threads:
+            t.join()
+
+    summary = " / ".join(
+        f"S{sid}: {'로그인 실패' if count is None else count}" for sid, count in sorted(results.items()))
+    logger.info(f"📊 세션별 작업 수: {summary}")
+
+
 if __name__ == "__main__":
+    parser = build_parser("라벨크래프트 자동화 (콘솔)")
+    args = parser.parse_args()
+    apply_log_options(args)
+    try:
+        scheduler = build_scheduler(args.queues, args.queues_file, args.empty_cooldown, args.reload_interval)
+    except (OSError, ValueError) as e:
+        parser.error(f"작업 큐 설정 오류: {e}")
+
     # 사용자 입력
     user_id = input("아이디를 입력하세요: ")
     user_pw = input("비밀번호를 입력하세요: ")
 
     logger.info("🚀 라벨크래프트 자동 작업 시작")
+    init_excel_log()
+    # 처리량은 아이디/비밀번호 입력을 마친 뒤부터 잽니다.
+    metrics.begin_run()
+    metrics_exporter = MetricsExporter(metrics, args.metrics_interval)
+    metrics_exporter.start()
 
-    # 1. 로그인
-    my_driver = label_login(user_id, user_pw, headless=False)  # headless=True → 창 안 뜨고 실행
+    # 패턴 로드는 크롬 실행/로그인과 동시에 진행합니다. (스냅샷이 있으면 즉시, 구글시트는 백그라운드 갱신)
+    pattern_store = PatternStore(args.patterns_file, reload_interval=args.reload_interval,
+                                 rules_file=args.domain_rules_file)
+    pattern_loader = PatternLoader(pattern_store)
 
-    if my_driver:
-        # 2. 구글시트에서 패턴 로드 (한 번만)
-        patterns = load_patterns_from_gsheet()
-
-        if not patterns:
-            logger.error("❌ 구글시트에서 패턴을 불러오지 못했습니다. 작업을 종료합니다.")
-            input("\n[!] 구글시트 패턴 로드 실패. 로그를 확인하세요.\n엔터 키를 누르면 프로그램을 종료합니다...")
-        else:
-            # 3. 메인 작업 루프 실행 (수정된 루프로 실행됨)
-            main_task_loop(my_driver, patterns)
-
-        # 4. 모든 작업 종료 후 드라이버 닫기
-        logger.info("⏳ 5초 후 크롬을 종료합니다...")
-        time.sleep(5)
-        close_chrome(my_driver)
+    if args.sessions > 1:
+        # 여러 세션: 패턴(matcher)과 엑셀 로그를 모든 세션이 함께 씁니다.
+        run_pool(user_id, user_pw, pattern_loader, args, scheduler)
     else:
-        logger.error("❌ 로그인 실패. 프로그램을 종료합니다.")
-        input("\n[!] 로그인 실패. 아이디/비밀번호 또는 로그를 확인하세요.\n엔터 키를 누르면 프로그램을 종료합니다...")
\ No newline at end of file
+        results = {}
+        run_session(1, user_id, user_pw, pattern_loader, args, None, results, scheduler)
+        if results.get(1) is None:
+            input("\n[!] 시작 실패. 아이디/비밀번호 또는 로그를 확인하세요.\n엔터 키를 누르면 프로그램을 종료합니다...")
+
+    if scheduler.switchable:
+        logger.info(f"📊 작업 큐별 처리: {scheduler.summary()}")
+    pattern_store.stop_reloader()
+    scheduler.stop()
+    metrics_exporter.stop()
+    close_excel_log()
@@ -0,0 +1,247 @@
+import time
+import logging
+import weakref
+
+logger = logging.getLogger("main_logger")
+
+HREF_SELECTOR = "span.h5 a"
+
+# --- 작업 전환 대기 설정 ---
+# 다음 작업의 링크가 나타나기를 기다리는 최대 시간 (초)
+TASK_READY_TIMEOUT = 10
+# 폴링 방식일 때 확인 간격 (초)
+TASK_READY_POLL = 0.1
+# 작업 시작 간 최소 간격 (초). 예전의 고정 대기(3초 + 2초)를 대신합니다.
+MIN_TASK_INTERVAL = 1.0
+# 작업 링크가 하나도 없는 상태가 이 시간(초) 이어지면 TASK_READY_TIMEOUT을 다 기다리지 않고
+# 작업 큐가 빈 것으로 봅니다.
+EMPTY_QUEUE_TIMEOUT = 3
+
+# 페이지 안에서 MutationObserver로 링크가 바뀔 때까지 기다렸다가 [요소, href]를 돌려줍니다.
+_OBSERVE_NEXT_TASK_JS = """
+var lastHref = arguments[0], lastElem = arguments[1], selector = arguments[2];
+var done = arguments[arguments.length - 1];
+function current() {
+    var links = document.querySelectorAll(selector);
+    if (!links.length) return null;
+    var el = links[links.length - 1];
+    if (!el.href) return null;
+    if (lastHref === null || el.href !== lastHref || el !== lastElem) return [el, el.href];
+    return null;
+}
+var found = current();
+if (found) { done(found); return; }
+var observer = new MutationObserver(function () {
+    var next = current();
+    if (next) { observer.disconnect(); done(next); }
+});
+observer.observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ['href']});
+"""
+
+
+# 마지막 링크 요소와 href를 한 번의 호출로 읽습니다.
+_READ_TASK_LINK_JS = """
+var links = document.querySelectorAll(arguments[0]);
+if (!links.length) return null;
+var el = links[links.length - 1];
+return el.href ? [el, el.href] : null;
+"""
+
+_script_timeouts = weakref.WeakKeyDictionary()
+
+
+def ensure_script_timeout(driver, seconds):
+    """
+    비동기 스크립트 제한 시간을 설정합니다. 같은 값이면 다시 보내지 않습니다.
+    """
+    if _script_timeouts.get(driver) != seconds:
+        driver.set_script_timeout(seconds)
+        _script_timeouts[driver] = seconds
+
+
+def read_task_link(driver):
+    """
+    현재 페이지의 마지막 'span.h5 a' 요소와 href를 (요소, href)로 반환합니다. 없으면 None.
+    """
+    result = driver.execute_script(_READ_TASK_LINK_JS, HREF_SELECTOR)
+    return tuple(result) if result else None
+
+
+class TaskCursor:
+    """
+    마지막으로 처리한 작업의 링크(href와 요소)를 기억합니다.
+
+    href가 바뀌었거나, href가 같더라도 요소가 새로 만들어졌으면(이전 요소가 stale)
+    다음 작업이 로드된 것으로 판단합니다.
+
+    작업을 끝낸 뒤에만 advance()로 갱신합니다. 작업이 실패하면 그대로 두므로
+    다음 호출은 같은 링크를 새 작업으로 보고 바로 다시 처리합니다.
+    """
+
+    def __init__(self):
+        self.last_href = None
+        self.last_element = None
+
+    def is_new(self, element, href):
+        if not href:
+            return False
+        if self.last_href is None:
+            return True
+        return href != self.last_href or element != self.last_element
+
+    def advance(self, element, href):
+        self.last_element = element
+        self.last_href = href
+
+    def reset(self):
+        self.last_href = None
+        self.last_element = None
+
+
+class _Absence:
+    """
+    작업 링크가 하나도 없는 상태가 얼마나 이어졌는지 잽니다. (empty_timeout이 None이면 재지 않음)
+    """
+
+    def __init__(self, empty_timeout):
+        self.empty_timeout = empty_timeout
+        self.since = None
+
+    def seen(self):
+        self.since = None
+
+    def expired(self):
+        if self.empty_timeout is None:
+            return False
+        now = time.monotonic()
+        if self.since is None:
+            self.since = now
+        return now - self.since >= self.empty_timeout
+
+
+# 폴링 조건이 '작업 큐가 비었음'을 알릴 때 돌려주는 값 (WebDriverWait가 멈추도록 참으로 평가됨)
+_NO_TASK = (None, None)
+
+
+def _next_task_link(cursor, absence):
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import StaleElementReferenceException
+
+    def _condition(driver):
+        elems = driver.find_elements(By.CSS_SELECTOR, HREF_SELECTOR)
+        if not elems:
+            return _NO_TASK if absence.expired() else False
+        absence.seen()
+        elem = elems[-1]
+        try:
+            href = elem.get_attribute("href")
+        except StaleElementReferenceException:
+            return False
+        return (elem, href) if cursor.is_new(elem, href) else False
+    return _condition
+
+
+def _next_task_link_fast(cursor, absence):
+    from selenium.common.exceptions import StaleElementReferenceException
+
+    def _condition(driver):
+        try:
+            link = read_task_link(driver)
+        except StaleElementReferenceException:
+            return False
+        if not link:
+            return _NO_TASK if absence.expired() else False
+        absence.seen()
+        return link if cursor.is_new(*link) else False
+    return _condition
+
+
+def _observe_next_task(driver, cursor, timeout):
+    from selenium.common.exceptions import StaleElementReferenceException
+
+    ensure_script_timeout(driver, timeout)
+    try:
+        return driver.execute_async_script(
+            _OBSERVE_NEXT_TASK_JS, cursor.last_href, cursor.last_element, HREF_SELECTOR)
+    except StaleElementReferenceException:
+        # 이전 링크 요소가 이미 사라졌으면 비교 대상 없이 href만 봅니다.
+        return driver.execute_async_script(
+            _OBSERVE_NEXT_TASK_JS, cursor.last_href, None, HREF_SELECTOR)
+
+
+def _probe_task_link(driver, empty_timeout, fast):
+    """
+    작업창을 막 열었을 때 링크가 하나라도 나타나는지 empty_timeout초 동안만 봅니다. 있으면 True.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import StaleElementReferenceException
+
+    deadline = time.monotonic() + empty_timeout
+    while True:
+        try:
+            if read_task_link(driver) if fast else driver.find_elements(By.CSS_SELECTOR, HREF_SELECTOR):
+                return True
+        except StaleElementReferenceException:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(TASK_READY_POLL)
+
+
+def wait_for_next_task(driver, cursor, timeout=TASK_READY_TIMEOUT, use_observer=False, fast=False,
+                       empty_timeout=None):
+    """
+    이전 작업과 다른 링크가 나타날 때까지 기다려 (요소, href)를 반환합니다.
+    시간 안에 바뀌지 않으면 TimeoutException이 발생합니다.
+    cursor는 갱신하지 않으므로, 작업을 마친 뒤 호출하는 쪽이 cursor.advance()를 불러야 합니다.
+
+    empty_timeout을 주면 링크가 하나도 없는 상태가 그만큼 이어질 때 timeout을 다 기다리지 않고
+    None을 반환합니다. (작업 큐가 비었음) 작업창을 막 연 뒤(cursor가 비어 있을 때)에는
+    긴 대기에 들어가기 전에 이것부터 확인합니다.
+
+    use_observer=True면 페이지 안의 MutationObserver 신호를 먼저 기다리고,
+    페이지 전체가 새로 로드되는 등으로 실패하면 폴링으로 대신합니다.
+    fast=True면 폴링 한 번에 execute_script 한 번만 사용합니다.
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import WebDriverException
+
+    deadline = time.monotonic() + timeout
+    if empty_timeout is not None and cursor.last_href is None:
+        if not _probe_task_link(driver, empty_timeout, fast):
+            return None
+    if use_observer:
+        try:
+            result = _observe_next_task(driver, cursor, timeout)
+            if result:
+                elem, href = result
+                return elem, href
+        except WebDriverException as e:
+            logger.debug(f"MutationObserver 대기 실패, 폴링으로 전환: {e.__class__.__name__}")
+
+    remaining = max(deadline - time.monotonic(), TASK_READY_POLL)
+    absence = _Absence(empty_timeout)
+    condition = _next_task_link_fast(cursor, absence) if fast else _next_task_link(cursor, absence)
+    elem, href = WebDriverWait(driver, remaining, poll_frequency=TASK_READY_POLL).until(condition)
+    if elem is None:
+        return None
+    return elem, href
+
+
+class Pacer:
+    """
+    작업 시작 사이의 최소 간격을 보장합니다. 이미 그 이상 지났으면 기다리지 않습니다.
+    """
+
+    def __init__(self, min_interval=MIN_TASK_INTERVAL):
+        self.min_interval = min_interval
+        self._last = None
+
+    def wait(self):
+        now = time.monotonic()
+        if self._last is not None and self.min_interval > 0:
+            remaining = self.min_interval - (now - self._last)
+            if remaining > 0:
+                time.sleep(remaining)
+                now = time.monotonic()
+        self._last = now
@@ -0,0 +1,309 @@
+import csv
+import json
+import os
+import threading
+import logging
+from datetime import datetime
+
+from label_log import OUTPUT_DIR
+from prefix_util import (open_gsheet, load_patterns_from_gsheet, load_domain_rules_from_gsheet, build_matcher,
+                         set_domain_rules)
+from domain_rules import load_rules_from_file
+
+logger = logging.getLogger("main_logger")
+
+# --- 패턴 스냅샷 설정 ---
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILE = os.path.join(OUTPUT_DIR, "patterns_snapshot.json")
+# 스냅샷이 이 시간(초)보다 오래되면 '오래된 스냅샷'으로 경고합니다.
+SNAPSHOT_MAX_AGE = 24 * 60 * 60
+
+# 실행 중 패턴 원본을 다시 확인하는 주기 (초). 0 이하면 비활성화합니다.
+RELOAD_INTERVAL = 300
+# 변경 내역 로그에 표시할 최대 단어 수
+DIFF_LOG_LIMIT = 20
+
+# 로컬 CSV의 패턴 열 (구글시트 PATTERN_COL_NUM과 같은 위치)
+FILE_PATTERN_COL_NUM = 3
+
+
+def load_patterns_from_file(path):
+    """
+    로컬 CSV/텍스트 파일에서 패턴 단어를 읽습니다.
+    구글시트를 CSV로 내려받은 형식과 같이 첫 행은 헤더로 보고 건너뛰며,
+    FILE_PATTERN_COL_NUM 열을 사용합니다. 열이 하나뿐인 파일은 첫 열을 사용합니다.
+    실패 시 None을 반환합니다.
+    """
+    logger.info(f"로컬 파일에서 패턴 단어 불러오는 중: {path}")
+    try:
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))[1:]
+        patterns = []
+        for row in rows:
+            if not row:
+                continue
+            col = FILE_PATTERN_COL_NUM - 1 if len(row) >= FILE_PATTERN_COL_NUM else 0
+            word = row[col].strip()
+            if word:
+                patterns.append(word)
+        logger.info(f"✅ 패턴 단어 {len(patterns)}개 불러옴 (예: {patterns[:3]}...)")
+        return patterns
+    except Exception:
+        logger.error(f"❌ 패턴 파일 불러오기 실패: {path}", exc_info=True)
+        return None
+
+
+def save_snapshot(patterns, source, path=SNAPSHOT_FILE, rules=None):
+    """
+    마지막으로 성공한 패턴 목록(과 도메인 규칙)을 스냅샷 파일에 저장합니다.
+    """
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "source": source,
+        "patterns": list(patterns),
+    }
+    if rules is not None:
+        data["rules"] = [list(rule) for rule in rules]
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.debug(f"패턴 스냅샷 저장 완료: {path} ({len(data['patterns'])}개)")
+    except Exception:
+        logger.error(f"❌ 패턴 스냅샷 저장 실패: {path}", exc_info=True)
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    """
+    스냅샷을 읽어 dict로 반환합니다. 없거나 버전이 다르면 None을 반환합니다.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"⚠ 패턴 스냅샷 버전 불일치 ({data.get('version')}). 무시합니다.")
+            return None
+        return data
+    except Exception:
+        logger.warning(f"⚠ 패턴 스냅샷 읽기 실패: {path}", exc_info=True)
+        return None
+
+
+def snapshot_age(data):
+    """
+    스냅샷이 저장된 뒤 지난 시간(초)을 반환합니다.
+    """
+    try:
+        saved_at = datetime.fromisoformat(data["saved_at"])
+    except Exception:
+        return float("inf")
+    return (datetime.now() - saved_at).total_seconds()
+
+
+def diff_patterns(old, new):
+    """
+    (추가된 단어 리스트, 삭제된 단어 리스트)를 반환합니다. 순서는 원본 순서를 따릅니다.
+    """
+    old_set = set(old)
+    new_set = set(new)
+    added = [w for w in new if w not in old_set]
+    removed = [w for w in old if w not in new_set]
+    return added, removed
+
+
+class PatternStore:
+    """
+    현재 사용 중인 패턴 목록과 PrefixMatcher를 보관합니다.
+
+    patterns_file이 주어지면 네트워크 없이 로컬 파일만 사용합니다.
+    그렇지 않으면 스냅샷으로 즉시 시작하고 구글시트는 백그라운드에서 새로 불러오며,
+    스냅샷이 없을 때만 구글시트를 기다립니다.
+
+    도메인 규칙표(domain_rules)도 함께 관리합니다. rules_file이 있으면 그 파일을,
+    없으면 구글시트의 규칙 탭을 쓰며(로컬 patterns_file만 쓸 때는 기본 규칙),
+    불러온 규칙은 prefix_util.set_domain_rules()로 적용합니다.
+
+    start_reloader()를 호출하면 reload_interval마다 원본을 다시 확인해
+    새 matcher를 백그라운드에서 만든 뒤 참조 하나만 바꿔 끼웁니다.
+    작업 루프는 작업을 시작할 때 store.matcher를 한 번 읽어 그 작업 동안 사용하면 되고,
+    갱신을 기다리느라 멈추는 일은 없습니다.
+    """
+
+    def __init__(self, patterns_file=None, snapshot_path=SNAPSHOT_FILE,
+                 reload_interval=RELOAD_INTERVAL, rules_file=None):
+        self.patterns_file = patterns_file
+        self.rules_file = rules_file
+        self.rules = None
+        self.snapshot_path = snapshot_path
+        self.reload_interval = reload_interval
+        self.matcher = None
+        self.source = None
+        self.stale = False
+        self.reload_count = 0
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+        self._reloader = None
+        self._reloader_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # stop_reloader() 뒤에는 자동 갱신을 다시 시작하지 않습니다. (실행이 끝난 뒤 로드가 끝나는 경우)
+        self.closed = False
+
+    @property
+    def patterns(self):
+        matcher = self.matcher
+        return matcher.patterns if matcher else []
+
+    def fetch(self, spreadsheet=None):
+        """
+        원본(로컬 파일 또는 구글시트)에서 패턴 목록을 가져옵니다. 실패 시 None.
+        spreadsheet에 이미 연 구글시트를 넘기면 다시 열지 않습니다.
+        """
+        if self.patterns_file:
+            return load_patterns_from_file(self.patterns_file)
+        return load_patterns_from_gsheet(spreadsheet)
+
+    def fetch_rules(self, spreadsheet=None):
+        """
+        도메인 규칙을 가져옵니다. 실패하거나 가져올 곳이 없으면 None (현재 규칙 유지).
+        """
+        if self.rules_file:
+            return load_rules_from_file(self.rules_file)
+        if self.patterns_file:
+            return None
+        return load_domain_rules_from_gsheet(spreadsheet)
+
+    def _apply_rules(self, rules):
+        if rules is None:
+            return
+        self.rules = list(rules)
+        # 빈 규칙표(시트 탭 없음 등)는 기본 규칙으로 돌아갑니다.
+        set_domain_rules(self.rules or None)
+
+    @property
+    def source_name(self):
+        return f"file:{self.patterns_file}" if self.patterns_file else "gsheet"
+
+    def _apply(self, patterns, source):
+        matcher = build_matcher(patterns)
+        self.source = source
+        # 참조 교체는 원자적이므로 작업 루프는 잠금 없이 읽을 수 있습니다.
+        self.matcher = matcher
+        return matcher
+
+    def _log_diff(self, old, new):
+        if old == new:
+            return False
+        added, removed = diff_patterns(old, new)
+        if not added and not removed:
+            # 일치 우선순위가 시트 순서를 따르므로 순서만 바뀌어도 교체합니다.
+            logger.info(f"🔄 패턴 순서 변경 감지 (총 {len(new)}개)")
+            return True
+        logger.info(f"🔄 패턴 변경 감지: +{len(added)}개 / -{len(removed)}개 (총 {len(new)}개)")
+        if added:
+            logger.info(f"    추가: {added[:DIFF_LOG_LIMIT]}{' ...' if len(added) > DIFF_LOG_LIMIT else ''}")
+        if removed:
+            logger.info(f"    삭제: {removed[:DIFF_LOG_LIMIT]}{' ...' if len(removed) > DIFF_LOG_LIMIT else ''}")
+        return True
+
+    def load(self):
+        """
+        시작 시 패턴을 준비합니다. 사용할 패턴이 있으면 True를 반환합니다.
+        """
+        if self.patterns_file:
+            patterns = self.fetch()
+            if not patterns:
+                return False
+            self._apply_rules(self.fetch_rules())
+            self._apply(patterns, self.source_name)
+            return True
+
+        snapshot = load_snapshot(self.snapshot_path)
+        if snapshot and snapshot.get("patterns"):
+            age = snapshot_age(snapshot)
+            self.stale = age > SNAPSHOT_MAX_AGE
+            self._apply_rules(self.fetch_rules() if self.rules_file else snapshot.get("rules"))
+            self._apply(snapshot["patterns"], f"snapshot:{snapshot.get('saved_at')}")
+            if self.stale:
+                logger.warning(f"⚠ 패턴 스냅샷이 오래되었습니다 ({age / 3600:.1f}시간 전 저장).")
+            logger.info(f"✅ 패턴 스냅샷으로 시작 ({len(self.patterns)}개). 구글시트는 백그라운드에서 갱신합니다.")
+            self.refresh_in_background()
+            return True
+
+        logger.info("패턴 스냅샷이 없어 구글시트 응답을 기다립니다.")
+        return self.refresh()
+
+    def refresh(self):
+        """
+        원본에서 다시 불러와 성공하면 교체하고 스냅샷을 저장합니다.
+        내용이 같으면 기존 matcher를 그대로 둡니다.
+        """
+        with self._refresh_lock:
+            # 구글시트는 갱신마다 한 번만 열어 패턴 탭과 규칙 탭을 함께 읽습니다.
+            if self.patterns_file:
+                spreadsheet = None
+                patterns = self.fetch()
+            else:
+                spreadsheet = open_gsheet()
+                patterns = self.fetch(spreadsheet) if spreadsheet is not None else None
+            if not patterns:
+                logger.warning("⚠ 패턴 갱신 실패. 기존 패턴을 계속 사용합니다.")
+                return False
+
+            self._apply_rules(self.fetch_rules(spreadsheet))
+
+            # 새 matcher는 작업 루프와 무관하게 여기서 미리 만들어 둡니다.
+            new_matcher = build_matcher(patterns)
+            old = self.patterns
+            if self.matcher is None or self._log_diff(old, new_matcher.patterns):
+                self._apply(new_matcher, self.source_name)
+                if old:
+                    self.reload_count += 1
+            else:
+                logger.debug("패턴 변경 없음.")
+
+            self.stale = False
+            if not self.patterns_file:
+                save_snapshot(self.patterns, self.source_name, self.snapshot_path, self.rules)
+            return True
+
+    def refresh_in_background(self):
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        self._refresh_thread = threading.Thread(target=self.refresh, name="PatternRefresh", daemon=True)
+        self._refresh_thread.start()
+
+    def start_reloader(self):
+        """
+        reload_interval마다 원본을 다시 확인하는 데몬 스레드를 시작합니다.
+        이미 stop_reloader()를 불렀으면 시작하지 않고 False를 반환합니다.
+        """
+        with self._reloader_lock:
+            if self.closed:
+                return False
+            if self.reload_interval <= 0 or (self._reloader and self._reloader.is_alive()):
+                return True
+            self._stop_event.clear()
+            self._reloader = threading.Thread(target=self._reload_loop, name="PatternReloader", daemon=True)
+            self._reloader.start()
+        logger.info(f"패턴 자동 갱신 시작 (주기 {self.reload_interval}초)")
+        return True
+
+    def stop_reloader(self):
+        """
+        자동 갱신을 멈추고, 이후의 start_reloader() 호출도 무시하게 합니다.
+        """
+        with self._reloader_lock:
+            self.closed = True
+            self._stop_event.set()
+
+    def _reload_loop(self):
+        while not self._stop_event.wait(self.reload_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.error("❌ 패턴 자동 갱신 중 오류", exc_info=True)
@@ -1,20 +1,23 @@
 import time
-import re
 import logging
-import gspread
-import openpyxl
+import itertools
+import threading
 import os
 from datetime import datetime
+from collections import OrderedDict
 from urllib.parse import urlparse
-from oauth2client.service_account import ServiceAccountCredentials
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException
 
 # [수정] label_log에서 헬퍼 함수들을 임포트
 from label_log import resource_path, OUTPUT_DIR
+from label_tasklog import open_task_log
+from label_metrics import metrics
+from run_history import record_history, close_history
+from domain_rules import DomainRules, parse_rules
+from failure_policy import (TaskFailure, classify_exception, failure_kind, FAIL_TIMEOUT, FAIL_NO_BUTTON,
+                            FAIL_DRIVER_DEAD, FAIL_SESSION_EXPIRED, FAIL_EMPTY_QUEUE, FAIL_OTHER)
+from session_watchdog import is_driver_alive
+from page_ready import (wait_for_next_task, read_task_link, ensure_script_timeout, TASK_READY_TIMEOUT,
+                        EMPTY_QUEUE_TIMEOUT)
 
 logger = logging.getLogger("main_logger")
 
@@ -23,53 +26,107 @@ logger = logging.getLogger("main_logger")
 GSHEET_JSON = "indexcell-e71d69f270ca.json"
 GSHEET_NAME = "[RPA] 테스트용"
 SHEET_NAME = "패턴단어"
+# 도메인 규칙표 탭 (domain_rules.py 참고). 없으면 기본 규칙만 씁니다.
+RULES_SHEET_NAME = "도메인규칙"
 PATTERN_COL_NUM = 3
 
 # --- 엑셀 로그 설정 ---
-# [수정] OUTPUT_DIR을 사용합니다.
-timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-EXCEL_LOG_FILE = os.path.join(OUTPUT_DIR, f"log_{timestamp_str}.xlsx")
+# 파일 경로는 init_excel_log()에서 정합니다. (처음 기록할 때 log_<시각>.xlsx로 자동 설정)
+EXCEL_LOG_FILE = None
 EXCEL_HEADER = ["작업시간", "href", "패턴 결과", "작업"]
 
+# cursor 없이 process_page를 호출할 때 처리 후 기다리는 시간 (초)
+LEGACY_POST_DELAY = 3
+
+
+_task_log = None
+_task_log_lock = threading.Lock()
+
+
+def init_excel_log(path=None):
+    """
+    엑셀 로그 파일 경로를 정합니다. path가 없으면 OUTPUT_DIR/log_<현재 시각>.xlsx를 씁니다.
+    다시 호출하지 않으면 프로그램이 끝날 때까지 같은 파일에 기록합니다.
+    """
+    global EXCEL_LOG_FILE
+    if path is None:
+        path = os.path.join(OUTPUT_DIR, f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+    EXCEL_LOG_FILE = path
+    return EXCEL_LOG_FILE
+
+
+def get_task_log():
+    """
+    작업 로그 기록기(TaskLogWriter)를 반환합니다. 처음 호출될 때 생성됩니다.
+    """
+    global _task_log
+    with _task_log_lock:
+        if _task_log is None:
+            if EXCEL_LOG_FILE is None:
+                init_excel_log()
+            _task_log = open_task_log(EXCEL_LOG_FILE, EXCEL_HEADER)
+        return _task_log
+
+
+def close_excel_log():
+    """
+    남은 작업 로그를 모두 기록하고 엑셀 파일로 저장합니다. 실행 기록 DB도 함께 닫습니다.
+    """
+    global _task_log
+    with _task_log_lock:
+        if _task_log is not None:
+            _task_log.close()
+            _task_log = None
+    close_history()
+
 
 def log_to_excel(timestamp, href, match_result, action):
-    # (이 함수 내부는 수정할 필요 없음)
+    # 실제 기록은 백그라운드 스레드가 저널(CSV)과 엑셀에 나눠서 합니다.
     data_row = [timestamp, href, match_result, action]
     try:
-        if not os.path.exists(EXCEL_LOG_FILE):
-            logger.info(f"새 엑셀 로그 파일 생성: {EXCEL_LOG_FILE}")
-            workbook = openpyxl.Workbook()
-            sheet = workbook.active
-            sheet.title = "AutomationLog"
-            sheet.append(EXCEL_HEADER)
-        else:
-            workbook = openpyxl.load_workbook(EXCEL_LOG_FILE)
-            sheet = workbook.active
-        sheet.append(data_row)
-        workbook.save(EXCEL_LOG_FILE)
-        logger.debug(f"엑셀 로그 저장 완료: {timestamp}")
+        get_task_log().write(data_row)
     except Exception:
         logger.error(f"❌ 엑셀 로그 저장 실패. 데이터: {data_row}", exc_info=True)
 
 
-def load_patterns_from_gsheet():
+def _open_gsheet():
+    # 구글시트 라이브러리는 무거우므로 실제로 시트를 읽을 때만 불러옵니다.
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    scope = [
+        "https://spreadsheets.google.com/feeds",
+        "https://www.googleapis.com/auth/drive"
+    ]
+
+    # --- [수정된 부분] ---
+    # GSHEET_JSON 대신 resource_path(GSHEET_JSON)을 사용합니다.
+    # .exe 안에 포함된 .json 파일의 실제 경로를 찾아옵니다.
+    json_keyfile_path = resource_path(GSHEET_JSON)
+    logger.debug(f"JSON 키 파일 경로: {json_keyfile_path}")
+    creds = ServiceAccountCredentials.from_json_keyfile_name(json_keyfile_path, scope)
+    # --- [수정 완료] ---
+
+    client = gspread.authorize(creds)
+    return client.open(GSHEET_NAME)
+
+
+def open_gsheet():
+    """
+    패턴 스프레드시트를 열어 반환합니다. 실패하면 None을 반환합니다.
+    한 번 연 스프레드시트를 아래 load_*_from_gsheet()에 넘기면 인증과 열기를 다시 하지 않습니다.
+    """
+    try:
+        return _open_gsheet()
+    except Exception:
+        logger.error(f"❌ 구글시트 열기 실패. {GSHEET_JSON} 파일 경로 확인.", exc_info=True)
+        return None
+
+
+def load_patterns_from_gsheet(spreadsheet=None):
     logger.info("구글시트에서 패턴 단어 불러오는 중...")
     try:
-        scope = [
-            "https://spreadsheets.google.com/feeds",
-            "https://www.googleapis.com/auth/drive"
-        ]
-
-        # --- [수정된 부분] ---
-        # GSHEET_JSON 대신 resource_path(GSHEET_JSON)을 사용합니다.
-        # .exe 안에 포함된 .json 파일의 실제 경로를 찾아옵니다.
-        json_keyfile_path = resource_path(GSHEET_JSON)
-        logger.debug(f"JSON 키 파일 경로: {json_keyfile_path}")
-        creds = ServiceAccountCredentials.from_json_keyfile_name(json_keyfile_path, scope)
-        # --- [수정 완료] ---
-
-        client = gspread.authorize(creds)
-        sheet = client.open(GSHEET_NAME).worksheet(SHEET_NAME)
+        sheet = (spreadsheet or _open_gsheet()).worksheet(SHEET_NAME)
 
         patterns = sheet.col_values(PATTERN_COL_NUM)[1:]
         patterns = [p.strip() for p in patterns if p.strip()]
@@ -80,109 +137,553 @@ def load_patterns_from_gsheet():
         return None
 
 
-# (extract_domain_name, check_href_match, process_page 함수는 수정할 필요 없음)
-# ... (이전과 동일한 process_page 함수 내용) ...
-def extract_domain_name(href: str) -> str:
+def load_domain_rules_from_gsheet(spreadsheet=None):
+    """
+    구글시트의 RULES_SHEET_NAME 탭에서 도메인 규칙을 읽습니다.
+    탭이 없으면 빈 목록(기본 규칙 사용)을, 읽기에 실패하면 None을 반환합니다.
+    """
+    import gspread
+
+    logger.debug("구글시트에서 도메인 규칙 불러오는 중...")
+    try:
+        sheet = (spreadsheet or _open_gsheet()).worksheet(RULES_SHEET_NAME)
+        rules = parse_rules(sheet.get_all_values()[1:])
+        logger.info(f"✅ 도메인 규칙 {len(rules)}개 불러옴")
+        return rules
+    except gspread.exceptions.WorksheetNotFound:
+        logger.debug(f"'{RULES_SHEET_NAME}' 탭이 없어 기본 도메인 규칙을 씁니다.")
+        return []
+    except Exception:
+        logger.error("❌ 구글시트 도메인 규칙 불러오기 실패", exc_info=True)
+        return None
+
+
+class LRUCache:
+    """
+    크기가 제한된 LRU 캐시입니다. 가득 차면 가장 오래 쓰지 않은 항목을 버립니다.
+    여러 세션 스레드에서 함께 써도 되며, 적중/실패 횟수를 셉니다.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, self._MISSING)
+            if value is self._MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# --- 패턴 검사 추적 ---
+# True면 check_href_match가 도메인마다 확인한 후보 접두어를 모두 로그로 남깁니다. (--trace-match)
+MATCH_TRACE = False
+
+
+def set_match_trace(enabled):
+    global MATCH_TRACE
+    MATCH_TRACE = bool(enabled)
+
+
+# --- 판정 캐시 설정 ---
+# href → 도메인, 도메인 → (일치 여부, 일치 단어) 캐시의 최대 항목 수
+DOMAIN_CACHE_SIZE = 10000
+DECISION_CACHE_SIZE = 10000
+
+_domain_cache = LRUCache(DOMAIN_CACHE_SIZE)
+_decision_cache = LRUCache(DECISION_CACHE_SIZE)
+# PrefixMatcher마다 붙이는 번호. 판정 캐시 키에 넣어 matcher별 결과를 구분합니다.
+_matcher_generations = itertools.count(1)
+
+
+def cache_stats():
+    """
+    도메인/판정 캐시의 적중 통계를 반환합니다.
+    """
+    return {"domain": _domain_cache.stats(), "decision": _decision_cache.stats()}
+
+
+metrics.add_info("cache", cache_stats)
+
+
+# 현재 도메인 규칙표. set_domain_rules()로 교체합니다.
+_domain_rules = DomainRules()
+
+
+def get_domain_rules():
+    return _domain_rules
+
+
+def set_domain_rules(rules):
+    """
+    도메인 규칙표를 교체합니다. rules는 DomainRules 또는 [(접미사, 방식), ...]이며
+    None이면 기본 규칙으로 돌아갑니다. 규칙이 바뀌면 도메인 캐시를 비웁니다.
+    """
+    global _domain_rules
+    if not isinstance(rules, DomainRules):
+        rules = DomainRules(rules)
+    if rules == _domain_rules:
+        return False
+    _domain_rules = rules
+    _domain_cache.clear()
+    logger.info(f"🔄 도메인 규칙 {len(rules)}개 적용")
+    return True
+
+
+def _parse_domain_name(href, rules):
     try:
         parsed = urlparse(href)
-        netloc = parsed.netloc
-        if ".tistory.com" in netloc:
-            domain_part = netloc.split(".tistory.com")[0]
-            logger.debug(f"Tistory 도메인 파싱: {netloc} -> {domain_part}")
-            return domain_part
-        logger.debug(f"일반 도메인 파싱: {netloc}")
-        return netloc
+        domain_part = rules.key(parsed)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"도메인 파싱: {parsed.netloc} -> {domain_part}")
+        return domain_part
     except Exception:
         logger.warning(f"⚠ 도메인 파싱 실패 ({href})", exc_info=True)
         return href
 
 
+def extract_domain_name(href: str) -> str:
+    domain_name = _domain_cache.get(href)
+    if domain_name is None:
+        rules = _domain_rules
+        domain_name = _parse_domain_name(href, rules)
+        # 그 사이 규칙이 바뀌었으면 이전 규칙의 결과를 캐시에 남기지 않습니다.
+        if rules is _domain_rules:
+            _domain_cache.put(href, domain_name)
+    return domain_name
+
+
+def match_domain(matcher, domain_name):
+    """
+    matcher.match(domain_name)의 결과를 판정 캐시를 거쳐 반환합니다.
+    캐시 키에 matcher 번호가 들어가므로, 패턴이 바뀌거나 작업 큐마다 다른 matcher를 번갈아 써도
+    서로의 결과를 비우지 않고 이전 matcher의 항목은 LRU로 자연히 밀려납니다.
+    """
+    key = (matcher.generation, domain_name)
+    result = _decision_cache.get(key)
+    if result is None:
+        result = matcher.match(domain_name)
+        _decision_cache.put(key, result)
+    return result
+
+
+class PrefixMatcher:
+    """
+    패턴 단어 목록을 한 번만 색인해 두고, 도메인이 ``^단어\\d{4,}$`` 규칙에
+    맞는지 도메인 길이에 비례하는 시간 안에 판정합니다.
+
+    도메인 끝의 숫자열(4자리 이상)을 떼어낸 접두어 후보들만 사전에서 찾으므로
+    패턴 개수와 무관하게 동작합니다.
+
+    여러 단어가 동시에 일치하면 **시트에서 먼저 나온 단어**가 이깁니다.
+    (기존 check_href_match의 순차 검사와 같은 결과)
+    """
+
+    MIN_DIGITS = 4
+
+    def __init__(self, patterns):
+        self.generation = next(_matcher_generations)
+        self._order = {}
+        for word in patterns or []:
+            if word and word not in self._order:
+                self._order[word] = len(self._order)
+        self.patterns = list(self._order)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self.patterns)
+
+    def _candidates(self, domain_name):
+        """
+        도메인에서 '접두어 + 4자리 이상 숫자'로 나눌 수 있는 접두어들을 반환합니다.
+        """
+        n = len(domain_name)
+        end = n - self.MIN_DIGITS
+        if end < 1 or not domain_name[end:].isdecimal():
+            return []
+
+        # 끝에서부터 이어지는 숫자열의 시작 위치를 찾습니다.
+        start = end
+        while start > 0 and domain_name[start - 1].isdecimal():
+            start -= 1
+        return [domain_name[:cut] for cut in range(max(start, 1), end + 1)]
+
+    def explain(self, domain_name):
+        """
+        확인한 후보 접두어와 시트 순서(없으면 None)를 [(후보, 순서), ...]로 반환합니다. 추적용입니다.
+        """
+        return [(candidate, self._order.get(candidate)) for candidate in self._candidates(domain_name)]
+
+    def match(self, domain_name):
+        """
+        (일치 여부, 일치한 단어) 튜플을 반환합니다.
+        """
+        best_word = None
+        best_rank = None
+        for candidate in self._candidates(domain_name):
+            rank = self._order.get(candidate)
+            if rank is not None and (best_rank is None or rank < best_rank):
+                best_word, best_rank = candidate, rank
+        return best_word is not None, best_word
+
+
+def build_matcher(patterns):
+    """
+    load_patterns_from_gsheet()의 결과로 PrefixMatcher를 만듭니다.
+    이미 PrefixMatcher라면 그대로 반환합니다.
+    """
+    if isinstance(patterns, PrefixMatcher):
+        return patterns
+    return PrefixMatcher(patterns)
+
+
 def check_href_match(href, patterns):
+    """
+    patterns에는 PrefixMatcher(권장) 또는 패턴 단어 리스트를 넘길 수 있습니다.
+    리스트를 넘기면 호출할 때마다 색인을 새로 만들며, 다시 쓰이지 않을 결과이므로 판정 캐시를 거치지 않습니다.
+    """
+    reusable = isinstance(patterns, PrefixMatcher)
+    matcher = build_matcher(patterns)
     domain_name = extract_domain_name(href)
-    logger.info(f"🔍 비교 대상 도메인: {domain_name}")
-    for word in patterns:
-        regex = rf"^{re.escape(word)}\d{{4,}}$"
-        logger.debug(f"    [패턴 검사] {domain_name} vs {regex}")
-        if re.match(regex, domain_name):
-            logger.info(f"✅ 정규식 일치: {regex} ← {domain_name}")
-            return True, word
-    logger.info("❌ 정규식 불일치.")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug(f"🔍 비교 대상 도메인: {domain_name}")
+    if MATCH_TRACE:
+        for candidate, rank in matcher.explain(domain_name):
+            logger.info(f"    [패턴 검사] {domain_name} vs {candidate!r} → "
+                        f"{'시트 ' + str(rank + 1) + '번째 단어' if rank is not None else '없음'}")
+    is_match, word = match_domain(matcher, domain_name) if reusable else matcher.match(domain_name)
+    if is_match:
+        if debug:
+            logger.debug(f"✅ 패턴 일치: {word} ← {domain_name}")
+        return True, word
+    if debug:
+        logger.debug("❌ 정규식 불일치.")
     return False, None
 
 
-def process_page(driver, patterns):
+# 미루기 두 단계('작업 미루기' → '아무에게나 미루기')를 페이지 안에서 한 번에 수행합니다.
+# 완료 코드: 'POSTPONED', 'NO_POSTPONE_BUTTON'(아무것도 안 함), 'NO_ASSIGN_BUTTON'(1단계만 함)
+# 'E' 입력은 스크립트로 만든 키 이벤트(isTrusted=false)를 무시하는 페이지가 있으므로 여기서 하지 않습니다.
+_POSTPONE_JS = """
+var timeoutMs = arguments[0];
+var done = arguments[arguments.length - 1];
+function findButton(text) {
+    var buttons = document.querySelectorAll('button');
+    for (var i = 0; i < buttons.length; i++) {
+        var b = buttons[i];
+        if (b.textContent.trim() === text && !b.disabled && b.offsetParent !== null) return b;
+    }
+    return null;
+}
+function waitFor(text, callback) {
+    var start = Date.now();
+    (function poll() {
+        var b = findButton(text);
+        if (b) return callback(b);
+        if (Date.now() - start > timeoutMs) return callback(null);
+        setTimeout(poll, 50);
+    })();
+}
+waitFor('작업 미루기', function (postpone) {
+    if (!postpone) return done('NO_POSTPONE_BUTTON');
+    postpone.click();
+    waitFor('아무에게나 미루기', function (assignAny) {
+        if (!assignAny) return done('NO_ASSIGN_BUTTON');
+        assignAny.click();
+        done('POSTPONED');
+    });
+});
+"""
+# 페이지 안에서 버튼을 기다리는 최대 시간 (초). 단계별 경로의 WebDriverWait와 같습니다.
+BUTTON_TIMEOUT = 10
+
+
+def _driver_lost(driver, exc):
+    """
+    exc가 드라이버 종료나 작업창 닫힘 때문이면 True.
+    이런 오류는 결과 문자열로 바꾸지 않고 다시 발생시켜 작업 루프가 세션을 새로 열게 합니다.
+    """
+    return classify_exception(exc) == FAIL_DRIVER_DEAD or not is_driver_alive(driver)
+
+
+def _press_e(driver, matched_word):
+    from selenium.webdriver.common.action_chains import ActionChains
+
+    try:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"👉 [3/4] 패턴 '{matched_word}' 일치 → 키보드 'E' 입력 시도")
+        actions = ActionChains(driver)
+        actions.send_keys('e').perform()
+        logger.debug("⌨️ 'E' 키 입력 완료")
+        return "E (패턴 일치)"
+    except Exception as e:
+        if _driver_lost(driver, e):
+            raise
+        logger.error(f"❌ [3/4 실패] 키보드 'E' 입력 중 오류", exc_info=True)
+        return TaskFailure("E 입력 오류", classify_exception(e))
+
+
+def _postpone(driver, skip_first=False):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    try:
+        if not skip_first:
+            logger.debug("👉 [3/4] 패턴 불일치 → '작업 미루기' 버튼 클릭 시도 중...")
+            postpone_btn = WebDriverWait(driver, BUTTON_TIMEOUT).until(
+                EC.element_to_be_clickable((By.XPATH, "//button[text()='작업 미루기']"))
+            )
+            postpone_btn.click()
+            logger.debug("✅ '작업 미루기' 버튼 클릭 완료")
+        logger.debug("👉 [4/4] '아무에게나 미루기' 버튼 클릭 시도 중...")
+        assign_any_btn = WebDriverWait(driver, BUTTON_TIMEOUT).until(
+            EC.element_to_be_clickable((By.XPATH, "//button[text()='아무에게나 미루기']"))
+        )
+        assign_any_btn.click()
+        logger.debug("✅ '아무에게나 미루기' 버튼 클릭 완료")
+        return "작업 미루기"
+    except Exception as e:
+        if _driver_lost(driver, e):
+            raise
+        logger.error(f"❌ [4/4 실패] '작업 미루기' 버튼 클릭 중 오류", exc_info=True)
+        kind = classify_exception(e)
+        # 버튼을 기다리다 시간이 지난 것은 버튼이 없는 것으로 봅니다.
+        return TaskFailure("미루기 오류", FAIL_NO_BUTTON if kind == FAIL_TIMEOUT else kind)
+
+
+def _assign_any_visible(driver):
+    """
+    '아무에게나 미루기' 버튼이 이미 보이면(= '작업 미루기'를 눌렀으면) True.
+    """
+    from selenium.webdriver.common.by import By
+
+    try:
+        buttons = driver.find_elements(By.XPATH, "//button[text()='아무에게나 미루기']")
+        return any(button.is_displayed() for button in buttons)
+    except Exception:
+        return False
+
+
+def _perform_action_fast(driver, is_match, matched_word):
+    """
+    미루기를 execute_async_script 한 번으로 수행합니다.
+    'E' 입력은 실제 키 입력이어야 하므로 항상 단계별 경로(_press_e)를 씁니다.
+    페이지에서 끝내지 못한 단계는 단계별 경로(_postpone)로 이어서 처리합니다.
+    """
+    if is_match:
+        return _press_e(driver, matched_word)
+    try:
+        ensure_script_timeout(driver, BUTTON_TIMEOUT * 2 + 5)
+        code = driver.execute_async_script(_POSTPONE_JS, BUTTON_TIMEOUT * 1000)
+    except Exception as e:
+        if _driver_lost(driver, e):
+            raise
+        # 스크립트가 '작업 미루기'까지 누른 뒤 실패했으면 같은 버튼을 다시 누르지 않습니다.
+        skip_first = _assign_any_visible(driver)
+        logger.warning(f"⚠ [3/4] 스크립트 작업 실행 실패. 단계별 방식으로 "
+                       f"{'[4/4]부터 이어갑니다' if skip_first else '다시 시도합니다'}.", exc_info=True)
+        return _postpone(driver, skip_first=skip_first)
+
+    if code == "POSTPONED":
+        logger.debug("✅ [4/4] '작업 미루기' → '아무에게나 미루기' 클릭 완료 (스크립트)")
+        return "작업 미루기"
+    if code == "NO_ASSIGN_BUTTON":
+        logger.warning("⚠ [4/4] 스크립트에서 '아무에게나 미루기' 버튼을 찾지 못해 단계별 방식으로 이어갑니다.")
+        return _postpone(driver, skip_first=True)
+    logger.warning(f"⚠ [3/4] 스크립트 작업 결과 '{code}'. 단계별 방식으로 다시 시도합니다.")
+    return _postpone(driver)
+
+
+def finish_task(timestamp, href_result, match_result, action_taken, page_start, post_delay=0,
+                matched_word=None):
+    """
+    작업 하나의 마무리(요약 로그, 엑셀 로그, 실행 기록 DB, 지표 기록)를 합니다.
+    process_page가 부르며, 작업 시작 시 metrics.begin_task()를 불러 두어야
+    단계별 시간이 실행 기록에 함께 남습니다.
+    """
+    # 작업당 요약 한 줄 (단계별 상세 내용은 DEBUG 레벨)
+    logger.info(f"📋 {action_taken} | {match_result} | {href_result} "
+                f"({(time.monotonic() - page_start) * 1000:.0f}ms)")
+    stage_start = time.monotonic()
+    log_to_excel(timestamp, href_result, match_result, action_taken)
+    metrics.record("log", time.monotonic() - stage_start)
+    if post_delay > 0:
+        logger.debug("%s초 대기 후 다음 작업으로 넘어갑니다...", post_delay)
+        with metrics.stage("post_delay"):
+            time.sleep(post_delay)
+    metrics.record("page", time.monotonic() - page_start)
+    domain = extract_domain_name(href_result) if href_result != "N/A" else None
+    record_history(timestamp, href_result, domain, matched_word, match_result, action_taken,
+                   metrics.task_stages())
+    metrics.record_task(action_taken, ok=not isinstance(action_taken, TaskFailure))
+
+
+def _on_login_page(driver):
+    try:
+        return "/login" in driver.current_url
+    except Exception:
+        return False
+
+
+def _has_task_link(driver):
+    # 이전 작업의 링크라도 남아 있으면 느린 것이고, 하나도 없으면 작업 큐가 빈 것입니다.
+    try:
+        return read_task_link(driver) is not None
+    except Exception:
+        return True
+
+
+def process_page(driver, patterns, cursor=None, use_observer=False, fast=False):
+    """
+    현재 작업 하나를 처리하고 (href, 패턴 결과, 작업) 튜플을 반환합니다.
+
+    cursor(TaskCursor)를 넘기면 이전 작업과 다른 링크가 나타날 때까지 기다린 뒤 처리하며,
+    고정 대기 없이 바로 반환합니다. cursor는 작업이 성공했을 때만 이번 링크로 옮겨지므로
+    실패한 작업은 다음 호출에서 기다리지 않고 다시 처리합니다. 작업 간 간격은 호출하는 쪽의 Pacer가 맞춥니다.
+    cursor 없이 호출하면 예전처럼 처리 후 LEGACY_POST_DELAY초 기다립니다.
+
+    fast=True면 href 읽기와 미루기를 각각 execute_script 한 번으로 처리하고,
+    실패한 단계는 기존 단계별 방식으로 대신합니다. 'E'는 두 방식 모두 실제 키 입력(ActionChains)입니다.
+    반환값과 로그는 두 방식이 같습니다.
+
+    실패하면 작업 값은 failure_policy.TaskFailure이며 kind로 실패 종류를 알 수 있습니다.
+    단, 드라이버가 죽었거나 작업창이 닫힌 오류는 기록만 하고 다시 발생시킵니다.
+    (작업 루프가 SessionLost로 바꿔 세션을 새로 엽니다)
+
+    단계별 소요 시간(href, match, action_e/action_postpone, log, page)은
+    label_metrics.metrics에 기록됩니다.
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     href_result = "N/A"
     match_result = "N/A"
     action_taken = "N/A"
+    matched_word = None
+    metrics.begin_task()
+    page_start = stage_start = time.monotonic()
     try:
-        logger.info("👉 [1/4] href 추출 시도 중...")
+        logger.debug("👉 [1/4] href 추출 시도 중...")
         try:
-            href_elems = WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "span.h5 a"))
-            )
-            logger.debug(f"발견된 href 요소 개수: {len(href_elems)}")
-            href_elem = href_elems[-1]
-            href = href_elem.get_attribute("href")
+            if cursor is not None:
+                link = wait_for_next_task(driver, cursor, TASK_READY_TIMEOUT, use_observer, fast,
+                                          EMPTY_QUEUE_TIMEOUT)
+                if link is None:
+                    # 링크가 하나도 없으면 긴 대기를 다 채우지 않고 바로 알립니다.
+                    cursor.reset()
+                    logger.error("❌ [1/4 실패] 작업 링크가 없습니다. (작업 큐가 비었음)")
+                    match_result = "href 추출 실패"
+                    action_taken = TaskFailure("오류", FAIL_EMPTY_QUEUE)
+                    return href_result, match_result, action_taken
+                href_elem, href = link
+            elif fast:
+                href_elem, href = WebDriverWait(driver, 10).until(read_task_link)
+            else:
+                href_elems = WebDriverWait(driver, 10).until(
+                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "span.h5 a"))
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"발견된 href 요소 개수: {len(href_elems)}")
+                href_elem = href_elems[-1]
+                href = href_elem.get_attribute("href")
             href_result = href
-            logger.info(f"🔗 href 추출 성공: {href}")
+            metrics.record("href", time.monotonic() - stage_start)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"🔗 href 추출 성공: {href}")
         except TimeoutException:
-            logger.error("❌ [1/4 실패] href 요소를 10초 내에 찾지 못했습니다.")
+            # 같은 링크가 계속 보이면 다음 호출에서 다시 처리할 수 있도록 기억을 지웁니다.
+            if cursor is not None:
+                cursor.reset()
+            # 로그인 페이지로 돌아가 있으면 세션이 만료된 것입니다.
+            if _on_login_page(driver):
+                logger.error("❌ [1/4 실패] 로그인 페이지로 돌아가 있습니다. (세션 만료)")
+                kind = FAIL_SESSION_EXPIRED
+            elif not _has_task_link(driver):
+                logger.error("❌ [1/4 실패] 작업 링크가 없습니다. (작업 큐가 비었음)")
+                kind = FAIL_EMPTY_QUEUE
+            else:
+                logger.error("❌ [1/4 실패] 새 작업의 href 요소를 제한 시간 내에 찾지 못했습니다.")
+                kind = FAIL_TIMEOUT
             match_result = "href 추출 실패"
-            action_taken = "오류"
+            action_taken = TaskFailure("오류", kind)
             return href_result, match_result, action_taken
-        except Exception:
+        except Exception as e:
+            if _driver_lost(driver, e):
+                raise
             logger.error("❌ [1/4 실패] href 추출 중 알 수 없는 오류", exc_info=True)
             match_result = "href 추출 오류"
-            action_taken = "오류"
+            action_taken = TaskFailure("오류", classify_exception(e))
             return href_result, match_result, action_taken
 
-        logger.info("👉 [2/4] 패턴 일치 여부 확인 중...")
+        logger.debug("👉 [2/4] 패턴 일치 여부 확인 중...")
         try:
+            stage_start = time.monotonic()
             is_match, matched_word = check_href_match(href_result, patterns)
+            metrics.record("match", time.monotonic() - stage_start)
         except Exception:
             logger.error(f"❌ [2/4 실패] 패턴 검사 중 오류", exc_info=True)
             match_result = "패턴 검사 오류"
-            action_taken = "오류"
+            action_taken = TaskFailure("오류", FAIL_OTHER)
             return href_result, match_result, action_taken
 
-        if is_match:
-            try:
-                logger.info(f"👉 [3/4] 패턴 '{matched_word}' 일치 → 키보드 'E' 입력 시도")
-                match_result = f"일치 ({matched_word})"
-                actions = ActionChains(driver)
-                actions.send_keys('e').perform()
-                logger.info("⌨️ 'E' 키 입력 완료")
-                action_taken = "E (패턴 일치)"
-            except Exception:
-                logger.error(f"❌ [3/4 실패] 키보드 'E' 입력 중 오류", exc_info=True)
-                action_taken = "E 입력 오류"
+        match_result = f"일치 ({matched_word})" if is_match else "불일치"
+        stage_start = time.monotonic()
+        if fast:
+            action_taken = _perform_action_fast(driver, is_match, matched_word)
+        elif is_match:
+            action_taken = _press_e(driver, matched_word)
         else:
-            try:
-                logger.info("👉 [3/4] 패턴 불일치 → '작업 미루기' 버튼 클릭 시도 중...")
-                match_result = "불일치"
-                postpone_btn = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[text()='작업 미루기']"))
-                )
-                postpone_btn.click()
-                logger.info("✅ '작업 미루기' 버튼 클릭 완료")
-                logger.info("👉 [4/4] '아무에게나 미루기' 버튼 클릭 시도 중...")
-                assign_any_btn = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[text()='아무에게나 미루기']"))
-                )
-                assign_any_btn.click()
-                logger.info("✅ '아무에게나 미루기' 버튼 클릭 완료")
-                action_taken = "작업 미루기"
-            except Exception:
-                logger.error(f"❌ [4/4 실패] '작업 미루기' 버튼 클릭 중 오류", exc_info=True)
-                action_taken = "미루기 오류"
-    except Exception:
+            action_taken = _postpone(driver)
+        metrics.record("action_e" if is_match else "action_postpone", time.monotonic() - stage_start)
+        if cursor is not None and not isinstance(action_taken, TaskFailure):
+            cursor.advance(href_elem, href)
+    except Exception as e:
+        if _driver_lost(driver, e):
+            logger.error(f"❌ 작업 중 작업창 또는 드라이버가 종료되었습니다: {e.__class__.__name__}")
+            action_taken = TaskFailure("오류", FAIL_DRIVER_DEAD)
+            raise
         logger.error(f"❌ [기타 예외] 페이지 처리 중 알 수 없는 오류", exc_info=True)
-        action_taken = "알 수 없는 오류"
+        action_taken = TaskFailure("알 수 없는 오류", classify_exception(e))
     finally:
-        data_to_log = [timestamp, href_result, match_result, action_taken]
-        logger.info(f"📋 엑셀 로그 기록 시도: {data_to_log}")
-        log_to_excel(timestamp, href_result, match_result, action_taken)
-        logger.debug(f"3초 대기 후 현재 창을 닫습니다...")
-        time.sleep(3)
-        return href_result, match_result, action_taken
\ No newline at end of file
+        lost = failure_kind(action_taken) == FAIL_DRIVER_DEAD
+        finish_task(timestamp, href_result, match_result, action_taken, page_start,
+                    LEGACY_POST_DELAY if cursor is None and not lost else 0, matched_word)
+    return href_result, match_result, action_taken
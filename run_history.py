@@ -0,0 +1,447 @@
+"""
+실행 기록 DB (SQLite)
+
+모든 작업 결과(process_page)를 OUTPUT_DIR/history.sqlite3 한 파일에 모읍니다.
+실행마다 따로 생기는 log_<시각>.xlsx를 열어 보지 않고도 기간별 작업 수, 많이 일치한 단어,
+오류율을 조회할 수 있고, 엑셀은 필요할 때만 export로 만듭니다.
+
+기록은 TaskLogWriter처럼 백그라운드 스레드가 모아서(BATCH_SIZE행 또는 FLUSH_INTERVAL초) 한 번에 씁니다.
+조회는 별도 연결로 하므로 작업 중에도 할 수 있습니다. (WAL 모드)
+
+사용 예:
+    python run_history.py summary --since 7d --by day
+    python run_history.py words --since 7d --limit 20
+    python run_history.py errors --since 24h
+    python run_history.py export --since 2026-10-01 --output week.xlsx
+"""
+import os
+import re
+import sys
+import queue
+import atexit
+import sqlite3
+import logging
+import argparse
+import platform
+import threading
+from datetime import datetime, timedelta
+
+from label_log import OUTPUT_DIR
+
+logger = logging.getLogger("main_logger")
+
+HISTORY_FILE = "history.sqlite3"
+# 큐에서 이 개수만큼 모이거나 FLUSH_INTERVAL이 지나면 DB에 기록합니다.
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 1.0
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+ACTION_E = "E (패턴 일치)"
+ACTION_POSTPONE = "작업 미루기"
+
+# 작업별로 저장하는 단계 시간 (label_metrics 단계 이름 → 열 이름)
+STAGE_COLUMNS = {
+    "href": "href_ms",
+    "match": "match_ms",
+    "action_e": "action_ms",
+    "action_postpone": "action_ms",
+    "log": "log_ms",
+    "page": "page_ms",
+}
+
+SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    host TEXT,
+    pid INTEGER,
+    argv TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(id),
+    ts TEXT NOT NULL,
+    session TEXT,
+    href TEXT,
+    domain TEXT,
+    matched_word TEXT,
+    match_result TEXT,
+    action TEXT,
+    failure_kind TEXT,
+    href_ms REAL,
+    match_ms REAL,
+    action_ms REAL,
+    log_ms REAL,
+    page_ms REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_ts ON tasks(ts);
+CREATE INDEX IF NOT EXISTS idx_tasks_domain ON tasks(domain);
+CREATE INDEX IF NOT EXISTS idx_tasks_action ON tasks(action, ts);
+"""
+
+_COLUMNS = ("run_id", "ts", "session", "href", "domain", "matched_word", "match_result", "action",
+            "failure_kind", "href_ms", "match_ms", "action_ms", "log_ms", "page_ms")
+_INSERT = f"INSERT INTO tasks ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+_STOP = object()
+
+
+def default_history_path():
+    return os.path.join(OUTPUT_DIR, HISTORY_FILE)
+
+
+def connect(path=None):
+    """
+    실행 기록 DB에 연결하고 테이블/인덱스가 없으면 만듭니다.
+    """
+    path = path or default_history_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return conn
+
+
+class HistoryWriter:
+    """
+    작업 결과를 백그라운드 스레드에서 SQLite에 기록합니다.
+
+    write()는 큐에 넣기만 하므로 작업마다 드는 비용이 일정합니다.
+    실행(runs) 행은 처음 연결할 때 한 번 만들고, 작업 행마다 run_id를 붙입니다.
+    """
+
+    def __init__(self, path=None, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path or default_history_path()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.run_id = None
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="HistoryWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, row):
+        if self._closed:
+            return
+        self._queue.put(row)
+
+    def close(self, timeout=None):
+        """
+        남은 행을 모두 기록하고 스레드를 종료합니다.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            conn = connect(self.path)
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO runs (started_at, host, pid, argv) VALUES (?, ?, ?, ?)",
+                    (datetime.now().strftime(TIME_FORMAT), platform.node(), os.getpid(), " ".join(sys.argv)))
+            self.run_id = cursor.lastrowid
+            logger.info(f"실행 기록 DB: {self.path} (실행 #{self.run_id})")
+        except Exception:
+            logger.error(f"❌ 실행 기록 DB를 열지 못했습니다: {self.path}", exc_info=True)
+            self._closed = True
+            return
+
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                    while True:
+                        if item is _STOP:
+                            stopping = True
+                            break
+                        batch.append((self.run_id,) + item)
+                        if len(batch) >= self.batch_size:
+                            break
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+                if batch:
+                    try:
+                        with conn:
+                            conn.executemany(_INSERT, batch)
+                        self.rows_written += len(batch)
+                        logger.debug(f"실행 기록 {len(batch)}행 저장 완료")
+                    except Exception:
+                        logger.error(f"❌ 실행 기록 저장 실패 ({len(batch)}행)", exc_info=True)
+        finally:
+            conn.close()
+
+
+# --- 작업 결과 기록 (prefix_util.finish_task에서 호출) ---
+
+HISTORY_ENABLED = True
+HISTORY_PATH = None
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def init_history(path=None, enabled=True):
+    """
+    실행 기록 DB 경로와 사용 여부를 정합니다. (--history-db / --no-history)
+    path가 없으면 OUTPUT_DIR/history.sqlite3을 씁니다.
+    """
+    global HISTORY_ENABLED, HISTORY_PATH
+    HISTORY_ENABLED = enabled
+    HISTORY_PATH = path
+
+
+def get_history():
+    """
+    실행 기록 기록기(HistoryWriter)를 반환합니다. 처음 호출될 때 생성되며, 꺼져 있으면 None.
+    """
+    global _history
+    if not HISTORY_ENABLED:
+        return None
+    with _history_lock:
+        if _history is None:
+            _history = HistoryWriter(HISTORY_PATH)
+        return _history
+
+
+def close_history():
+    global _history
+    with _history_lock:
+        if _history is not None:
+            _history.close()
+            _history = None
+
+
+atexit.register(close_history)
+
+
+def record_history(timestamp, href, domain, matched_word, match_result, action, stages=None):
+    """
+    작업 하나의 결과를 실행 기록에 남깁니다. stages는 {단계 이름: 초} (label_metrics.task_stages()).
+    """
+    try:
+        history = get_history()
+        if history is None:
+            return
+        times = {}
+        for stage, seconds in (stages or {}).items():
+            column = STAGE_COLUMNS.get(stage)
+            if column:
+                times[column] = times.get(column, 0.0) + seconds * 1000
+        history.write((timestamp, threading.current_thread().name, href, domain, matched_word,
+                       match_result, str(action), getattr(action, "kind", None),
+                       times.get("href_ms"), times.get("match_ms"), times.get("action_ms"),
+                       times.get("log_ms"), times.get("page_ms")))
+    except Exception:
+        logger.error(f"❌ 실행 기록 저장 실패. 데이터: {href} / {action}", exc_info=True)
+
+
+# --- 조회 ---
+
+_RELATIVE = re.compile(r"^(\d+(?:\.\d+)?)\s*([mhdw])$")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+_PERIODS = {
+    "hour": "substr(ts, 1, 13) || ':00'",
+    "day": "substr(ts, 1, 10)",
+    "week": "strftime('%Y-W%W', ts)",
+    "month": "substr(ts, 1, 7)",
+}
+
+
+def parse_when(text, now=None):
+    """
+    '7d', '12h', '30m', '2w'(지금부터 거슬러) 또는 'YYYY-MM-DD[ HH:MM[:SS]]'를
+    DB의 시각 문자열로 바꿉니다. 비어 있으면 None.
+    """
+    if not text:
+        return None
+    text = text.strip()
+    match = _RELATIVE.match(text)
+    if match:
+        now = now or datetime.now()
+        return (now - timedelta(**{_UNITS[match.group(2)]: float(match.group(1))})).strftime(TIME_FORMAT)
+    for fmt in (TIME_FORMAT, "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt).strftime(TIME_FORMAT)
+        except ValueError:
+            continue
+    raise ValueError(f"알 수 없는 시각 형식: {text} (예: 7d, 12h, 2026-10-01)")
+
+
+def _window(since=None, until=None):
+    clauses, params = [], []
+    if since:
+        clauses.append("ts >= ?")
+        params.append(since)
+    if until:
+        clauses.append("ts < ?")
+        params.append(until)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def summary(conn, since=None, until=None, by="day"):
+    """
+    기간(by: hour/day/week/month)별 작업 수, E 수, 미루기 수, 오류 수, 오류율, 평균 처리 시간을 반환합니다.
+    """
+    where, params = _window(since, until)
+    rows = conn.execute(
+        f"SELECT {_PERIODS[by]} AS period, COUNT(*), "
+        f"SUM(action = ?), SUM(action = ?), SUM(failure_kind IS NOT NULL), AVG(page_ms) "
+        f"FROM tasks{where} GROUP BY period ORDER BY period",
+        [ACTION_E, ACTION_POSTPONE] + params).fetchall()
+    return [{
+        "period": period,
+        "tasks": total,
+        "e": e or 0,
+        "postpone": postpone or 0,
+        "errors": errors or 0,
+        "error_rate": (errors or 0) / total if total else 0.0,
+        "avg_page_ms": avg_ms,
+    } for period, total, e, postpone, errors, avg_ms in rows]
+
+
+def top_words(conn, since=None, until=None, limit=20):
+    """
+    E를 보낸 작업에서 가장 많이 일치한 패턴 단어와 도메인 수를 반환합니다.
+    """
+    where, params = _window(since, until)
+    where += (" AND" if where else " WHERE") + " action = ? AND matched_word IS NOT NULL"
+    rows = conn.execute(
+        f"SELECT matched_word, COUNT(*), COUNT(DISTINCT domain), MAX(ts) FROM tasks{where} "
+        f"GROUP BY matched_word ORDER BY COUNT(*) DESC, matched_word LIMIT ?",
+        params + [ACTION_E, limit]).fetchall()
+    return [{"word": word, "count": count, "domains": domains, "last_seen": last}
+            for word, count, domains, last in rows]
+
+
+def error_breakdown(conn, since=None, until=None):
+    """
+    실패 종류와 작업 결과별 횟수, 전체 대비 비율을 반환합니다.
+    """
+    where, params = _window(since, until)
+    total = conn.execute(f"SELECT COUNT(*) FROM tasks{where}", params).fetchone()[0]
+    where += (" AND" if where else " WHERE") + " failure_kind IS NOT NULL"
+    rows = conn.execute(
+        f"SELECT failure_kind, action, COUNT(*) FROM tasks{where} "
+        f"GROUP BY failure_kind, action ORDER BY COUNT(*) DESC", params).fetchall()
+    return total, [{"kind": kind, "action": action, "count": count, "rate": count / total if total else 0.0}
+                   for kind, action, count in rows]
+
+
+def export_history_to_xlsx(conn, xlsx_path, since=None, until=None, sheet_title="History"):
+    """
+    기간 안의 작업 행을 openpyxl write-only 모드로 엑셀 파일에 씁니다. 쓴 행 수를 반환합니다.
+    """
+    import openpyxl
+
+    where, params = _window(since, until)
+    columns = ("ts", "session", "href", "domain", "matched_word", "match_result", "action",
+               "failure_kind", "href_ms", "match_ms", "action_ms", "log_ms", "page_ms")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append(["작업시간", "세션", "href", "도메인", "일치 단어", "패턴 결과", "작업", "실패 종류",
+                  "href(ms)", "판정(ms)", "작업(ms)", "기록(ms)", "전체(ms)"])
+    count = 0
+    for row in conn.execute(f"SELECT {', '.join(columns)} FROM tasks{where} ORDER BY ts, id", params):
+        sheet.append(list(row))
+        count += 1
+
+    # 저장 도중 죽어도 기존 엑셀이 깨지지 않도록 임시 파일에 쓰고 교체합니다.
+    tmp_path = xlsx_path + ".tmp"
+    workbook.save(tmp_path)
+    os.replace(tmp_path, xlsx_path)
+    return count
+
+
+# --- 명령행 ---
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="실행 기록 DB 조회/내보내기")
+    parser.add_argument("--db", help=f"실행 기록 DB 경로 (기본: OUTPUT_DIR/{HISTORY_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_window(sub):
+        sub.add_argument("--since", help="시작 시각 (예: 7d, 12h, 2026-10-01)")
+        sub.add_argument("--until", help="끝 시각 (이 시각 미만)")
+
+    sub = commands.add_parser("summary", help="기간별 작업 수/E 수/오류율")
+    add_window(sub)
+    sub.add_argument("--by", choices=list(_PERIODS), default="day")
+
+    sub = commands.add_parser("words", help="많이 일치한 패턴 단어")
+    add_window(sub)
+    sub.add_argument("--limit", type=int, default=20)
+
+    sub = commands.add_parser("errors", help="실패 종류별 횟수와 비율")
+    add_window(sub)
+
+    sub = commands.add_parser("export", help="작업 행을 엑셀로 내보내기")
+    add_window(sub)
+    sub.add_argument("--output", help="엑셀 경로 (기본: OUTPUT_DIR/history_<시각>.xlsx)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    path = args.db or default_history_path()
+    if not os.path.exists(path):
+        print(f"실행 기록 DB가 없습니다: {path}", file=sys.stderr)
+        return 1
+    try:
+        since, until = parse_when(args.since), parse_when(args.until)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    conn = connect(path)
+    try:
+        if args.command == "summary":
+            rows = summary(conn, since, until, args.by)
+            print(f"{'기간':16s} {'작업':>8s} {'E':>8s} {'미루기':>8s} {'오류':>6s} {'오류율':>7s} {'평균(ms)':>9s}")
+            for row in rows:
+                avg = f"{row['avg_page_ms']:9.0f}" if row["avg_page_ms"] is not None else f"{'-':>9s}"
+                print(f"{row['period']:16s} {row['tasks']:8d} {row['e']:8d} {row['postpone']:8d} "
+                      f"{row['errors']:6d} {row['error_rate']:7.1%} {avg}")
+            total = sum(row["tasks"] for row in rows)
+            errors = sum(row["errors"] for row in rows)
+            print(f"{'합계':16s} {total:8d} {sum(row['e'] for row in rows):8d} "
+                  f"{sum(row['postpone'] for row in rows):8d} {errors:6d} "
+                  f"{(errors / total if total else 0.0):7.1%}")
+        elif args.command == "words":
+            print(f"{'단어':24s} {'E 수':>8s} {'도메인':>8s}  마지막")
+            for row in top_words(conn, since, until, args.limit):
+                print(f"{row['word']:24s} {row['count']:8d} {row['domains']:8d}  {row['last_seen']}")
+        elif args.command == "errors":
+            total, rows = error_breakdown(conn, since, until)
+            print(f"전체 작업 {total}건")
+            for row in rows:
+                print(f"  {row['kind']:16s} {row['action']:12s} {row['count']:8d}  {row['rate']:6.2%}")
+        elif args.command == "export":
+            output = args.output or os.path.join(
+                OUTPUT_DIR, f"history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+            try:
+                count = export_history_to_xlsx(conn, output, since, until)
+            except ImportError:
+                print("엑셀로 내보내려면 openpyxl이 필요합니다.", file=sys.stderr)
+                return 1
+            print(f"{count}행 저장: {output}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from label_metrics import metrics
+from failure_policy import FAILURE_LABELS, STEP_RETRY, STEP_RELOGIN
+
+logger = logging.getLogger("main_logger")
+
+# --- 감시(watchdog) 설정 ---
+# process_page 한 번이 이 시간(초)을 넘기면 드라이버가 멈춘 것으로 보고 강제로 끝냅니다.
+TASK_TIMEOUT = 90
+# 감시 스레드의 확인 간격 (초)
+WATCHDOG_POLL = 1.0
+# 세션을 잃은 뒤 다시 로그인하기 전 대기 시간 (초). 재로그인이 연달아 실패하면 두 배씩 늘어납니다.
+RESTART_DELAY = 10
+# 재로그인 대기 시간의 상한 (초)
+MAX_RESTART_DELAY = 300
+# 재로그인 시도 최대 횟수. 실패한 시도도 셉니다. (0 이하면 제한 없음)
+MAX_RESTARTS = 50
+
+
+class SessionLost(Exception):
+    """
+    드라이버나 작업창을 잃어 세션을 새로 열어야 할 때 발생합니다.
+    task_count에는 그 세션에서 처리한 작업 수를 담습니다.
+    relogin=False면 드라이버가 살아 있는 한 로그인은 유지하고 작업 시작부터 다시 합니다.
+    recycle=True면 고장이 아니라 계획된 브라우저 재시작(browser_recycle)이므로 기다리지 않고 바로 다시 엽니다.
+    """
+
+    def __init__(self, reason, task_count=0, relogin=True, recycle=False):
+        super().__init__(reason)
+        self.reason = reason
+        self.task_count = task_count
+        self.relogin = relogin
+        self.recycle = recycle
+
+
+def is_driver_alive(driver, window=None):
+    """
+    드라이버가 응답하고, window를 주면 그 창이 아직 열려 있는지 확인합니다.
+    """
+    try:
+        handles = driver.window_handles
+    except Exception:
+        return False
+    return window is None or window in handles
+
+
+def kill_driver(driver):
+    """
+    응답하지 않는 크롬드라이버 프로세스를 강제로 끝냅니다.
+    그 드라이버로 기다리고 있던 호출은 곧바로 오류로 돌아옵니다.
+    """
+    try:
+        process = driver.service.process
+        if process and process.poll() is None:
+            process.kill()
+    except Exception:
+        logger.debug("크롬드라이버 프로세스 종료 실패", exc_info=True)
+
+
+def quit_quietly(driver):
+    if not driver:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        logger.debug("이미 종료된 드라이버를 정리하는 중 오류 (무시)", exc_info=True)
+        kill_driver(driver)
+
+
+def close_work_window(driver, work_window):
+    """
+    작업창을 닫고 남은 창으로 돌아갑니다. ('작업 시작'을 다시 누를 수 있도록)
+    """
+    try:
+        handles = driver.window_handles
+        if work_window in handles and len(handles) > 1:
+            driver.switch_to.window(work_window)
+            driver.close()
+        remaining = [handle for handle in driver.window_handles if handle != work_window]
+        if remaining:
+            driver.switch_to.window(remaining[0])
+    except Exception:
+        logger.debug("작업창 정리 중 오류 (무시)", exc_info=True)
+
+
+def close_other_windows(driver, keep_window):
+    """
+    keep_window만 남기고 나머지 창(반쯤 열린 작업창 등)을 닫은 뒤 keep_window로 돌아갑니다.
+    """
+    try:
+        for handle in driver.window_handles:
+            if handle != keep_window:
+                driver.switch_to.window(handle)
+                driver.close()
+        driver.switch_to.window(keep_window)
+    except Exception:
+        logger.debug("작업창 정리 중 오류 (무시)", exc_info=True)
+
+
+def handle_startup_failure(policy, kind, reason, task_count=0, driver=None, keep_window=None,
+                           should_continue=None):
+    """
+    작업창을 여는 단계('작업 시작' 클릭, 새 창 대기)의 실패를 policy(FailurePolicy)에 알리고
+    항상 SessionLost를 발생시켜 SessionSupervisor가 다시 시도하게 합니다.
+    드라이버가 살아 있으면 백오프만큼 기다린 뒤 작업 시작부터 다시 하고(relogin=False),
+    연속 실패가 쌓여 다시 로그인할 차례면 relogin=True로 올립니다.
+    """
+    if driver is None or not is_driver_alive(driver):
+        raise SessionLost(f"{reason} (드라이버 종료)", task_count)
+    step = policy.failure(kind)
+    if step == STEP_RELOGIN:
+        raise SessionLost(f"{reason}, 연속 실패 {policy.consecutive}회", task_count, relogin=True)
+    if keep_window is not None:
+        close_other_windows(driver, keep_window)
+    policy.wait(should_continue)
+    raise SessionLost(reason, task_count, relogin=False)
+
+
+def handle_failure(policy, kind, task_count, driver=None, work_window=None, should_continue=None):
+    """
+    작업 루프에서 실패한 작업을 policy(FailurePolicy)에 알리고 다음 단계를 진행합니다.
+    재시도면 백오프만큼 기다렸다가 돌아오고, 작업창을 다시 열거나 다시 로그인해야 하면
+    SessionLost를 발생시켜 SessionSupervisor에 맡깁니다.
+    """
+    step = policy.failure(kind)
+    if step == STEP_RETRY:
+        policy.wait(should_continue)
+        return
+    reason = f"연속 실패 {policy.consecutive}회 ({FAILURE_LABELS.get(kind, kind)})"
+    if step != STEP_RELOGIN and driver is not None:
+        close_work_window(driver, work_window)
+    raise SessionLost(reason, task_count, relogin=(step == STEP_RELOGIN))
+
+
+class Watchdog:
+    """
+    작업 하나(process_page)마다 심장박동(heartbeat)을 남기고,
+    timeout초 안에 끝나지 않으면 드라이버를 강제로 끝내 멈춘 호출을 풀어줍니다.
+
+        with watchdog.watch(driver):
+            process_page(driver, ...)
+
+    시간을 넘긴 작업은 블록을 빠져나올 때 SessionLost를 발생시킵니다.
+    """
+
+    def __init__(self, timeout=TASK_TIMEOUT, poll=WATCHDOG_POLL):
+        self.timeout = timeout
+        self.poll = poll
+        self.fired = False
+        self._deadline = None
+        self._driver = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            name = f"{threading.current_thread().name}-Watchdog"
+            self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+            self._thread.start()
+
+    def beat(self):
+        """
+        작업이 아직 진행 중임을 알리고 제한 시간을 다시 잽니다.
+        """
+        with self._lock:
+            if self._deadline is not None:
+                self._deadline = time.monotonic() + self.timeout
+
+    @contextmanager
+    def watch(self, driver):
+        if self.timeout <= 0:
+            yield
+            return
+        self._ensure_thread()
+        with self._lock:
+            self.fired = False
+            self._driver = driver
+            self._deadline = time.monotonic() + self.timeout
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._deadline = None
+                self._driver = None
+                fired = self.fired
+            if fired:
+                raise SessionLost(f"작업이 {self.timeout}초 안에 끝나지 않음 (드라이버 응답 없음)")
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll):
+            with self._lock:
+                expired = (self._deadline is not None and not self.fired
+                           and time.monotonic() > self._deadline)
+                driver = self._driver
+                if expired:
+                    self.fired = True
+            if expired:
+                logger.error(f"❌ [감시] 작업이 {self.timeout}초 넘게 응답이 없어 드라이버를 강제 종료합니다.")
+                kill_driver(driver)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class SessionSupervisor:
+    """
+    브라우저 세션 하나를 감독합니다.
+
+    run(driver, body)는 body(driver, watchdog)를 실행하다가 SessionLost가 발생하면
+    기존 드라이버를 정리하고 login()으로 다시 로그인한 뒤 body를 처음부터(작업 시작 버튼부터) 다시 실행합니다.
+    패턴과 작업 수는 호출하는 쪽이 그대로 유지합니다.
+    재시작 횟수와 중단 시간(downtime)은 로그, report, on_restart(supervisor)로 알립니다.
+    """
+
+    def __init__(self, login, should_continue=None, report=None, on_restart=None,
+                 task_timeout=TASK_TIMEOUT, restart_delay=RESTART_DELAY, max_restarts=MAX_RESTARTS):
+        self.login = login
+        self.should_continue = should_continue or (lambda: True)
+        # 로그는 항상 남기므로 report는 UI 상태 표시 등 추가로 알릴 곳입니다.
+        self.report = report or (lambda message: None)
+        self.on_restart = on_restart
+        self.restart_delay = restart_delay
+        self.max_restarts = max_restarts
+        self.watchdog = Watchdog(task_timeout)
+        self.driver = None
+        self.restart_count = 0
+        self.restart_attempts = 0
+        self.renavigate_count = 0
+        self.recycle_count = 0
+        self.downtime = 0.0
+
+    def _sleep(self, seconds):
+        end = time.monotonic() + seconds
+        while self.should_continue() and time.monotonic() < end:
+            time.sleep(min(0.5, end - time.monotonic()))
+
+    def _restart(self, lost):
+        down_start = time.monotonic()
+        logger.warning(f"⚠ 세션을 잃었습니다: {lost.reason}. 다시 로그인합니다. "
+                       f"(재시작 {self.restart_count + 1}회째)")
+        self.report(f"⚠ 세션 끊김 ({lost.reason}). 다시 로그인합니다...")
+        quit_quietly(self.driver)
+        self.driver = None
+
+        delay = self.restart_delay
+        while self.should_continue():
+            # 로그인이 계속 실패해도 끝없이 다시 시도하지 않도록 성공 여부와 관계없이 시도 횟수를 셉니다.
+            if self.max_restarts > 0 and self.restart_attempts >= self.max_restarts:
+                logger.error(f"❌ 재로그인 시도가 {self.max_restarts}회에 도달해 세션을 종료합니다.")
+                self.report("❌ 재시작 횟수 초과. 작업을 종료합니다.")
+                return False
+            self._sleep(delay)
+            if not self.should_continue():
+                break
+            self.restart_attempts += 1
+            try:
+                self.driver = self.login()
+            except Exception:
+                logger.error("❌ 재로그인 중 오류", exc_info=True)
+                self.driver = None
+            if self.driver:
+                break
+            # 사이트 장애 등으로 계속 실패하면 간격을 늘려 로그인 요청을 줄입니다.
+            delay = min(delay * 2, MAX_RESTART_DELAY)
+            logger.warning(f"⚠ 재로그인 실패. {delay:.0f}초 후 다시 시도합니다.")
+
+        if not self.driver:
+            return False
+        downtime = time.monotonic() - down_start
+        self.restart_count += 1
+        self.downtime += downtime
+        metrics.record("restart_downtime", downtime)
+        logger.info(f"✅ 세션 재시작 완료 (재시작 {self.restart_count}회, 이번 중단 {downtime:.1f}초, "
+                    f"누적 중단 {self.downtime:.1f}초)")
+        self.report(f"✅ 세션 재시작 완료 (재시작 {self.restart_count}회, 중단 {downtime:.0f}초)")
+        if self.on_restart:
+            self.on_restart(self)
+        return True
+
+    def _recycle(self, lost):
+        logger.info(f"♻ 브라우저를 새로 엽니다: {lost.reason} (재활용 {self.recycle_count + 1}회째)")
+        self.report(f"♻ 브라우저 재시작 중... ({lost.reason})")
+        start = time.monotonic()
+        quit_quietly(self.driver)
+        self.driver = None
+        try:
+            self.driver = self.login()
+        except Exception:
+            logger.error("❌ 브라우저 재시작 후 로그인 중 오류", exc_info=True)
+            self.driver = None
+        if not self.driver:
+            return self._restart(SessionLost("브라우저 재시작 후 로그인 실패"))
+        self.recycle_count += 1
+        seconds = time.monotonic() - start
+        metrics.record("recycle", seconds)
+        logger.info(f"♻ 브라우저 재시작 완료 ({seconds:.1f}초, 재활용 누적 {self.recycle_count}회)")
+        self.report(f"♻ 브라우저 재시작 완료 ({seconds:.0f}초)")
+        return True
+
+    def _renavigate(self, lost):
+        self.renavigate_count += 1
+        logger.warning(f"⚠ {lost.reason}. 작업창을 다시 엽니다. (로그인 유지, {self.renavigate_count}회째)")
+        self.report(f"⚠ {lost.reason}. 작업창을 다시 엽니다...")
+
+    def run(self, driver, body):
+        """
+        처리한 작업 수의 합을 반환합니다. 마지막 드라이버는 self.driver에 남으며 호출하는 쪽이 닫습니다.
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        self.driver = driver
+        total = 0
+        try:
+            while True:
+                try:
+                    return total + (body(self.driver, self.watchdog) or 0)
+                except (SessionLost, WebDriverException) as e:
+                    if not isinstance(e, SessionLost):
+                        if is_driver_alive(self.driver):
+                            raise
+                        e = SessionLost(f"드라이버 오류 ({e.__class__.__name__})")
+                    total += e.task_count
+                    if not self.should_continue():
+                        return total
+                    if not e.relogin and is_driver_alive(self.driver):
+                        self._renavigate(e)
+                        continue
+                    if not (self._recycle(e) if e.recycle else self._restart(e)):
+                        return total
+        finally:
+            self.watchdog.stop()
@@ -0,0 +1,374 @@
+"""
+라벨크래프트 로컬 대역(stand-in) 서버
+
+실제 label-craft 사이트 없이 로그인 → 작업 시작(#reviewStart) → 작업창(span.h5 a)
+→ 'E' 단축키 / '작업 미루기' → '아무에게나 미루기' 흐름을 재현합니다.
+응답 지연과 패턴 일치/불일치 URL 비율을 조절할 수 있고,
+서버가 알고 있는 정답과 실제 처리 결과를 비교해 /api/stats로 알려줍니다.
+--queue-limit 46=0 처럼 작업 큐마다 내줄 작업 수를 제한하면 빈 큐(span.h5 a 없음)도 재현합니다.
+
+사용 예:
+    python standin_server.py --port 8765 --latency 0.2 --match-ratio 0.3 --patterns-file patterns.csv
+    LABEL_BASE_URL=http://127.0.0.1:8765 python main_2.py --patterns-file patterns.csv
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+import secrets
+from http.cookies import SimpleCookie
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PATTERNS = ["blogtest", "dailylog", "myhome", "travelnote", "cookbook"]
+SESSION_COOKIE = "standin_session"
+
+_LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>로그인</title></head><body>
+<form method="post" action="/login">
+  <input type="text" id="exampleInputEmail" name="email">
+  <input type="password" id="exampleInputPassword" name="password">
+  <button type="submit">로그인</button>
+</form>
+</body></html>"""
+
+_HOME_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>작업 목록</title></head><body>
+<div id="accordionSidebar"><a href="/"><img src="/static/logo.png" alt="logo" width="32" height="32"></a></div>
+<h1>작업 {queue}</h1>
+<button type="button" id="reviewStart" onclick="window.open('/review/{queue}/', '_blank')">작업 시작</button>
+</body></html>"""
+
+_REVIEW_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>작업</title></head><body>
+<div id="accordionSidebar"><a href="/"><img src="/static/logo.png" alt="logo" width="32" height="32"></a></div>
+<div id="task">{task_html}</div>
+<button type="button" id="postpone">작업 미루기</button>
+<div id="postpone-dialog" style="display:none">
+  <button type="button" id="assign-any">아무에게나 미루기</button>
+</div>
+<script>
+var queue = {queue};
+var taskId = {task_id};
+var dialogDelay = {dialog_delay_ms};
+function render(task) {{
+    var wrap = document.getElementById('task');
+    wrap.innerHTML = '';
+    if (!task) {{ taskId = null; return; }}
+    var span = document.createElement('span');
+    span.className = 'h5';
+    var a = document.createElement('a');
+    a.href = task.url;
+    a.textContent = task.url;
+    span.appendChild(a);
+    wrap.appendChild(span);
+    taskId = task.id;
+}}
+function send(action) {{
+    if (taskId === null) return;
+    var id = taskId;
+    taskId = null;
+    document.getElementById('task').innerHTML = '';
+    fetch('/api/tasks/' + queue + '/' + id + '/' + action, {{method: 'POST', credentials: 'same-origin'}})
+        .then(function (r) {{ return r.json(); }})
+        .then(function (data) {{ render(data.next); }});
+}}
+document.addEventListener('keydown', function (e) {{
+    if ((e.key === 'e' || e.key === 'E') && !/INPUT|TEXTAREA/.test(e.target.tagName)) send('submit');
+}});
+document.getElementById('postpone').onclick = function () {{
+    setTimeout(function () {{
+        document.getElementById('postpone-dialog').style.display = 'block';
+    }}, dialogDelay);
+}};
+document.getElementById('assign-any').onclick = function () {{
+    document.getElementById('postpone-dialog').style.display = 'none';
+    send('postpone');
+}};
+</script>
+</body></html>"""
+
+# 1x1 투명 PNG
+_LOGO_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+class TaskFactory:
+    """
+    패턴 일치/불일치 URL을 섞어 작업을 만듭니다. 각 작업의 정답(일치 여부)을 기억합니다.
+    """
+
+    def __init__(self, patterns, match_ratio=0.3, seed=None):
+        self.patterns = list(patterns) or DEFAULT_PATTERNS
+        self.match_ratio = match_ratio
+        self.random = random.Random(seed)
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def create(self):
+        with self._lock:
+            task_id = self._next_id
+            self._next_id += 1
+            rnd = self.random
+            is_match = rnd.random() < self.match_ratio
+            if is_match:
+                host = f"{rnd.choice(self.patterns)}{rnd.randint(1000, 999999)}.tistory.com"
+            elif rnd.random() < 0.5:
+                # 패턴 단어지만 숫자가 4자리 미만이라 일치하지 않는 경우
+                host = f"{rnd.choice(self.patterns)}{rnd.randint(0, 999)}.tistory.com"
+            else:
+                host = rnd.choice(["news.example.com", "shop.example.net", "cafe.example.org",
+                                   f"other{rnd.randint(1000, 9999)}.tistory.com"])
+            url = f"https://{host}/{rnd.randint(1, 9999)}"
+        return {"id": task_id, "url": url, "expected": "submit" if is_match else "postpone"}
+
+
+class StandInState:
+    def __init__(self, factory, latency=0.0, jitter=0.0, dialog_delay=0.05,
+                 username=None, password=None, queue_limits=None):
+        self.factory = factory
+        # 작업 큐 번호 → 내줄 수 있는 작업 수 (없으면 무제한)
+        self.queue_limits = dict(queue_limits or {})
+        self.served_by_queue = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.dialog_delay = dialog_delay
+        self.username = username
+        self.password = password
+        self.sessions = set()
+        self.tasks = {}
+        self.current = {}
+        self.stats = {"served": 0, "submit": 0, "postpone": 0, "correct": 0, "wrong": 0, "duplicate": 0}
+        self.lock = threading.Lock()
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def next_task(self, session, queue):
+        with self.lock:
+            served = self.served_by_queue.get(queue, 0)
+            limit = self.queue_limits.get(queue)
+            if limit is not None and served >= limit:
+                self.current.pop((session, queue), None)
+                return None
+            self.served_by_queue[queue] = served + 1
+        task = self.factory.create()
+        with self.lock:
+            self.tasks[task["id"]] = dict(task, done=False)
+            self.current[(session, queue)] = task["id"]
+            self.stats["served"] += 1
+        return {"id": task["id"], "url": task["url"]}
+
+    def current_task(self, session, queue):
+        with self.lock:
+            task_id = self.current.get((session, queue))
+            task = self.tasks.get(task_id)
+            if task and not task["done"]:
+                return {"id": task["id"], "url": task["url"]}
+        return self.next_task(session, queue)
+
+    def complete(self, task_id, action):
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return False
+            if task["done"]:
+                self.stats["duplicate"] += 1
+                return True
+            task["done"] = True
+            self.stats[action] += 1
+            self.stats["correct" if task["expected"] == action else "wrong"] += 1
+            return True
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["queues"] = {str(queue): served for queue, served in sorted(self.served_by_queue.items())}
+        done = stats["submit"] + stats["postpone"]
+        stats["error_rate"] = stats["wrong"] / done if done else 0.0
+        return stats
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server_version = "LabelStandIn/1.0"
+    state = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    # --- 응답 헬퍼 ---
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, data, status=200):
+        self._send(status, json.dumps(data, ensure_ascii=False), "application/json; charset=utf-8")
+
+    def _redirect(self, location, headers=None):
+        self._send(302, b"", headers=dict(headers or {}, Location=location))
+
+    def _session(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        morsel = cookie.get(SESSION_COOKIE)
+        if morsel and morsel.value in self.state.sessions:
+            return morsel.value
+        return None
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length).decode("utf-8") if length else ""
+
+    # --- 라우팅 ---
+    def do_GET(self):
+        path = urlparse(self.path).path
+        state = self.state
+        if path == "/static/logo.png":
+            return self._send(200, _LOGO_PNG, "image/png")
+        if path == "/login":
+            return self._send(200, _LOGIN_PAGE)
+        if path == "/api/stats":
+            return self._json(state.snapshot())
+
+        session = self._session()
+        if session is None:
+            if path.startswith("/api/"):
+                return self._json({"error": "unauthorized"}, 401)
+            return self._redirect("/login")
+
+        state.delay()
+        if path == "/":
+            return self._redirect("/tasks/45/")
+        m = re.fullmatch(r"/tasks/(\d+)/", path)
+        if m:
+            return self._send(200, _HOME_PAGE.format(queue=m.group(1)))
+        m = re.fullmatch(r"/review/(\d+)/", path)
+        if m:
+            queue = int(m.group(1))
+            task = state.current_task(session, queue)
+            if task:
+                task_html = f'<span class="h5"><a href="{task["url"]}">{task["url"]}</a></span>'
+            else:
+                task_html = '<p>작업이 없습니다.</p>'
+            return self._send(200, _REVIEW_PAGE.format(
+                queue=queue, task_id=task["id"] if task else "null", task_html=task_html,
+                dialog_delay_ms=int(state.dialog_delay * 1000)))
+        m = re.fullmatch(r"/api/tasks/(\d+)/current", path)
+        if m:
+            return self._json({"task": state.current_task(session, int(m.group(1)))})
+        self._send(404, "not found")
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        state = self.state
+        if path == "/login":
+            form = parse_qs(self._read_body())
+            email = (form.get("email") or [""])[0]
+            password = (form.get("password") or [""])[0]
+            state.delay()
+            if not email or (state.username and (email, password) != (state.username, state.password)):
+                return self._send(200, _LOGIN_PAGE)
+            session = secrets.token_hex(16)
+            with state.lock:
+                state.sessions.add(session)
+            return self._redirect("/", {"Set-Cookie": f"{SESSION_COOKIE}={session}; Path=/; HttpOnly"})
+
+        session = self._session()
+        if session is None:
+            return self._json({"error": "unauthorized"}, 401)
+
+        m = re.fullmatch(r"/api/tasks/(\d+)/(\d+)/(submit|postpone)", path)
+        if m:
+            queue, task_id, action = int(m.group(1)), int(m.group(2)), m.group(3)
+            state.delay()
+            if not state.complete(task_id, action):
+                return self._json({"error": "unknown task"}, 404)
+            return self._json({"ok": True, "next": state.next_task(session, queue)})
+        self._send(404, "not found")
+
+
+class StandInServer:
+    """
+    대역 서버를 백그라운드 스레드에서 실행합니다. port=0이면 빈 포트를 사용합니다.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, patterns=None, match_ratio=0.3,
+                 latency=0.0, jitter=0.0, dialog_delay=0.05, seed=None,
+                 username=None, password=None, queue_limits=None):
+        factory = TaskFactory(patterns or DEFAULT_PATTERNS, match_ratio, seed)
+        self.state = StandInState(factory, latency, jitter, dialog_delay, username, password, queue_limits)
+        handler = type("BoundStandInHandler", (StandInHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="StandInServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def parse_queue_limits(items):
+    """
+    ['46=0', '47=100'] 형식을 {46: 0, 47: 100}으로 바꿉니다.
+    """
+    limits = {}
+    for item in items:
+        queue, _, count = item.partition("=")
+        limits[int(queue)] = int(count)
+    return limits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="라벨크래프트 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--patterns-file", help="일치 URL을 만들 때 쓸 패턴 CSV (없으면 기본 단어)")
+    parser.add_argument("--match-ratio", type=float, default=0.3, help="패턴 일치 URL 비율")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="응답 지연 변동폭 (초)")
+    parser.add_argument("--dialog-delay", type=float, default=0.05, help="미루기 대화상자 표시 지연 (초)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--queue-limit", action="append", default=[], metavar="QUEUE=N",
+                        help="작업 큐마다 내줄 작업 수 (예: 46=0이면 항상 빈 큐, 여러 번 지정 가능)")
+    args = parser.parse_args()
+
+    patterns = None
+    if args.patterns_file:
+        from pattern_store import load_patterns_from_file
+        patterns = load_patterns_from_file(args.patterns_file)
+    server = StandInServer(args.host, args.port, patterns, args.match_ratio, args.latency,
+                           args.jitter, args.dialog_delay, args.seed,
+                           queue_limits=parse_queue_limits(args.queue_limit))
+    print(f"대역 서버 실행 중: {server.base_url} (Ctrl+C로 종료)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.state.snapshot(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import time
+import logging
+import importlib
+import threading
+from contextlib import contextmanager
+
+from label_metrics import metrics
+
+logger = logging.getLogger("main_logger")
+
+
+class PatternLoader:
+    """
+    PatternStore.load()와 matcher 생성을 백그라운드 스레드에서 한 번만 실행합니다.
+    여러 세션이 같은 PatternLoader를 공유해 결과를 함께 기다릴 수 있습니다.
+
+    ok는 불러오는 중이면 None, 성공하면 True, 실패하면 False입니다.
+    성공하면 자동 갱신(start_reloader)도 시작합니다. 그 전에 실행이 끝나 stop_reloader()가 불렸으면
+    (로그인 실패, 취소 등) 자동 갱신을 시작하지 않습니다.
+    """
+
+    def __init__(self, pattern_store, report=None):
+        self.pattern_store = pattern_store
+        self.report = report or (lambda message: None)
+        self.ok = None
+        self.seconds = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def failed(self):
+        return self.ok is False
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="PatternLoad", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        start = time.monotonic()
+        self.report("패턴 로드 중...")
+        try:
+            ok = self.pattern_store.load()
+        except Exception:
+            logger.error("❌ 패턴 로드 중 오류", exc_info=True)
+            ok = False
+        self.seconds = time.monotonic() - start
+        metrics.record("startup_patterns", self.seconds)
+        if ok and self.pattern_store.closed:
+            logger.info("실행이 이미 끝나 패턴 자동 갱신을 시작하지 않습니다.")
+        elif ok:
+            self.pattern_store.start_reloader()
+            self.report(f"✅ 패턴 {len(self.pattern_store.patterns)}개 준비 완료 ({self.seconds:.1f}초)")
+            if self.pattern_store.stale:
+                self.report("⚠ 오래된 패턴 스냅샷으로 시작합니다. (백그라운드 갱신 중)")
+        else:
+            self.report("❌ 패턴을 불러오지 못했습니다.")
+        self.ok = bool(ok)
+        self.done.set()
+
+    def wait(self, timeout=None, cancelled=None):
+        """
+        로드가 끝나기를 기다려 ok를 반환합니다. timeout이 지나거나 cancelled()가 True가 되면
+        기다리지 않고 돌아오며, 그때 아직 불러오는 중이면 None을 반환합니다.
+        """
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done.is_set():
+            if cancelled is not None and cancelled():
+                break
+            remaining = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+            if remaining <= 0:
+                break
+            self.done.wait(remaining)
+        return self.ok
+
+
+def concurrent_startup(loader, login, report=None, cancelled=None):
+    """
+    패턴 로드(loader)와 로그인(login)을 동시에 진행합니다.
+
+    login(cancelled)은 드라이버(또는 세션)를 반환하는 함수이며, 넘겨받은 cancelled()가
+    True가 되면 중간에 멈추고 None을 반환해야 합니다. (label_login의 cancelled 인자)
+    패턴 로드가 실패하면 로그인을 취소하고, 로그인이 실패하면 패턴을 기다리지 않고 바로 돌아옵니다.
+
+    (드라이버, 오류 메시지) 튜플을 반환합니다. 성공하면 오류 메시지는 None입니다.
+    로그인은 됐지만 패턴이 실패하거나 패턴을 기다리는 중에 취소되면 드라이버와 오류 메시지를 함께 반환하므로
+    호출하는 쪽이 닫아야 합니다.
+    """
+    report = report or (lambda message: None)
+    start = time.monotonic()
+    loader.start()
+
+    def _cancelled():
+        return loader.failed or bool(cancelled and cancelled())
+
+    report("로그인 시도 중... (패턴은 동시에 불러옵니다)")
+    login_start = time.monotonic()
+    driver = login(_cancelled)
+    login_seconds = time.monotonic() - login_start
+    metrics.record("startup_login", login_seconds)
+
+    if not driver:
+        if loader.failed:
+            return None, "❌ 패턴을 불러오지 못했습니다."
+        if cancelled and cancelled():
+            return None, "🛑 시작이 취소되었습니다."
+        return None, "❌ 로그인 실패. 아이디/비밀번호를 확인하세요."
+
+    if not loader.done.is_set():
+        report(f"✅ 로그인 완료 ({login_seconds:.1f}초). 패턴 준비를 기다립니다...")
+    # 구글시트 응답이 멈춰도 중지 요청으로 빠져나올 수 있도록 취소를 확인하며 기다립니다.
+    if not loader.wait(cancelled=cancelled):
+        if cancelled and cancelled():
+            return driver, "🛑 시작이 취소되었습니다."
+        return driver, "❌ 패턴을 불러오지 못했습니다."
+
+    total = time.monotonic() - start
+    metrics.record("startup", total)
+    logger.info(f"⏱ 시작 준비 완료 {total:.1f}초 (로그인 {login_seconds:.1f}초, 패턴 {loader.seconds:.1f}초, 동시 진행)")
+    return driver, None
+
+
+class StartupTimer:
+    """
+    시작 과정의 구간별 소요 시간(모듈 가져오기 등)과 시점(창 표시 등)을 잽니다.
+    시점은 start(기본: 생성 시각)부터 잰 초입니다.
+
+        timer = StartupTimer()
+        with timer.section("PySide6"):
+            from PySide6.QtWidgets import QApplication
+        timer.mark("창 표시")
+        timer.report("UI 시작")
+
+    snapshot()은 label_metrics의 add_info()에 넘겨 지표 파일에 함께 남길 수 있습니다.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.sections = {}
+        self.marks = {}
+
+    @contextmanager
+    def section(self, name):
+        section_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections[name] = self.sections.get(name, 0.0) + time.perf_counter() - section_start
+
+    def import_module(self, name):
+        with self.section(name):
+            return importlib.import_module(name)
+
+    def mark(self, name):
+        self.marks[name] = time.perf_counter() - self.start
+        return self.marks[name]
+
+    def snapshot(self):
+        return {"sections": dict(self.sections), "marks": dict(self.marks)}
+
+    def report(self, title):
+        text = ", ".join(f"{name} {seconds:.2f}초" for name, seconds in self.marks.items())
+        if self.sections:
+            sections = ", ".join(f"{name} {seconds:.2f}초" for name, seconds in
+                                 sorted(self.sections.items(), key=lambda item: item[1], reverse=True))
+            text = f"{text} (구간: {sections})" if text else f"구간: {sections}"
+        logger.info(f"⏱ {title}: {text or '-'}")
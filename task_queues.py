@@ -0,0 +1,329 @@
+"""
+여러 작업 큐(tasks/<번호>/)를 나눠 처리하는 스케줄러
+"""
+import re
+import csv
+import time
+import logging
+import threading
+
+from label_admin import BASE_URL, HOME_URL
+from label_metrics import metrics
+from failure_policy import TaskFailure, FAIL_EMPTY_QUEUE
+from session_watchdog import SessionLost, close_work_window
+from run_history import ACTION_E, ACTION_POSTPONE
+
+logger = logging.getLogger("main_logger")
+
+# 비었다고 판단한 큐를 다시 쓰기까지 쉬는 시간 (초)
+EMPTY_COOLDOWN = 60
+
+
+class TaskQueue:
+    """
+    작업 큐 하나의 설정(번호, 가중치, 우선순위, 패턴 파일)과 처리 통계를 담습니다.
+    """
+
+    def __init__(self, queue_id, name=None, weight=1.0, priority=0, patterns_file=None):
+        self.queue_id = int(queue_id)
+        self.name = name or str(self.queue_id)
+        if weight <= 0:
+            raise ValueError(f"작업 큐 {self.queue_id}의 가중치는 0보다 커야 합니다: {weight}")
+        self.weight = float(weight)
+        self.priority = int(priority)
+        self.patterns_file = patterns_file or None
+        self.pattern_store = None
+        self.empty_until = 0.0
+        # 통계
+        self.tasks = 0
+        self.e = 0
+        self.postpone = 0
+        self.errors = 0
+        self.empty_count = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def home_url(self):
+        return f"{BASE_URL}/tasks/{self.queue_id}/"
+
+    def __repr__(self):
+        return f"TaskQueue({self.queue_id}, name={self.name!r}, weight={self.weight}, priority={self.priority})"
+
+
+def queue_from_url(url):
+    """
+    '/tasks/45/' 형식의 주소에서 작업 큐 번호(45)를 꺼냅니다.
+    """
+    m = re.search(r"/tasks/(\d+)/?", url)
+    if not m:
+        raise ValueError(f"작업 큐 번호를 찾을 수 없는 주소입니다: {url}")
+    return int(m.group(1))
+
+
+def parse_queue_spec(spec):
+    """
+    '45,46:2,47:1:10' 형식(번호[:가중치[:우선순위]])을 TaskQueue 목록으로 바꿉니다.
+    """
+    queues = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        parts = item.split(":")
+        try:
+            if len(parts) > 3:
+                raise ValueError(item)
+            queues.append(TaskQueue(parts[0],
+                                    weight=float(parts[1]) if len(parts) > 1 and parts[1] else 1.0,
+                                    priority=int(parts[2]) if len(parts) > 2 and parts[2] else 0))
+        except ValueError:
+            raise ValueError(f"작업 큐 형식이 잘못되었습니다: {item} (번호[:가중치[:우선순위]])") from None
+    return queues
+
+
+def load_queues_from_file(path):
+    """
+    큐 목록 CSV(큐번호,이름,가중치,우선순위,패턴파일)를 읽습니다. 첫 행은 헤더입니다.
+    """
+    logger.info(f"로컬 파일에서 작업 큐 목록 불러오는 중: {path}")
+    queues = []
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        for row in list(csv.reader(f))[1:]:
+            if not row or not row[0].strip():
+                continue
+            row = [cell.strip() for cell in row] + [""] * 4
+            queues.append(TaskQueue(row[0], name=row[1] or None,
+                                    weight=float(row[2]) if row[2] else 1.0,
+                                    priority=int(row[3]) if row[3] else 0,
+                                    patterns_file=row[4] or None))
+    logger.info(f"✅ 작업 큐 {len(queues)}개 불러옴")
+    return queues
+
+
+def build_scheduler(queues_spec=None, queues_file=None, empty_cooldown=EMPTY_COOLDOWN,
+                    reload_interval=0):
+    """
+    --queues / --queues-file 옵션으로 QueueScheduler를 만듭니다. 둘 다 없으면 HOME_URL의 큐 하나만 씁니다.
+    """
+    if queues_file:
+        queues = load_queues_from_file(queues_file)
+    elif queues_spec:
+        queues = parse_queue_spec(queues_spec)
+    else:
+        queues = [TaskQueue(queue_from_url(HOME_URL))]
+    if not queues:
+        raise ValueError("작업 큐가 하나도 없습니다.")
+    return QueueScheduler(queues, empty_cooldown, reload_interval)
+
+
+class QueueScheduler:
+    """
+    세션(스레드 이름 등)을 작업 큐에 배정하고, 빈 큐를 건너뛰며, 큐별 통계를 모읍니다.
+    여러 세션 스레드가 함께 씁니다.
+
+        queue, wait = scheduler.assign(session)      # 작업창을 열기 전에
+        ...
+        scheduler.record_task(queue, action)         # 작업마다
+        if scheduler.should_switch(session): ...     # 작업 사이에 다른 큐로 옮길지
+        scheduler.mark_empty(queue)                  # 큐가 비었을 때
+    """
+
+    def __init__(self, queues, empty_cooldown=EMPTY_COOLDOWN, reload_interval=0):
+        ids = [queue.queue_id for queue in queues]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"작업 큐 번호가 중복되었습니다: {ids}")
+        self.queues = list(queues)
+        self.empty_cooldown = empty_cooldown
+        self.reload_interval = reload_interval
+        self._assigned = {}
+        self._assigned_at = {}
+        self._lock = threading.Lock()
+        self._stopped = False
+        metrics.add_info("queues", self.snapshot)
+
+    @property
+    def switchable(self):
+        """
+        옮겨 갈 다른 큐가 있는지. 큐가 하나면 빈 큐도 예전처럼 실패 정책(백오프)으로 처리합니다.
+        """
+        return len(self.queues) > 1
+
+    def _load(self, queue):
+        return sum(1 for assigned in self._assigned.values() if assigned is queue)
+
+    def _release(self, session, now):
+        queue = self._assigned.pop(session, None)
+        started = self._assigned_at.pop(session, None)
+        if queue is not None and started is not None:
+            queue.busy_seconds += now - started
+        return queue
+
+    def _choose(self, now):
+        # 우선순위가 가장 높은 큐들 중에서 (맡은 세션 수 / 가중치)가 가장 작은 큐를 고릅니다.
+        available = [queue for queue in self.queues if queue.empty_until <= now]
+        if not available:
+            queue = min(self.queues, key=lambda q: q.empty_until)
+            return queue, queue.empty_until - now
+        top = max(queue.priority for queue in available)
+        tier = [queue for queue in available if queue.priority == top]
+        return min(tier, key=lambda q: (self._load(q) / q.weight, -q.weight)), 0.0
+
+    def assign(self, session):
+        """
+        session을 새로 배정해 (큐, 기다릴 시간)을 반환합니다. 모든 큐가 비어 있으면
+        가장 먼저 돌아오는 큐와 그때까지 남은 시간(초)을 반환하므로, 그만큼 기다린 뒤 작업창을 엽니다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            previous = self._release(session, now)
+            queue, wait = self._choose(now)
+            self._assigned[session] = queue
+            self._assigned_at[session] = now
+        if queue is not previous:
+            logger.info(f"📥 [{session}] 작업 큐 {queue.name} 배정 (우선순위 {queue.priority}, 가중치 {queue.weight:g})")
+        return queue, wait
+
+    def next_queue(self, session, should_continue=None):
+        """
+        assign()으로 큐를 정하고, 모든 큐가 비어 있으면 가장 먼저 돌아오는 큐를 기다렸다가 반환합니다.
+        should_continue()가 False가 되면 기다리지 않고 바로 반환합니다.
+        """
+        queue, wait = self.assign(session)
+        if wait > 0:
+            logger.info(f"📭 모든 작업 큐가 비어 있습니다. 작업 큐 {queue.name}을 {wait:.0f}초 후 다시 엽니다.")
+            end = time.monotonic() + wait
+            while time.monotonic() < end and (should_continue is None or should_continue()):
+                time.sleep(min(0.5, end - time.monotonic()))
+        return queue
+
+    def release(self, session):
+        with self._lock:
+            self._release(session, time.monotonic())
+
+    def mark_empty(self, queue):
+        """
+        queue가 비었다고 표시합니다. empty_cooldown초 동안 다른 큐를 배정합니다.
+        """
+        with self._lock:
+            queue.empty_count += 1
+            queue.empty_until = time.monotonic() + self.empty_cooldown
+        logger.warning(f"📭 작업 큐 {queue.name}에 작업이 없습니다. {self.empty_cooldown:g}초 동안 다른 큐를 씁니다.")
+
+    def should_switch(self, session):
+        """
+        session이 지금 큐를 떠나야 하면 True입니다. (그 큐가 비었다고 표시되었거나,
+        더 높은 우선순위의 큐를 쓸 수 있게 된 경우)
+        """
+        if not self.switchable:
+            return False
+        with self._lock:
+            queue = self._assigned.get(session)
+            if queue is None:
+                return False
+            now = time.monotonic()
+            if queue.empty_until > now:
+                # 옮겨 갈 큐도 모두 비었으면 그대로 둡니다.
+                return any(other.empty_until <= now for other in self.queues)
+            return any(other.priority > queue.priority and other.empty_until <= now for other in self.queues)
+
+    def leave(self, reason, task_count, driver, work_window):
+        """
+        작업창을 닫고 SessionLost(relogin=False)를 발생시켜, SessionSupervisor가 로그인을 유지한 채
+        작업 시작부터 다시 하게 합니다. 다시 시작한 작업 루프는 next_queue()로 새 큐를 받습니다.
+        """
+        close_work_window(driver, work_window)
+        raise SessionLost(reason, task_count, relogin=False)
+
+    def record_task(self, queue, action):
+        # 빈 큐 확인은 작업이 아니므로 empty_count(mark_empty)로만 셉니다.
+        if isinstance(action, TaskFailure) and action.kind == FAIL_EMPTY_QUEUE:
+            return
+        with self._lock:
+            queue.tasks += 1
+            if action == ACTION_E:
+                queue.e += 1
+            elif action == ACTION_POSTPONE:
+                queue.postpone += 1
+            elif isinstance(action, TaskFailure):
+                queue.errors += 1
+
+    def matcher(self, queue, default_store):
+        """
+        queue에서 쓸 PrefixMatcher를 반환합니다. 큐 전용 패턴 파일이 없거나 불러오지 못하면 공용 패턴을 씁니다.
+        """
+        if not queue.patterns_file:
+            return default_store.matcher
+        store = queue.pattern_store
+        if store is None:
+            store = self._load_store(queue)
+        return store.matcher or default_store.matcher
+
+    def _load_store(self, queue):
+        """
+        큐 전용 PatternStore를 불러와 queue에 붙입니다.
+        파일을 읽는 동안 다른 세션의 record_task()/should_switch()가 막히지 않도록 잠금 밖에서 불러오고,
+        결과만 잠금 안에서 붙입니다. 다른 세션이 먼저 붙였으면 그쪽을 씁니다.
+        """
+        from pattern_store import PatternStore
+        # 도메인 규칙은 공용 저장소가 관리하므로 여기서는 패턴만 불러옵니다.
+        store = PatternStore(queue.patterns_file, reload_interval=self.reload_interval)
+        loaded = store.load()
+        with self._lock:
+            if queue.pattern_store is not None:
+                return queue.pattern_store
+            queue.pattern_store = store
+            if self._stopped:
+                # stop() 뒤에 로드가 끝났으면 자동 갱신을 시작하지 않습니다.
+                store.stop_reloader()
+        if loaded:
+            logger.info(f"✅ 작업 큐 {queue.name} 전용 패턴 {len(store.patterns)}개 사용")
+            store.start_reloader()
+        else:
+            logger.error(f"❌ 작업 큐 {queue.name} 전용 패턴을 불러오지 못해 공용 패턴을 씁니다.")
+        return store
+
+    def stop(self):
+        """
+        큐 전용 패턴의 자동 갱신을 멈춥니다.
+        """
+        with self._lock:
+            self._stopped = True
+        for queue in self.queues:
+            if queue.pattern_store is not None:
+                queue.pattern_store.stop_reloader()
+
+    def snapshot(self):
+        """
+        큐별 통계를 반환합니다. (지표 파일의 info.queues)
+        """
+        with self._lock:
+            now = time.monotonic()
+            result = {}
+            for queue in self.queues:
+                busy = queue.busy_seconds + sum(now - self._assigned_at[session]
+                                                for session, assigned in self._assigned.items()
+                                                if assigned is queue)
+                result[queue.name] = {
+                    "queue_id": queue.queue_id,
+                    "priority": queue.priority,
+                    "weight": queue.weight,
+                    "sessions": self._load(queue),
+                    "tasks": queue.tasks,
+                    "e": queue.e,
+                    "postpone": queue.postpone,
+                    "errors": queue.errors,
+                    "empty_count": queue.empty_count,
+                    "empty_for": max(0.0, queue.empty_until - now),
+                    "busy_seconds": busy,
+                    "tasks_per_hour": queue.tasks / busy * 3600 if busy > 0 else 0.0,
+                }
+            return result
+
+    def summary(self):
+        """
+        큐별 처리 수를 '45: 120건 (E 30, 시간당 900건, 빈 큐 2회)' 형식으로 반환합니다. (종료 로그용)
+        """
+        parts = [f"{name}: {stats['tasks']}건 (E {stats['e']}, 시간당 {stats['tasks_per_hour']:.0f}건"
+                 f"{', 빈 큐 ' + str(stats['empty_count']) + '회' if stats['empty_count'] else ''})"
+                 for name, stats in self.snapshot().items()]
+        return " / ".join(parts)
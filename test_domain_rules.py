@@ -0,0 +1,120 @@
+"""
+domain_rules / prefix_util 도메인 키 규칙 테스트 (python -m pytest)
+"""
+from urllib.parse import urlparse
+
+import pytest
+
+import prefix_util
+from domain_rules import (DomainRules, parse_rules, split_host, DEFAULT_RULES,
+                          RULE_SUBDOMAIN, RULE_PATH, RULE_HOST)
+
+
+def key(rules, href):
+    return rules.key(urlparse(href))
+
+
+@pytest.fixture
+def default_rules():
+    # 전역 규칙표와 도메인 캐시를 바꾸는 테스트 뒤에는 기본 규칙으로 되돌립니다.
+    prefix_util.set_domain_rules(None)
+    yield
+    prefix_util.set_domain_rules(None)
+
+
+def test_subdomain_rule():
+    rules = DomainRules([("tistory.com", RULE_SUBDOMAIN)])
+    assert key(rules, "https://abc1234.tistory.com/12") == "abc1234"
+    assert key(rules, "https://a.b1234.tistory.com/") == "a.b1234"
+    # 접미사 자체에는 서브도메인이 없으므로 netloc 전체를 씁니다.
+    assert key(rules, "https://tistory.com/abc1234") == "tistory.com"
+
+
+def test_subdomain_key_keeps_case():
+    rules = DomainRules()
+    assert key(rules, "https://Abc1234.tistory.com/1") == "Abc1234"
+    # 규칙은 대소문자를 가리지 않고 찾습니다.
+    assert key(rules, "https://Abc1234.TISTORY.com/1") == "Abc1234"
+
+
+def test_path_rule():
+    rules = DomainRules([("blog.naver.com", RULE_PATH)])
+    assert key(rules, "https://blog.naver.com/abc1234/223") == "abc1234"
+    assert key(rules, "https://blog.naver.com/abc1234") == "abc1234"
+    # 경로가 없으면 netloc 전체를 씁니다.
+    assert key(rules, "https://blog.naver.com/") == "blog.naver.com"
+
+
+def test_host_rule_and_unknown_host():
+    rules = DomainRules([("example.com", RULE_HOST), ("tistory.com", RULE_SUBDOMAIN)])
+    assert key(rules, "https://abc1234.example.com/x") == "abc1234.example.com"
+    assert key(rules, "https://abc1234.other.net/x") == "abc1234.other.net"
+    assert DomainRules([]).find("abc1234.tistory.com") == (None, RULE_HOST)
+    assert key(DomainRules([]), "https://abc1234.tistory.com/") == "abc1234.tistory.com"
+
+
+def test_longest_suffix_wins():
+    rules = DomainRules([("tistory.com", RULE_SUBDOMAIN), ("special.tistory.com", RULE_PATH)])
+    assert rules.find("abc.special.tistory.com") == ("special.tistory.com", RULE_PATH)
+    assert key(rules, "https://abc.special.tistory.com/xyz1234") == "xyz1234"
+    assert key(rules, "https://abc1234.tistory.com/xyz") == "abc1234"
+
+
+def test_first_rule_for_same_suffix_wins():
+    rules = DomainRules([("tistory.com", RULE_SUBDOMAIN), ("tistory.com", RULE_HOST)])
+    assert rules.rules == [("tistory.com", RULE_SUBDOMAIN)]
+
+
+def test_default_rule_is_tistory_subdomain():
+    assert DomainRules().rules == DEFAULT_RULES
+    assert DomainRules(None) == DomainRules(DEFAULT_RULES)
+    assert key(DomainRules(), "https://abc1234.tistory.com/5") == "abc1234"
+    assert key(DomainRules(), "https://abc1234.naver.com/5") == "abc1234.naver.com"
+
+
+def test_port_and_userinfo():
+    rules = DomainRules()
+    assert key(rules, "https://abc1234.tistory.com:8080/5") == "abc1234"
+    assert key(rules, "https://user@Abc1234.tistory.com:8080/5") == "Abc1234"
+    # host 방식은 예전처럼 netloc 전체(포트 포함)를 씁니다.
+    assert key(rules, "https://abc1234.naver.com:8080/5") == "abc1234.naver.com:8080"
+    assert split_host("[::1]:8080") == "[::1]"
+    assert split_host("Abc.Tistory.com.") == "Abc.Tistory.com"
+
+
+def test_parse_rules():
+    rows = [
+        [".Tistory.COM", "SUBDOMAIN"],
+        ["blog.naver.com", "path"],
+        ["example.com"],
+        ["bad.com", "unknown"],
+        [],
+        ["", "path"],
+    ]
+    assert parse_rules(rows) == [
+        ("tistory.com", RULE_SUBDOMAIN),
+        ("blog.naver.com", RULE_PATH),
+        ("example.com", RULE_HOST),
+    ]
+
+
+def test_match_is_case_sensitive_like_before(default_rules):
+    matcher = prefix_util.build_matcher(["Abc", "b", "B"])
+    assert prefix_util.check_href_match("https://Abc1234.tistory.com/1", matcher) == (True, "Abc")
+    assert prefix_util.check_href_match("https://abc1234.tistory.com/1", matcher) == (False, None)
+    assert prefix_util.check_href_match("https://B4219.tistory.com/1", matcher) == (True, "B")
+    assert prefix_util.check_href_match("https://b4219.tistory.com/1", matcher) == (True, "b")
+
+
+def test_set_domain_rules_clears_domain_cache(default_rules):
+    href = "https://blog.naver.com/abc1234/1"
+    assert prefix_util.extract_domain_name(href) == "blog.naver.com"
+
+    assert prefix_util.set_domain_rules([("blog.naver.com", RULE_PATH)]) is True
+    assert prefix_util.extract_domain_name(href) == "abc1234"
+
+    # 같은 규칙이면 캐시를 비우지 않습니다.
+    assert prefix_util.set_domain_rules(DomainRules([("blog.naver.com", RULE_PATH)])) is False
+
+    assert prefix_util.set_domain_rules(None) is True
+    assert prefix_util.extract_domain_name(href) == "blog.naver.com"
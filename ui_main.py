@@ -1,28 +1,97 @@
-import knw_license
+import time
+
+# 창이 뜨기까지 걸린 시간을 재기 위해 가장 먼저 시각을 기록합니다.
+STARTUP_BEGIN = time.perf_counter()
+
 import sys
+import json
 import logging
 import os
-import time
+import threading
+from functools import partial
+from collections import deque
+from contextlib import nullcontext
 from datetime import datetime
-from PySide6.QtWidgets import QApplication, QMessageBox, QMainWindow
-from PySide6.QtCore import QThread, Signal, Slot
-from PySide6.QtUiTools import QUiLoader
 
-# Selenium 임포트
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.by import By
+from startup import StartupTimer, PatternLoader, concurrent_startup
+
+startup_timer = StartupTimer(STARTUP_BEGIN)
+
+with startup_timer.section("PySide6"):
+    from PySide6.QtWidgets import QApplication, QMessageBox, QMainWindow
+    from PySide6.QtCore import Qt, QThread, QTimer, Signal, Slot
+    from PySide6.QtGui import QTextCursor
+    from PySide6.QtUiTools import QUiLoader
 
 # 로컬 모듈 임포트
-from label_admin import label_login, close_chrome, HOME_URL
-from prefix_util import load_patterns_from_gsheet, process_page
-# [수정] resource_path만 임포트 (logger는 setup_logger가 반환)
-from label_log import setup_logger, resource_path
+# Selenium, 구글시트(gspread/oauth2client), openpyxl은 각 모듈이 처음 쓸 때 불러오고,
+# 라이선스 모듈은 작업을 시작할 때 불러오므로 여기서는 창을 띄우는 데 필요한 것만 가져옵니다.
+with startup_timer.section("로컬 모듈"):
+    from label_admin import label_login, close_chrome, session_profile_dir, apply_lean_blocking
+    from session_watchdog import (SessionSupervisor, SessionLost, is_driver_alive, handle_failure,
+                                  handle_startup_failure, TASK_TIMEOUT)
+    from failure_policy import (FailurePolicy, classify_exception, failure_kind, failure_summary,
+                                FAIL_EMPTY_QUEUE, FAIL_OTHER, FAIL_TIMEOUT)
+    from task_queues import build_scheduler
+    from browser_recycle import BrowserRecycler, RECYCLE_RSS_MB, RECYCLE_TASKS, RECYCLE_HOURS
+    from prefix_util import process_page, close_excel_log
+    from pattern_store import PatternStore, RELOAD_INTERVAL
+    from page_ready import TaskCursor, Pacer, MIN_TASK_INTERVAL
+    from label_metrics import metrics, MetricsExporter, EXPORT_INTERVAL
+    from label_args import build_parser, apply_log_options
+    # [수정] resource_path만 임포트 (logger는 setup_logger가 반환)
+    from label_log import setup_logger, resource_path
 
 # --- [로거 설정] ---
-logger, LOG_FILENAME = setup_logger()
+with startup_timer.section("로거 설정"):
+    logger, LOG_FILENAME = setup_logger()
 logger.info(f"UI 모드 자동화 작업 시작. 로그 파일: {LOG_FILENAME}")
 
+# --- [지연 로드 모듈] ---
+# 라이선스 모듈(knw_license)은 가져올 때 라이선스를 확인하므로 처음 작업을 시작할 때 load_license()에서 불러옵니다.
+# Selenium 작업에 필요한 무거운 모듈. Worker 스레드가 시작하면서 미리 불러옵니다.
+SELENIUM_MODULES = ("selenium.webdriver", "knw_Chromedriver_manager")
+
+# 작업을 시작할 때 불러온 모듈들의 가져오기 시간
+backend_timer = StartupTimer()
+metrics.add_info("startup", lambda: {"window": startup_timer.snapshot(), "backend": backend_timer.snapshot()})
+
+
+def _import_backend(names, title):
+    names = [name for name in names if name not in sys.modules]
+    if not names:
+        return
+    for name in names:
+        backend_timer.import_module(name)
+    backend_timer.report(title)
+
+
+def load_license():
+    # PyInstaller가 문자열 가져오기(importlib)는 찾지 못하므로 import 문으로 적어 .pyd가 함께 묶이게 합니다.
+    if "knw_license" in sys.modules:
+        return
+    with backend_timer.section("knw_license"):
+        import knw_license  # noqa: F401
+    backend_timer.report("라이선스 모듈 준비")
+
+
+def load_backend():
+    """
+    작업에 필요한 무거운 모듈을 Worker 스레드에서 미리 불러옵니다. (이미 불러왔으면 건너뜀)
+    """
+    _import_backend(SELENIUM_MODULES, "작업 모듈 준비")
+
+
+def report_startup(print_report=False):
+    """
+    창이 화면에 뜬 시점(이벤트 루프 첫 실행)을 기록하고 시작 시간 보고를 남깁니다.
+    print_report=True면 같은 내용을 JSON으로 표준 출력에 씁니다. (--startup-report)
+    """
+    startup_timer.mark("창 표시")
+    startup_timer.report("UI 시작")
+    if print_report:
+        print(json.dumps(startup_timer.snapshot(), ensure_ascii=False, indent=2), flush=True)
+
 
 # --- [로거 설정 끝] ---
 
@@ -34,35 +103,80 @@ class Worker(QThread):
     work_finished_one = Signal(int, str)
     automation_finished = Signal(str)
     login_result = Signal(bool, str)
-
-    def __init__(self, user_id, user_pw, headless, parent=None):
+    restarts_updated = Signal(int, float)
+    failures_updated = Signal(str)
+
+    def __init__(self, user_id, user_pw, headless, patterns_file=None, rules_file=None,
+                 reload_interval=RELOAD_INTERVAL, min_interval=MIN_TASK_INTERVAL,
+                 use_observer=False, fast_path=False, metrics_interval=EXPORT_INTERVAL,
+                 reuse_session=False, profile_dir=None, lean=False, block_urls=None,
+                 task_timeout=TASK_TIMEOUT,
+                 recycle_rss_mb=RECYCLE_RSS_MB, recycle_tasks=RECYCLE_TASKS, recycle_hours=RECYCLE_HOURS,
+                 scheduler=None, session_id=None, pattern_store=None, pattern_loader=None, parent=None):
         super().__init__(parent)
         self.user_id = user_id
         self.user_pw = user_pw
         self.headless = headless
+        self.reuse_session = reuse_session
+        self.lean = lean
+        self.block_urls = block_urls
+        self.profile_dir = session_profile_dir(profile_dir, session_id)
+        self.task_timeout = task_timeout
+        self.supervisor = None
+        # 작업창을 다시 열거나 다시 로그인해도 연속 실패 횟수는 이어서 셉니다.
+        self.policy = FailurePolicy(on_failure=lambda kind: self.failures_updated.emit(failure_summary()))
+        # 크롬 메모리/작업 수/사용 시간이 기준을 넘으면 작업 사이에 브라우저를 새로 엽니다.
+        self.recycler = BrowserRecycler(recycle_rss_mb, recycle_tasks, recycle_hours)
+        # 작업 큐 배정 (WorkerPool이면 모든 세션이 같은 scheduler를 씁니다)
+        self.scheduler = scheduler or build_scheduler()
         self.driver = None
-        self.patterns = []
+        self.session_id = session_id
+        # pattern_store를 넘겨받으면 WorkerPool이 패턴과 엑셀 로그를 관리합니다.
+        self.owns_resources = pattern_store is None
+        self.pattern_store = pattern_store or PatternStore(
+            patterns_file, reload_interval=reload_interval, rules_file=rules_file)
+        self.pattern_loader = pattern_loader or PatternLoader(self.pattern_store, self._status)
+        self.metrics_exporter = MetricsExporter(metrics, metrics_interval) if self.owns_resources else None
+        self.min_interval = min_interval
+        self.use_observer = use_observer
+        self.fast_path = fast_path
         self.total_count = 0
         self._is_running = True
 
+    def _status(self, message):
+        if self.session_id is not None:
+            message = f"[세션 {self.session_id}] {message}"
+        self.status_updated.emit(message)
+
     def run(self):
+        # 여러 세션의 로그를 구분할 수 있도록 스레드 이름을 붙입니다.
+        threading.current_thread().name = f"Session-{self.session_id or 1}"
         try:
-            self.status_updated.emit("구글 시트에서 패턴 로드 중...")
-            self.patterns = load_patterns_from_gsheet()
-            if not self.patterns:
-                self.login_result.emit(False, "❌ 구글시트에서 패턴을 불러오지 못했습니다.")
-                return
-            self.status_updated.emit("패턴 로드 완료. 로그인 시도 중...")
+            if self.owns_resources:
+                load_backend()
+                # 처리량은 시작 버튼을 누른 때부터 재고, 지표 파일도 실행마다 새로 만듭니다.
+                metrics.begin_run()
+                self.metrics_exporter.start()
 
-            self.driver = label_login(self.user_id, self.user_pw, self.headless)
+            # 패턴 로드와 크롬 실행/로그인을 동시에 진행합니다. 한쪽이 실패하면 다른 쪽도 멈춥니다.
+            self.driver, error = concurrent_startup(self.pattern_loader, self._login, self._status, self._stopped)
 
-            if not self.driver:
-                self.login_result.emit(False, "❌ 로그인 실패. 아이디/비밀번호를 확인하세요.")
+            if error:
+                self.login_result.emit(False, error)
                 return
 
             self.login_result.emit(True, "✅ 로그인 성공!")
 
-            self.main_task_loop_scenario_2()
+            # 드라이버가 죽거나 작업창이 닫히면 다시 로그인해 작업 시작부터 이어갑니다.
+            self.supervisor = SessionSupervisor(
+                self._login, should_continue=lambda: self._is_running, report=self._status,
+                on_restart=self._on_restart, task_timeout=self.task_timeout)
+            self.supervisor.run(self.driver, self.main_task_loop_scenario_2)
+            self.driver = self.supervisor.driver
+            if self._is_running and self.driver is None:
+                self.automation_finished.emit("❌ 세션을 다시 열지 못했습니다. 작업 중단.")
+            else:
+                self.automation_finished.emit("✅ 작업이 안전하게 중지되었습니다.")
 
         # noinspection PyBroadException
         except Exception as e:
@@ -71,84 +185,307 @@ class Worker(QThread):
         finally:
             if self.driver:
                 close_chrome(self.driver)
-            logger.info("Worker 스레드 종료.")
+            self.scheduler.release(threading.current_thread().name)
+            if self.owns_resources:
+                if self.scheduler.switchable:
+                    logger.info(f"📊 작업 큐별 처리: {self.scheduler.summary()}")
+                self.scheduler.stop()
+                self.pattern_store.stop_reloader()
+                self.metrics_exporter.stop()
+                close_excel_log()
+            logger.info(f"Worker 스레드 종료. (세션: {self.session_id})")
 
     def stop(self):
-        self.status_updated.emit("🛑 작업 중지 요청됨... 현재 작업 완료 후 종료합니다.")
+        self._status("🛑 작업 중지 요청됨... 현재 작업 완료 후 종료합니다.")
         self._is_running = False
 
-    def main_task_loop_scenario_2(self):
+    def _stopped(self):
+        return not self._is_running
+
+    def _login(self, cancelled=None):
+        return label_login(self.user_id, self.user_pw, self.headless,
+                           reuse_session=self.reuse_session, profile_dir=self.profile_dir,
+                           lean=self.lean, block_urls=self.block_urls,
+                           cancelled=cancelled or self._stopped)
+
+    def _on_restart(self, supervisor):
+        self.restarts_updated.emit(supervisor.restart_count, supervisor.downtime)
+
+    def _report_task(self, href, match, action):
+        if action == "E (패턴 일치)":
+            self._status(f"✅ '{match}' 패턴 일치. 'E' 입력 완료.")
+        elif action == "작업 미루기":
+            self._status(f"❌ 패턴 불일치. '작업 미루기' 완료.")
+        else:
+            self._status(f"⚠ {action} 수행. (href: {href})")
+
+        self.total_count += 1
+        self.work_finished_one.emit(self.total_count, action)
+
+    def main_task_loop_scenario_2(self, driver, watchdog=None):
+        """
+        작업 시작 버튼을 눌러 작업창을 열고 반복 작업을 합니다. 처리한 작업 수를 반환합니다.
+        드라이버가 죽거나 작업창이 닫히면 SessionLost를 발생시켜 SessionSupervisor가 다시 로그인합니다.
+        실패한 작업은 self.policy에 따라 백오프 후 다시 시도하고, 연속 실패가 쌓이면 작업창이나 로그인을 새로 엽니다.
+        self.recycler의 기준(메모리/작업 수/시간)을 넘으면 작업 사이에 브라우저를 새로 엽니다.
+        작업 큐는 self.scheduler가 정하며, 큐가 비었거나 더 높은 우선순위의 큐가 돌아오면 작업창을 다시 열어 옮깁니다.
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.common.by import By
+
+        self.driver = driver
+        task_count = 0
+        session = threading.current_thread().name
+        queue = self.scheduler.next_queue(session, lambda: self._is_running)
+        if not self._is_running:
+            return task_count
+        self._status(f"🚀 작업 큐 {queue.name} 페이지로 이동 중...")
+        original_window = None
         work_window = None
+        clicked = False
         try:
-            self.status_updated.emit("🚀 작업 페이지로 이동 중... (1회)")
-            self.driver.get(HOME_URL)
+            self.driver.get(queue.home_url)
             original_window = self.driver.current_window_handle
 
             logger.info("'작업 시작' 버튼(#reviewStart)을 찾아 클릭합니다...")
             WebDriverWait(self.driver, 15).until(
                 EC.element_to_be_clickable((By.ID, "reviewStart"))
             ).click()
-            self.status_updated.emit("✅ '작업 시작' 클릭. 새 창 대기 중...")
+            clicked = True
+            self._status("✅ '작업 시작' 클릭. 새 창 대기 중...")
 
             WebDriverWait(self.driver, 15).until(EC.number_of_windows_to_be(2))
             all_windows = self.driver.window_handles
             work_window = next((w for w in all_windows if w != original_window), None)
+        # noinspection PyBroadException
+        except Exception as e:
+            # 드라이버가 살아 있으면 실패 정책에 따라 기다렸다가 작업 시작부터 다시 합니다.
+            logger.error("❌ 작업창을 여는 중 오류", exc_info=True)
+            self._status("⚠ 작업창을 열지 못했습니다. 잠시 후 다시 시도합니다...")
+            kind = classify_exception(e)
+            if original_window is not None and not clicked and kind == FAIL_TIMEOUT and self.scheduler.switchable:
+                # '작업 시작' 버튼이 없는 큐는 빈 큐로 보고, 다시 시작할 때 다른 큐를 받게 합니다.
+                self.scheduler.mark_empty(queue)
+            handle_startup_failure(self.policy, kind, "작업창 열기 실패", task_count,
+                                   self.driver, original_window, lambda: self._is_running)
+
+        if not work_window:
+            logger.warning("⚠ 새 창을 찾지 못했습니다. 작업 시작부터 다시 합니다.")
+            handle_startup_failure(self.policy, FAIL_OTHER, "새 작업창을 찾지 못함", task_count,
+                                   self.driver, original_window, lambda: self._is_running)
+
+        self.driver.switch_to.window(work_window)
+        apply_lean_blocking(self.driver)
+        self._status(f"✅ 새 작업창으로 전환 완료. 이 창에서 반복 작업을 시작합니다.")
+        logger.info(f"작업창으로 전환 완료 (Handle: {work_window}). 무한 루프 시작...")
+
+        if self.recycler.enabled:
+            self.recycler.start(self.driver)
+        cursor = TaskCursor()
+        pacer = Pacer(self.min_interval)
+        while self._is_running:
+            try:
+                with metrics.stage("pacing"):
+                    pacer.wait()
+                loop_start = time.monotonic()
+                self._status("👉 다음 작업 처리 중... (href 대기)")
+                # 실패가 이어지거나 작업이 없을 때도 크롬 메모리와 사용 시간은 계속 확인합니다.
+                recycle_reason = self.recycler.tick() if self.recycler.enabled else None
+                if recycle_reason:
+                    raise SessionLost(recycle_reason, task_count, recycle=True)
+
+                matcher = self.scheduler.matcher(queue, self.pattern_store)
+                with watchdog.watch(self.driver) if watchdog else nullcontext():
+                    href, match, action = process_page(
+                        self.driver, matcher, cursor, self.use_observer, self.fast_path)
+                self._report_task(href, match, action)
+                task_count += 1
+                metrics.record("loop", time.monotonic() - loop_start)
+                self.scheduler.record_task(queue, action)
+
+                kind = failure_kind(action)
+                if kind == FAIL_EMPTY_QUEUE and self.scheduler.switchable:
+                    self.scheduler.mark_empty(queue)
+                    self.scheduler.leave(f"작업 큐 {queue.name} 비어 있음", task_count, self.driver, work_window)
+                if kind is None:
+                    self.policy.success()
+                    recycle_reason = self.recycler.task_done() if self.recycler.enabled else None
+                    if recycle_reason:
+                        raise SessionLost(recycle_reason, task_count, recycle=True)
+                    if self.scheduler.should_switch(session):
+                        self.scheduler.leave("작업 큐 전환", task_count, self.driver, work_window)
+                else:
+                    handle_failure(self.policy, kind, task_count, self.driver, work_window,
+                                   lambda: self._is_running)
 
-            if not work_window:
-                logger.warning("⚠ 새 창을 찾지 못했습니다. 작업 중단.")
-                self.automation_finished.emit("❌ 새 작업창을 열지 못했습니다.")
-                return
+            except SessionLost as e:
+                raise SessionLost(e.reason, task_count, e.relogin, e.recycle)
+            # noinspection PyBroadException
+            except Exception as e:
+                if not self._is_running:
+                    logger.info("작업 중지 요청으로 인해 루프를 종료합니다.")
+                    break
+                if not is_driver_alive(self.driver, work_window):
+                    logger.error("❌ 작업창이 닫히거나 드라이버가 종료된 것을 감지했습니다.")
+                    raise SessionLost("작업창 또는 드라이버 종료", task_count)
+                logger.error(f"❌ 작업 루프 중 오류: {e}", exc_info=True)
+                self._status(f"❌ 작업 루프 오류 발생. 잠시 후 재시도...")
+                handle_failure(self.policy, classify_exception(e), task_count, self.driver, work_window,
+                               lambda: self._is_running)
 
-            self.driver.switch_to.window(work_window)
-            self.status_updated.emit(f"✅ 새 작업창으로 전환 완료. 이 창에서 반복 작업을 시작합니다.")
-            logger.info(f"작업창으로 전환 완료 (Handle: {work_window}). 무한 루프 시작...")
+        return task_count
 
-            while self._is_running:
-                self.status_updated.emit("👉 다음 작업 처리 중... (href 대기)")
 
-                href, match, action = process_page(self.driver, self.patterns)
+# --- [여러 세션을 동시에 돌리는 QThread] ---
+class WorkerPool(QThread):
+    """
+    Worker 세션 여러 개를 동시에 실행합니다.
+    세션마다 크롬 드라이버와 작업창을 따로 쓰고, 패턴(matcher)과 엑셀 로그는 함께 씁니다.
+    시그널은 Worker와 같으며, 작업 수는 모든 세션을 합친 값으로 보냅니다.
+    """
+    status_updated = Signal(str)
+    work_finished_one = Signal(int, str)
+    automation_finished = Signal(str)
+    login_result = Signal(bool, str)
+    restarts_updated = Signal(int, float)
+    failures_updated = Signal(str)
+    session_stats_updated = Signal(str)
 
-                if action == "E (패턴 일치)":
-                    self.status_updated.emit(f"✅ '{match}' 패턴 일치. 'E' 입력 완료.")
-                elif action == "작업 미루기":
-                    self.status_updated.emit(f"❌ 패턴 불일치. '작업 미루기' 완료.")
-                else:
-                    self.status_updated.emit(f"⚠ {action} 수행. (href: {href})")
+    def __init__(self, session_count, user_id, user_pw, headless, patterns_file=None, rules_file=None,
+                 reload_interval=RELOAD_INTERVAL, metrics_interval=EXPORT_INTERVAL,
+                 parent=None, **session_options):
+        super().__init__(parent)
+        self.session_count = session_count
+        self.worker_args = (user_id, user_pw, headless)
+        # 나머지 옵션(min_interval, use_observer 등)은 각 Worker에 그대로 넘깁니다.
+        self.session_options = session_options
+        self.pattern_store = PatternStore(patterns_file, reload_interval=reload_interval, rules_file=rules_file)
+        self.pattern_loader = PatternLoader(self.pattern_store, self.status_updated.emit)
+        self.metrics_exporter = MetricsExporter(metrics, metrics_interval)
+        self.workers = []
+        self.session_counts = {}
+        self.session_restarts = {}
+        self.logged_in = set()
+        self.total_count = 0
+        self._lock = threading.Lock()
+        self._is_running = True
 
-                self.total_count += 1
-                self.work_finished_one.emit(self.total_count, action)
+    def run(self):
+        try:
+            # 패턴은 세션들의 로그인과 동시에 한 번만 불러와 함께 씁니다.
+            self.pattern_loader.start()
+            load_backend()
+            metrics.begin_run()
+            self.metrics_exporter.start()
 
+            with self._lock:
                 if not self._is_running:
-                    break
+                    self.automation_finished.emit("✅ 작업이 안전하게 중지되었습니다.")
+                    return
+                for session_id in range(1, self.session_count + 1):
+                    worker = Worker(*self.worker_args,
+                                    session_id=session_id,
+                                    pattern_store=self.pattern_store,
+                                    pattern_loader=self.pattern_loader,
+                                    **self.session_options)
+                    # 세션 스레드에서 바로 집계하도록 DirectConnection을 사용합니다.
+                    worker.status_updated.connect(self.status_updated.emit, Qt.DirectConnection)
+                    worker.automation_finished.connect(
+                        partial(self._on_session_finished, session_id), Qt.DirectConnection)
+                    worker.work_finished_one.connect(
+                        partial(self._on_session_work, session_id), Qt.DirectConnection)
+                    worker.login_result.connect(
+                        partial(self._on_session_login, session_id), Qt.DirectConnection)
+                    worker.restarts_updated.connect(
+                        partial(self._on_session_restart, session_id), Qt.DirectConnection)
+                    # 실패 횟수는 모든 세션을 합친 값(metrics)이므로 그대로 전달합니다.
+                    worker.failures_updated.connect(self.failures_updated.emit, Qt.DirectConnection)
+                    self.session_counts[session_id] = 0
+                    self.workers.append(worker)
+
+            self.status_updated.emit(f"🚀 세션 {self.session_count}개를 시작합니다.")
+            for worker in self.workers:
+                worker.start()
+            for worker in self.workers:
+                worker.wait()
+
+            if not self.logged_in:
+                if self.pattern_loader.failed:
+                    self.login_result.emit(False, "❌ 패턴을 불러오지 못했습니다.")
+                else:
+                    self.login_result.emit(False, "❌ 모든 세션의 로그인에 실패했습니다.")
+                return
+            self.automation_finished.emit(
+                f"✅ 모든 세션이 종료되었습니다. (총 {self.total_count}건, {self._stats_text()})")
 
         # noinspection PyBroadException
         except Exception as e:
-            if not self._is_running:
-                logger.info("작업 중지 요청으로 인해 루프를 종료합니다.")
-            else:
-                logger.error(f"❌ 작업 루프 중 오류: {e}", exc_info=True)
-                self.status_updated.emit(f"❌ 작업 루프 오류 발생. 5초 후 재시도...")
+            logger.error(f"WorkerPool 스레드 실행 중 오류: {e}", exc_info=True)
+            self.automation_finished.emit(f"❌ 작업 중 심각한 오류 발생: {e}")
+        finally:
+            scheduler = self.session_options.get("scheduler")
+            if scheduler:
+                if scheduler.switchable:
+                    logger.info(f"📊 작업 큐별 처리: {scheduler.summary()}")
+                scheduler.stop()
+            self.pattern_store.stop_reloader()
+            self.metrics_exporter.stop()
+            close_excel_log()
+            logger.info("WorkerPool 스레드 종료.")
 
-                try:
-                    if work_window not in self.driver.window_handles:
-                        logger.error("❌ 작업창이 닫힌 것을 감지. 스레드를 종료합니다.")
-                        self.automation_finished.emit("❌ 작업창이 닫혔습니다. 작업 중단.")
-                        self._is_running = False
-                    else:
-                        time.sleep(5)
-                        # noinspection PyBroadException
-                except Exception:
-                    logger.error("오류 복구 중 치명적 오류. 스레드 종료.")
-                    self.automation_finished.emit("❌ 드라이버 오류. 작업 중단.")
-                    self._is_running = False
+    def stop(self):
+        self.status_updated.emit("🛑 모든 세션에 작업 중지를 요청합니다...")
+        with self._lock:
+            self._is_running = False
+            for worker in self.workers:
+                worker.stop()
 
-        self.automation_finished.emit("✅ 작업이 안전하게 중지되었습니다.")
+    def _stats_text(self):
+        return " / ".join(f"S{sid}: {count}" for sid, count in sorted(self.session_counts.items()))
+
+    def _on_session_login(self, session_id, success, message):
+        self.status_updated.emit(f"[세션 {session_id}] {message}")
+        if not success:
+            return
+        with self._lock:
+            first = not self.logged_in
+            self.logged_in.add(session_id)
+        if first:
+            self.login_result.emit(True, "✅ 로그인 성공!")
+
+    def _on_session_work(self, session_id, session_count, action):
+        with self._lock:
+            self.session_counts[session_id] = session_count
+            self.total_count += 1
+            total = self.total_count
+            stats = self._stats_text()
+        self.work_finished_one.emit(total, f"[S{session_id}] {action}")
+        self.session_stats_updated.emit(stats)
+
+    def _on_session_restart(self, session_id, restart_count, downtime):
+        with self._lock:
+            self.session_restarts[session_id] = (restart_count, downtime)
+            total_restarts = sum(count for count, _ in self.session_restarts.values())
+            total_downtime = sum(down for _, down in self.session_restarts.values())
+        self.restarts_updated.emit(total_restarts, total_downtime)
+
+    def _on_session_finished(self, session_id, message):
+        self.status_updated.emit(f"[세션 {session_id}] {message}")
 
 
 # --- [PySide6 UI 메인 윈도우] ---
 
+# --- 상태 창 설정 ---
+# 상태 창에 남기는 최대 줄 수. 넘치면 오래된 줄부터 지웁니다. (전체 기록은 로그 파일에만 남음)
+STATUS_MAX_LINES = 1000
+# 상태 메시지를 모아 두었다가 상태 창에 한꺼번에 반영하는 주기 (밀리초)
+STATUS_FLUSH_MS = 250
+
+
 class MainWindow:
-    def __init__(self):
+    def __init__(self, args):
+        self.args = args
 
         loader = QUiLoader()
 
@@ -168,9 +505,20 @@ class MainWindow:
 
         self.worker = None
 
+        # 상태 메시지는 시그널마다 바로 쓰지 않고 모아 두었다가 타이머로 한 번에 반영합니다.
+        self.status_max_lines = max(1, self.args.status_lines)
+        self.ui.textBrowser_Status.document().setMaximumBlockCount(self.status_max_lines)
+        self._pending_status = deque(maxlen=self.status_max_lines)
+        self._status_timer = QTimer()
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(STATUS_FLUSH_MS)
+        self._status_timer.timeout.connect(self.flush_status)
+
         self.ui.btn_Start.clicked.connect(self.start_automation)
         self.ui.btn_Stop.clicked.connect(self.stop_automation)
         self.ui.btn_Stop.setEnabled(False)
+        self.ui.spinBox_Sessions.setValue(self.args.sessions)
+        self.ui.checkBox_Lean.setChecked(self.args.lean)
 
     @Slot()
     def start_automation(self):
@@ -182,20 +530,63 @@ class MainWindow:
             QMessageBox.warning(self.ui, "입력 오류", "아이디와 비밀번호를 모두 입력해야 합니다.")
             return
 
+        try:
+            load_license()
+        # noinspection PyBroadException
+        except Exception as e:
+            logger.error("❌ 라이선스 모듈을 불러오지 못했습니다.", exc_info=True)
+            QMessageBox.critical(self.ui, "라이선스 오류", f"라이선스 확인에 실패했습니다: {e}")
+            return
+
+        try:
+            scheduler = build_scheduler(self.args.queues, self.args.queues_file, self.args.empty_cooldown,
+                                        self.args.reload_interval)
+        except (OSError, ValueError) as e:
+            logger.error("❌ 작업 큐 설정을 읽지 못했습니다.", exc_info=True)
+            QMessageBox.critical(self.ui, "작업 큐 오류", f"작업 큐 설정을 확인하세요: {e}")
+            return
+
         self.ui.btn_Start.setEnabled(False)
         self.ui.btn_Stop.setEnabled(True)
         self.ui.groupBox_Login.setEnabled(False)
         self.ui.label_StartTime.setText(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
         self.ui.label_TotalCount.setText("0")
+        self.ui.label_SessionStats.setText("-")
+        self.ui.label_Restarts.setText("-")
+        self.ui.label_Failures.setText("-")
+        self._pending_status.clear()
         self.ui.textBrowser_Status.clear()
         self.append_status("작업 스레드 초기화 중...")
 
-        self.worker = Worker(user_id, user_pw, headless)
+        session_count = self.ui.spinBox_Sessions.value()
+        options = dict(patterns_file=self.args.patterns_file,
+                       rules_file=self.args.domain_rules_file,
+                       reload_interval=self.args.reload_interval,
+                       min_interval=self.args.min_interval,
+                       use_observer=self.args.observer,
+                       fast_path=self.args.fast_path,
+                       metrics_interval=self.args.metrics_interval,
+                       reuse_session=self.args.reuse_session,
+                       profile_dir=self.args.profile_dir,
+                       lean=self.ui.checkBox_Lean.isChecked(),
+                       block_urls=self.args.block_url,
+                       task_timeout=self.args.task_timeout,
+                       recycle_rss_mb=self.args.recycle_rss_mb,
+                       recycle_tasks=self.args.recycle_tasks,
+                       recycle_hours=self.args.recycle_hours,
+                       scheduler=scheduler)
+        if session_count > 1:
+            self.worker = WorkerPool(session_count, user_id, user_pw, headless, **options)
+            self.worker.session_stats_updated.connect(self.update_session_stats)
+        else:
+            self.worker = Worker(user_id, user_pw, headless, **options)
 
         self.worker.status_updated.connect(self.append_status)
         self.worker.work_finished_one.connect(self.update_count)
         self.worker.automation_finished.connect(self.on_automation_finished)
         self.worker.login_result.connect(self.on_login_result)
+        self.worker.restarts_updated.connect(self.update_restarts)
+        self.worker.failures_updated.connect(self.update_failures)
 
         self.worker.start()
 
@@ -208,18 +599,58 @@ class MainWindow:
 
     @Slot(str)
     def append_status(self, message):
-        logger.info(f"[UI] {message}")
+        # 작업 내용은 Worker와 process_page가 이미 로그로 남기므로 여기서는 DEBUG로만 씁니다.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[UI] {message}")
         current_time = datetime.now().strftime("%H:%M:%S")
-        self.ui.textBrowser_Status.append(f"[{current_time}] {message}")
+        self._pending_status.append(f"[{current_time}] {message}")
+        if not self._status_timer.isActive():
+            self._status_timer.start()
+
+    @Slot()
+    def flush_status(self):
+        """
+        모아 둔 상태 메시지를 상태 창 끝에 한 번에 붙입니다.
+        줄 수 제한(setMaximumBlockCount)을 넘은 오래된 줄은 Qt가 지웁니다.
+        """
+        if not self._pending_status:
+            return
+        lines = list(self._pending_status)
+        self._pending_status.clear()
+
+        browser = self.ui.textBrowser_Status
+        scrollbar = browser.verticalScrollBar()
+        # 사용자가 위로 스크롤해 보고 있으면 위치를 그대로 둡니다.
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        document = browser.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.End)
+        text = "\n".join(lines)
+        cursor.insertText(text if document.isEmpty() else "\n" + text)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
     @Slot(int, str)
     def update_count(self, total_count, action_taken):
         self.ui.label_TotalCount.setText(str(total_count))
         self.ui.statusbar.showMessage(f"마지막 작업: {action_taken} (총 {total_count}건)", 3000)
 
+    @Slot(str)
+    def update_session_stats(self, stats):
+        self.ui.label_SessionStats.setText(stats)
+
+    @Slot(int, float)
+    def update_restarts(self, restart_count, downtime):
+        self.ui.label_Restarts.setText(f"{restart_count}회 (누적 중단 {downtime:.0f}초)")
+
+    @Slot(str)
+    def update_failures(self, summary):
+        self.ui.label_Failures.setText(summary)
+
     @Slot(bool, str)
     def on_login_result(self, success, message):
         self.append_status(message)
+        self.flush_status()
         if not success:
             self.ui.btn_Start.setEnabled(True)
             self.ui.btn_Stop.setEnabled(False)
@@ -229,6 +660,7 @@ class MainWindow:
     @Slot(str)
     def on_automation_finished(self, message):
         self.append_status(message)
+        self.flush_status()
         self.ui.btn_Start.setEnabled(True)
         self.ui.btn_Stop.setEnabled(False)
         self.ui.groupBox_Login.setEnabled(True)
@@ -240,12 +672,25 @@ class MainWindow:
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = build_parser("라벨크래프트 자동화 (UI)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="창을 띄운 뒤 시작 시간 보고(가져오기 구간별, 창 표시까지)를 JSON으로 출력하고 종료")
+    parser.add_argument("--status-lines", type=int, default=STATUS_MAX_LINES,
+                        help="상태 창에 남길 최대 줄 수 (전체 기록은 로그 파일에 남음)")
+    args, qt_args = parser.parse_known_args()
+    apply_log_options(args)
+
+    app = QApplication(sys.argv[:1] + qt_args)
 
-    main_window = MainWindow()
+    with startup_timer.section("창 만들기"):
+        main_window = MainWindow(args)
 
     if main_window.ui:
         main_window.ui.show()
+        # 이벤트 루프가 처음 돌 때(창이 그려진 뒤) 시작 시간을 기록합니다.
+        QTimer.singleShot(0, partial(report_startup, args.startup_report))
+        if args.startup_report:
+            QTimer.singleShot(0, app.quit)
         sys.exit(app.exec())
     else:
         sys.exit(-1)
\ No newline at end of file